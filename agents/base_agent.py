@@ -1,10 +1,26 @@
 import logging
-from google.cloud import aiplatform
+from typing import AsyncIterator, Iterator, Optional
+from config import settings
+from tools import async_runtime
+from tools.model_registry import class_identity, get_registry
+from tools.model_resilience import ResilientCaller, get_circuit_breaker
+from tools.prompt_builder import CHARS_PER_TOKEN, PromptBuilder, estimate_tokens
+from tools.rate_limiter import ModelRateLimiter, get_rate_limiter
+from tools.response_cache import ResponseCache, get_default_cache
 
 class BaseAgent:
     """The base class for all agents in the system."""
 
-    def __init__(self, model_name: str, project: str, location: str):
+    def __init__(
+        self,
+        model_name: str,
+        project: str,
+        location: str,
+        use_cache: bool = True,
+        response_cache: Optional[ResponseCache] = None,
+        resilience: Optional[ResilientCaller] = None,
+        rate_limiter: Optional[ModelRateLimiter] = None
+    ):
         """
         Initializes the BaseAgent.
 
@@ -12,24 +28,53 @@ class BaseAgent:
             model_name: The name of the Vertex AI model to use.
             project: The GCP project ID.
             location: The GCP region.
+            use_cache: Whether model responses may be served from and stored
+                in the response cache. Set to False to bypass it.
+            response_cache: Optional cache to use instead of the shared one.
+            resilience: Optional retry, hedging and circuit breaker policy.
+                By default calls are retried as configured in settings and
+                share the model's process-wide circuit breaker.
+            rate_limiter: Optional quota limiter to use instead of the
+                process-wide one.
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.project = project
         self.location = location
         self.model_name = model_name
-        self.model = self._initialize_model()
+        self.use_cache = use_cache and settings.RESPONSE_CACHE_ENABLED
+        self.response_cache = response_cache
+        self.resilience = resilience
+        self.rate_limiter = rate_limiter
+        # Waiting calls from different agents take turns under the rate limiter
+        self.rate_limit_key = f"{self.__class__.__name__}-{id(self):x}"
+        self._model = None
+        # Set when a client is assigned directly instead of taken from the registry
+        self._client_identity: Optional[str] = None
+        self.prompt_builder = PromptBuilder(
+            token_budget=settings.PROMPT_TOKEN_BUDGETS.get(
+                self.__class__.__name__, settings.DEFAULT_PROMPT_TOKEN_BUDGET
+            ),
+            logger=self.logger
+        )
+
+    @property
+    def model(self):
+        """The shared model client, initialized on first use."""
+        if self._model is None:
+            self._model = self._initialize_model()
+        return self._model
+
+    @model.setter
+    def model(self, client):
+        self._model = client
+        self._client_identity = class_identity(type(client))
 
     def _initialize_model(self):
-        """Initializes the Vertex AI model."""
+        """Fetches the shared Vertex AI model client from the registry."""
         try:
-            aiplatform.init(project=self.project, location=self.location)
-            # This is a placeholder for the actual model initialization
-            # In a real application, you would initialize the model here
-            # For example:
-            # from vertexai.preview.generative_models import GenerativeModel
-            # return GenerativeModel(self.model_name)
+            client = get_registry().get_client(self.project, self.location, self.model_name)
             self.logger.info(f"Successfully initialized model: {self.model_name}")
-            return self.model_name # Returning the name for now
+            return client
         except Exception as e:
             self.logger.error(f"Failed to initialize model: {e}")
             raise
@@ -41,47 +86,211 @@ class BaseAgent:
         """
         raise NotImplementedError("The 'run' method must be implemented by the subclass.")
 
-    def _execute_prompt(self, prompt: str) -> str:
+    def _execute_prompt(self, prompt: str, use_cache: bool = True) -> str:
         """
         Executes a prompt against the configured Vertex AI model.
 
+        This is a thin synchronous wrapper around `_aexecute_prompt`; the call
+        itself runs on the shared model event loop.
+
         Args:
             prompt: The prompt to execute.
+            use_cache: Set to False to neither read nor store the response
+                in the response cache for this call.
 
         Returns:
             The response from the model.
         """
-        self.logger.info(f"Executing prompt: {prompt[:100]}...")
-        # This is a placeholder for the actual prompt execution.
-        # It now simulates the structured JSON output we expect from the LLM
-        # to allow the main application to run successfully.
-        
-        dummy_json_response = """
-        ```json
-        {
-          "summary": "This is a dummy analysis of a customer and orders database.",
-          "key_tables": [
-            {
-              "table_name": "customers",
-              "role": "Dimension",
-              "description": "Stores customer information."
-            },
-            {
-              "table_name": "orders",
-              "role": "Fact",
-              "description": "Stores order information, linking to customers."
-            }
-          ],
-          "relationships": [
-            {
-              "from_table": "orders",
-              "from_column": "customer_id",
-              "to_table": "customers",
-              "to_column": "customer_id",
-              "relationship_type": "Many-to-One"
-            }
-          ]
-        }
-        ```
+        return async_runtime.run_sync(self._aexecute_prompt(prompt, use_cache=use_cache))
+
+    async def _aexecute_prompt(self, prompt: str, use_cache: bool = True) -> str:
+        """
+        Asynchronously executes a prompt against the configured Vertex AI model.
+
+        Calls from every agent share one event loop and are bounded by
+        `settings.MAX_CONCURRENT_MODEL_CALLS`, so many prompts can be in flight
+        without one OS thread per call. Identical prompts are served from the
+        response cache unless the agent was created with `use_cache=False`.
+        Transient errors are retried and, if enabled, slow calls are hedged
+        (see `ResilientCaller`).
+
+        Args:
+            prompt: The prompt to execute.
+            use_cache: Set to False to neither read nor store the response
+                in the response cache for this call.
+
+        Returns:
+            The response from the model.
+        """
+        cache = self._get_response_cache() if use_cache else None
+        cache_key = None
+        if cache is not None:
+            cache_key = self._cache_key(cache, prompt)
+            cached_response = cache.get(cache_key)
+            if cached_response is not None:
+                self.logger.info("Serving model response from cache.")
+                return cached_response
+
+        resilience = self._get_resilience()
+        response = await async_runtime.run_on_shared_loop(
+            resilience.call(lambda: self._limited_generate(prompt))
+        )
+        if cache_key is not None:
+            cache.put(cache_key, response)
+        return response
+
+    def _execute_prompt_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Executes a prompt and yields the response in chunks as they arrive.
+
+        The streaming counterpart of `_execute_prompt`: the call runs on the
+        shared model event loop, and each chunk is handed to the caller as
+        soon as the model produces it.
+
+        Args:
+            prompt: The prompt to execute.
+
+        Returns:
+            An iterator over the response text chunks.
+        """
+        return async_runtime.iterate_sync(self._astream_prompt(prompt))
+
+    async def _astream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Asynchronously streams the response to a prompt.
+
+        Shares the concurrency limit, response cache and retry policy with
+        `_aexecute_prompt`; a stream is only retried before its first chunk.
+        A cached response is yielded as a single chunk; otherwise the streamed
+        response is cached once it is complete.
+
+        Args:
+            prompt: The prompt to execute.
+
+        Yields:
+            The response text, chunk by chunk.
+        """
+        cache = self._get_response_cache()
+        cache_key = None
+        if cache is not None:
+            cache_key = self._cache_key(cache, prompt)
+            cached_response = cache.get(cache_key)
+            if cached_response is not None:
+                self.logger.info("Serving model response from cache.")
+                yield cached_response
+                return
+
+        # Only kept when the response is going to be cached
+        chunks = [] if cache_key is not None else None
+        resilience = self._get_resilience()
+        async for chunk in resilience.stream(lambda: self._limited_stream(prompt)):
+            if chunks is not None:
+                chunks.append(chunk)
+            yield chunk
+        if cache_key is not None:
+            cache.put(cache_key, "".join(chunks))
+
+    def _get_resilience(self) -> ResilientCaller:
+        """Returns the call policy for this agent, creating the default one on first use."""
+        if self.resilience is None:
+            self.resilience = ResilientCaller(breaker=get_circuit_breaker(self.model_name))
+        return self.resilience
+
+    def _cache_key(self, cache: ResponseCache, prompt: str) -> str:
+        """
+        Builds the cache key of a prompt for this agent's model and client.
+
+        The client is named without being created, so a run served from the
+        cache never initializes it.
+        """
+        client = self._client_identity or get_registry().client_identity(self.project, self.location, self.model_name)
+        return cache.make_key(
+            self.model_name,
+            settings.GEMINI_TEMPERATURE,
+            settings.GEMINI_MAX_OUTPUT_TOKENS,
+            prompt,
+            client=client
+        )
+
+    def _forget_response(self, prompt: str):
+        """Drops the cached response to a prompt, e.g. because it could not be used."""
+        cache = self._get_response_cache()
+        if cache is not None:
+            cache.invalidate(self._cache_key(cache, prompt))
+
+    def _get_response_cache(self) -> Optional[ResponseCache]:
+        """Returns the cache to use for this agent, or None when bypassed."""
+        if not self.use_cache:
+            return None
+        if self.response_cache is None:
+            self.response_cache = get_default_cache()
+        return self.response_cache
+
+    def _get_rate_limiter(self) -> ModelRateLimiter:
+        if self.rate_limiter is None:
+            self.rate_limiter = get_rate_limiter()
+        return self.rate_limiter
+
+    async def _limited_generate(self, prompt: str) -> str:
+        """Runs a model call once the rate limiter and a concurrency slot allow it."""
+        limiter = self._get_rate_limiter()
+        prompt_tokens = estimate_tokens(prompt)
+        lease = await limiter.acquire(self.rate_limit_key, prompt_tokens + settings.MODEL_ESTIMATED_OUTPUT_TOKENS)
+        response, error = None, None
+        try:
+            async with async_runtime.model_call_slot():
+                self.logger.info(f"Executing prompt: {prompt[:100]}...")
+                response = await self._agenerate(prompt)
+                return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            limiter.release(lease, actual_tokens=prompt_tokens + estimate_tokens(response or ""), error=error)
+
+    async def _limited_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Streams a model call once the rate limiter and a concurrency slot allow it."""
+        limiter = self._get_rate_limiter()
+        prompt_tokens = estimate_tokens(prompt)
+        lease = await limiter.acquire(self.rate_limit_key, prompt_tokens + settings.MODEL_ESTIMATED_OUTPUT_TOKENS)
+        response_chars, error = 0, None
+        try:
+            async with async_runtime.model_call_slot():
+                self.logger.info(f"Streaming prompt: {prompt[:100]}...")
+                async for chunk in self._agenerate_stream(prompt):
+                    response_chars += len(chunk)
+                    yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            limiter.release(lease, actual_tokens=prompt_tokens + response_chars // CHARS_PER_TOKEN, error=error)
+
+    async def _agenerate(self, prompt: str) -> str:
+        """
+        Sends a prompt to the model and returns the raw response text.
+        """
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config=self._generation_config()
+        )
+        return response.text
+
+    async def _agenerate_stream(self, prompt: str) -> AsyncIterator[str]:
         """
-        return dummy_json_response
+        Sends a prompt to the model and yields the raw response text as it streams in.
+        """
+        responses = await self.model.generate_content_async(
+            prompt,
+            generation_config=self._generation_config(),
+            stream=True
+        )
+        async for response in responses:
+            if response.text:
+                yield response.text
+
+    def _generation_config(self) -> dict:
+        return {
+            "temperature": settings.GEMINI_TEMPERATURE,
+            "max_output_tokens": settings.GEMINI_MAX_OUTPUT_TOKENS
+        }
@@ -0,0 +1,87 @@
+# In file: agents/fused_agent.py
+
+from typing import Any, Dict, Optional
+from agents.base_agent import BaseAgent
+from prompts.fused_prompt import FUSED_ARTIFACTS_PROMPT
+from tools.json_repair import extract_json
+from tools.plan_writer import PlanWriter
+from tools.prompt_builder import compact_json
+from tools.sql_writer import SqlWriter
+
+# The JSON key of each artifact in the fused response, by the step it replaces.
+ARTIFACT_KEYS = {
+    "planning": "migration_plan",
+    "transformation": "schema_sql",
+    "validation": "validation_sql",
+}
+
+class MigrationArtifactsAgent(BaseAgent):
+    """
+    An agent that generates the migration plan, the SQL DDL and the
+    validation queries with a single model call.
+
+    The schema analysis is sent once instead of three times, and the three
+    artifacts come back as sections of one JSON response.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.plan_writer = PlanWriter()
+        self.sql_writer = SqlWriter()
+        self.logger.info("MigrationArtifactsAgent initialized.")
+
+    def run(
+        self,
+        schema_analysis: Dict[str, Any],
+        plan_output_path: str,
+        sql_output_path: str,
+        validation_output_path: str,
+        context: str = ""
+    ) -> Optional[Dict[str, str]]:
+        """
+        Generates and saves the plan, DDL and validation script.
+
+        Args:
+            schema_analysis: The structured analysis from the SourceAnalysisAgent.
+            plan_output_path: The file path for the migration plan.
+            sql_output_path: The file path for the SQL DDL.
+            validation_output_path: The file path for the validation SQL script.
+            context: Optional context from previous runs.
+
+        Returns:
+            The artifacts keyed by the step they replace ("planning",
+            "transformation" and "validation"), or None if the response
+            could not be split, in which case nothing is written.
+        """
+        self.logger.info("Generating plan, DDL and validation queries in one call...")
+        try:
+            prompt = self.prompt_builder.build(
+                FUSED_ARTIFACTS_PROMPT,
+                {"schema_analysis_json": compact_json(schema_analysis), "context": context},
+                trimmable=["context"]
+            )
+            artifacts = self.split_response(self._execute_prompt(prompt))
+        except Exception as e:
+            self.logger.error(f"An error occurred during fused artifact generation: {e}", exc_info=True)
+            return None
+
+        self.plan_writer.save_plan(plan_content=artifacts["planning"], output_path=plan_output_path)
+        self.sql_writer.save_sql(sql_content=artifacts["transformation"], output_path=sql_output_path)
+        self.sql_writer.save_sql(sql_content=artifacts["validation"], output_path=validation_output_path)
+        self.logger.info("Plan, DDL and validation queries successfully generated and saved.")
+        return artifacts
+
+    def split_response(self, response: str) -> Dict[str, str]:
+        """
+        Splits a fused response into its artifacts.
+
+        Raises:
+            ValueError: If the response is not a JSON object with a non-empty
+                string for every artifact.
+        """
+        sections = extract_json(response)
+        if not isinstance(sections, dict):
+            raise ValueError("The fused response is not a JSON object.")
+        missing = [key for key in ARTIFACT_KEYS.values() if not isinstance(sections.get(key), str) or not sections[key].strip()]
+        if missing:
+            raise ValueError(f"The fused response is missing {', '.join(missing)}.")
+        return {step: sections[key] for step, key in ARTIFACT_KEYS.items()}
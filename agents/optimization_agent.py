@@ -1,21 +1,38 @@
 # In file: agents/optimization_agent.py
 
 import json
-from typing import Dict, Any
+import os
+from typing import Any, Callable, Dict, Iterator, Optional
 from agents.base_agent import BaseAgent
-from prompts.optimization_prompt import OPTIMIZATION_PROMPT
+from config import settings
+from prompts.optimization_prompt import OPTIMIZATION_PROMPT, OPTIMIZATION_REVIEW_PROMPT
+from tools.index_advisor import IndexAdvisor
+from tools.prompt_builder import compact_json
 from tools.sql_writer import SqlWriter
 
 class QueryOptimizationAgent(BaseAgent):
     """
     An agent that suggests optimizations for a generated SQL schema.
+
+    With INDEX_ADVISOR on, indexes and partitioning are recommended by rules
+    (see IndexAdvisor) and the model is at most asked to review them.
+    Otherwise the model writes every suggestion.
     """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.sql_writer = SqlWriter()
+        self.index_advisor = IndexAdvisor()
         self.logger.info("QueryOptimizationAgent initialized.")
 
-    def run(self, generated_sql: str, schema_analysis: Dict[str, Any], output_path: str, context: str = "") -> None:
+    def run(
+        self,
+        generated_sql: str,
+        schema_analysis: Dict[str, Any],
+        output_path: str,
+        context: str = "",
+        on_chunk: Optional[Callable[[str], None]] = None,
+        advice_output_path: Optional[str] = None
+    ) -> bool:
         """
         Generates and saves a SQL script with optimization suggestions.
 
@@ -24,26 +41,104 @@ class QueryOptimizationAgent(BaseAgent):
             schema_analysis: The structured analysis from the SourceAnalysisAgent.
             output_path: The file path for the optimization SQL script.
             context: Optional context from previous runs.
+            on_chunk: Optional callback for each chunk of the response. When
+                given, the response is streamed to the output file as it
+                arrives instead of being written once complete.
+            advice_output_path: The file path for the recommendations as
+                JSON. When given and INDEX_ADVISOR is on, the script is
+                generated by rules instead of the model.
+
+        Returns:
+            True if the optimization script was generated, False if an error was saved instead.
         """
         self.logger.info("Starting query optimization analysis...")
         try:
-            analysis_json_str = json.dumps(schema_analysis, indent=2)
+            if advice_output_path is not None and settings.INDEX_ADVISOR:
+                advice = self.index_advisor.advise(generated_sql, schema_analysis.get("relationships") or [])
+                self._save_advice(advice, advice_output_path)
+                chunks = self._advice_chunks(advice, generated_sql, schema_analysis, context, stream=on_chunk is not None)
+                if on_chunk is not None:
+                    self.sql_writer.stream_sql(chunks, output_path=output_path, on_chunk=on_chunk)
+                else:
+                    self.sql_writer.save_sql(sql_content="".join(chunks), output_path=output_path)
+                self.logger.info(f"Optimization SQL saved to {output_path} and recommendations to {advice_output_path}")
+                return True
+
+            analysis_json_str = compact_json(schema_analysis)
 
-            prompt = OPTIMIZATION_PROMPT.format(
-                generated_sql=generated_sql,
-                schema_analysis_json=analysis_json_str,
-                context=context
+            # Context is trimmed before the DDL, which is trimmed last
+            prompt = self.prompt_builder.build(
+                OPTIMIZATION_PROMPT,
+                {
+                    "generated_sql": generated_sql,
+                    "schema_analysis_json": analysis_json_str,
+                    "context": context
+                },
+                trimmable=["context", "generated_sql"]
             )
 
-            optimization_sql = self._execute_prompt(prompt)
+            if on_chunk is not None:
+                self.sql_writer.stream_sql(
+                    self._execute_prompt_stream(prompt),
+                    output_path=output_path,
+                    on_chunk=on_chunk
+                )
+            else:
+                optimization_sql = self._execute_prompt(prompt)
 
-            self.sql_writer.save_sql(
-                sql_content=optimization_sql,
-                output_path=output_path
-            )
+                self.sql_writer.save_sql(
+                    sql_content=optimization_sql,
+                    output_path=output_path
+                )
             self.logger.info(f"Optimization SQL successfully generated and saved to {output_path}")
+            return True
 
         except Exception as e:
             self.logger.error(f"An error occurred during query optimization: {e}", exc_info=True)
             error_content = f"-- Optimization SQL Generation Failed\n-- An error occurred: {e}"
             self.sql_writer.save_sql(sql_content=error_content, output_path=output_path)
+            return False
+
+    def _advice_chunks(
+        self,
+        advice: Dict[str, Any],
+        generated_sql: str,
+        schema_analysis: Dict[str, Any],
+        context: str,
+        stream: bool
+    ) -> Iterator[str]:
+        """
+        Yields the rule-based script, then the model's review as it arrives
+        when INDEX_ADVISOR_MODEL_REVIEW is on. A failed review leaves a
+        comment instead of failing the script.
+        """
+        index_sql = self.index_advisor.to_sql(advice)
+        yield index_sql
+        if not settings.INDEX_ADVISOR_MODEL_REVIEW:
+            return
+        yield "\n-- Model review of the recommendations\n"
+        try:
+            prompt = self.prompt_builder.build(
+                OPTIMIZATION_REVIEW_PROMPT,
+                {
+                    "generated_sql": generated_sql,
+                    "schema_analysis_json": compact_json(schema_analysis),
+                    "context": context,
+                    "index_sql": index_sql
+                },
+                trimmable=["context", "generated_sql"]
+            )
+            if stream:
+                yield from self._execute_prompt_stream(prompt)
+            else:
+                yield self._execute_prompt(prompt)
+        except Exception as e:
+            self.logger.warning(f"Could not review the index recommendations: {e}")
+            yield f"\n-- The model review could not be generated: {e}\n"
+
+    def _save_advice(self, advice: Dict[str, Any], output_path: str):
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output_path, "w") as f:
+            json.dump(advice, f, indent=2)
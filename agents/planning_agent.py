@@ -1,10 +1,10 @@
 # In file: agents/planning_agent.py
 
-import json
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Optional
 from agents.base_agent import BaseAgent
 from prompts.planning_prompt import MIGRATION_PLAN_PROMPT
 from tools.plan_writer import PlanWriter
+from tools.prompt_builder import compact_json
 
 class MigrationPlanAgent(BaseAgent):
     """
@@ -16,36 +16,59 @@ class MigrationPlanAgent(BaseAgent):
         self.plan_writer = PlanWriter()
         self.logger.info("MigrationPlanAgent initialized.")
 
-    def run(self, schema_analysis: Dict[str, Any], output_path: str) -> None:
+    def run(
+        self,
+        schema_analysis: Dict[str, Any],
+        output_path: str,
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> bool:
         """
         Executes the full migration planning process.
 
         Args:
             schema_analysis: The structured schema analysis from the SourceAnalysisAgent.
             output_path: The file path to save the generated migration plan.
+            on_chunk: Optional callback for each chunk of the response. When
+                given, the response is streamed to the output file as it
+                arrives instead of being written once complete.
+
+        Returns:
+            True if the migration plan was generated, False if an error was saved instead.
         """
         self.logger.info("Starting migration planning...")
 
         try:
             # Convert the analysis dictionary back to a JSON string for the prompt
-            analysis_json_str = json.dumps(schema_analysis, indent=2)
+            analysis_json_str = compact_json(schema_analysis)
             
             # Create the prompt for the planning agent
-            prompt = MIGRATION_PLAN_PROMPT.format(schema_analysis_json=analysis_json_str)
-
-            # Execute the prompt to get the migration plan
-            migration_plan_markdown = self._execute_prompt(prompt)
-            
-            # Use the PlanWriter tool to save the plan
-            self.plan_writer.save_plan(
-                plan_content=migration_plan_markdown,
-                output_path=output_path
+            prompt = self.prompt_builder.build(
+                MIGRATION_PLAN_PROMPT,
+                {"schema_analysis_json": analysis_json_str}
             )
 
+            if on_chunk is not None:
+                self.plan_writer.stream_plan(
+                    self._execute_prompt_stream(prompt),
+                    output_path=output_path,
+                    on_chunk=on_chunk
+                )
+            else:
+                # Execute the prompt to get the migration plan
+                migration_plan_markdown = self._execute_prompt(prompt)
+
+                # Use the PlanWriter tool to save the plan
+                self.plan_writer.save_plan(
+                    plan_content=migration_plan_markdown,
+                    output_path=output_path
+                )
+
             self.logger.info(f"Migration plan successfully generated and saved to {output_path}")
+            return True
 
         except Exception as e:
             self.logger.error(f"An error occurred during migration planning: {e}", exc_info=True)
             # As a fallback, save an error message to the output file
             error_content = f"# Migration Plan Generation Failed\n\nAn error occurred: {e}"
             self.plan_writer.save_plan(plan_content=error_content, output_path=output_path)
+            return False
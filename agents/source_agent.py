@@ -1,8 +1,11 @@
 # In file: agents/source_agent.py
 
 import json
+import pandas as pd
+from typing import Any, Dict, Optional
 from agents.base_agent import BaseAgent
 from tools.database_connector import BaseConnector
+from tools.schema_diff import SchemaDiff
 from tools.schema_parser import SchemaParser
 from prompts.source_analysis_prompt import SCHEMA_ANALYSIS_PROMPT_ADVANCED
 
@@ -17,12 +20,24 @@ class SourceAnalysisAgent(BaseAgent):
         self.logger.info("SourceAnalysisAgent initialized.")
 
     # CORRECTED: Added context parameter with a default value
-    def run(self, context: str = "") -> str:
+    def run(
+        self,
+        context: str = "",
+        previous_analysis: Optional[Dict[str, Any]] = None,
+        schema_diff: Optional[SchemaDiff] = None,
+        schema_df: Optional[pd.DataFrame] = None
+    ) -> str:
         """
         Executes the full schema analysis process.
         
         Args:
             context: Optional context from previous pipeline runs.
+            previous_analysis: The report of a previous run. Together with
+                `schema_diff`, only the tables that changed since that run are
+                re-analyzed and the report is patched.
+            schema_diff: How the schema changed since the previous run.
+            schema_df: The source catalog, if the caller has already read it.
+                It is only read from the connector when this is None.
 
         Returns:
             A string containing the final schema analysis report as a JSON object.
@@ -31,7 +46,8 @@ class SourceAnalysisAgent(BaseAgent):
         
         try:
             self.connector.connect()
-            schema_df = self.connector.get_schema()
+            if schema_df is None:
+                schema_df = self.connector.get_schema()
             
             if schema_df.empty:
                 self.logger.warning("Schema is empty. No analysis to perform.")
@@ -39,12 +55,26 @@ class SourceAnalysisAgent(BaseAgent):
 
             self.logger.info(f"Schema retrieved with {len(schema_df)} columns.")
             
-            # Pass the context to the schema parser
-            analysis_report_dict = self.schema_parser.analyze_schema(
-                schema_df, 
-                SCHEMA_ANALYSIS_PROMPT_ADVANCED,
-                context
-            )
+            # Foreign keys declared in the source don't need to be guessed
+            declared_relationships = self.connector.get_foreign_keys()
+
+            if previous_analysis is not None and schema_diff is not None:
+                analysis_report_dict = self.schema_parser.analyze_schema_incremental(
+                    schema_df,
+                    SCHEMA_ANALYSIS_PROMPT_ADVANCED,
+                    previous_analysis,
+                    schema_diff,
+                    context,
+                    declared_relationships=declared_relationships
+                )
+            else:
+                # Pass the context to the schema parser
+                analysis_report_dict = self.schema_parser.analyze_schema(
+                    schema_df, 
+                    SCHEMA_ANALYSIS_PROMPT_ADVANCED,
+                    context,
+                    declared_relationships=declared_relationships
+                )
             
             self.logger.info("Schema analysis complete.")
             return json.dumps(analysis_report_dict, indent=2)
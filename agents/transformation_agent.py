@@ -1,49 +1,174 @@
 # In file: agents/transformation_agent.py
 
-import json
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Iterable, Optional
+import pandas as pd
 from agents.base_agent import BaseAgent
-from prompts.transformation_prompt import TRANSFORMATION_PROMPT
+from config import settings
+from prompts.transformation_prompt import TABLE_COMMENTS_PROMPT, TRANSFORMATION_PROMPT
+from tools.ddl_generator import DdlGenerator
+from tools.json_repair import extract_json
+from tools.prompt_builder import compact_json
+from tools.schema_diff import SchemaDiff
 from tools.sql_writer import SqlWriter
 
 class SchemaTransformationAgent(BaseAgent):
     """
     An agent that transforms a JSON schema analysis into SQL DDL statements.
+
+    Given the source catalog, the DDL is generated by rules (see DdlGenerator)
+    and the model is at most asked for table comments. Without it, the model
+    writes the DDL from the analysis.
+
+    When the schema changed incrementally since a previous run, `run_delta`
+    emits `ALTER TABLE` migrations for the change instead of regenerating
+    the full DDL.
     """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.sql_writer = SqlWriter()
+        self.ddl_generator = DdlGenerator()
         self.logger.info("SchemaTransformationAgent initialized.")
 
-    def run(self, schema_analysis: Dict[str, Any], output_path: str) -> None:
+    def run(
+        self,
+        schema_analysis: Dict[str, Any],
+        output_path: str,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        schema_df: Optional[pd.DataFrame] = None
+    ) -> str:
         """
         Executes the schema to SQL transformation process.
 
         Args:
             schema_analysis: The structured schema analysis from the SourceAnalysisAgent.
             output_path: The file path to save the generated SQL DDL.
+            on_chunk: Optional callback for each chunk of the response. When
+                given, the response is streamed to the output file as it
+                arrives instead of being written once complete.
+            schema_df: The source catalog. When given and RULE_BASED_DDL is
+                on, the DDL is generated from it without a model call.
+
+        Returns:
+            The generated SQL DDL, or an empty string if generation failed.
         """
         self.logger.info("Starting schema to SQL transformation...")
 
         try:
+            if schema_df is not None and settings.RULE_BASED_DDL:
+                generated_sql = self.ddl_generator.generate(
+                    schema_df,
+                    schema_analysis.get("relationships") or [],
+                    self._table_comments(schema_analysis)
+                )
+                self.sql_writer.save_sql(sql_content=generated_sql, output_path=output_path)
+                if on_chunk is not None:
+                    on_chunk(generated_sql)
+                self.logger.info(f"SQL DDL generated from the source catalog and saved to {output_path}")
+                return generated_sql
+
             # Convert the analysis dictionary back to a JSON string for the prompt
-            analysis_json_str = json.dumps(schema_analysis, indent=2)
+            analysis_json_str = compact_json(schema_analysis)
             
             # Create the prompt for the transformation agent
-            prompt = TRANSFORMATION_PROMPT.format(schema_analysis_json=analysis_json_str)
-
-            # Execute the prompt to get the SQL DDL
-            generated_sql = self._execute_prompt(prompt)
-            
-            # Use the SqlWriter tool to save the SQL
-            self.sql_writer.save_sql(
-                sql_content=generated_sql,
-                output_path=output_path
+            prompt = self.prompt_builder.build(
+                TRANSFORMATION_PROMPT,
+                {"schema_analysis_json": analysis_json_str}
             )
 
+            if on_chunk is not None:
+                self.sql_writer.stream_sql(
+                    self._execute_prompt_stream(prompt),
+                    output_path=output_path,
+                    on_chunk=on_chunk
+                )
+                # Downstream steps need the DDL, so it is read back once complete
+                with open(output_path) as f:
+                    generated_sql = f.read()
+            else:
+                # Execute the prompt to get the SQL DDL
+                generated_sql = self._execute_prompt(prompt)
+
+                # Use the SqlWriter tool to save the SQL
+                self.sql_writer.save_sql(
+                    sql_content=generated_sql,
+                    output_path=output_path
+                )
+
             self.logger.info(f"SQL DDL successfully generated and saved to {output_path}")
+            return generated_sql
 
         except Exception as e:
             self.logger.error(f"An error occurred during schema transformation: {e}", exc_info=True)
             error_content = f"-- SQL Generation Failed\n-- An error occurred: {e}"
             self.sql_writer.save_sql(sql_content=error_content, output_path=output_path)
+            return ""
+
+    def _table_comments(self, schema_analysis: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Returns a comment for each key table: the analysis description, or
+        the model's comment when DDL_MODEL_COMMENTS is on.
+        """
+        comments = {
+            table["table_name"]: table["description"]
+            for table in schema_analysis.get("key_tables") or []
+            if isinstance(table, dict) and table.get("table_name") and table.get("description")
+        }
+        if not settings.DDL_MODEL_COMMENTS:
+            return comments
+        try:
+            prompt = self.prompt_builder.build(
+                TABLE_COMMENTS_PROMPT,
+                {"schema_analysis_json": compact_json(schema_analysis)}
+            )
+            model_comments = extract_json(self._execute_prompt(prompt))
+            if isinstance(model_comments, dict):
+                comments.update({
+                    table: comment for table, comment in model_comments.items()
+                    if isinstance(comment, str) and comment.strip()
+                })
+        except Exception as e:
+            # Comments are optional, so the DDL is still written without them
+            self.logger.warning(f"Could not generate table comments: {e}")
+        return comments
+
+    def run_delta(
+        self,
+        schema_diff: SchemaDiff,
+        previous_sql: str,
+        output_path: str,
+        migration_output_path: str,
+        relationships: Iterable[Dict[str, Any]] = (),
+        schema_df: Optional[pd.DataFrame] = None
+    ) -> str:
+        """
+        Emits a migration script for a schema change.
+
+        The migration is written on its own to `migration_output_path`, and
+        appended to the previous run's DDL in `output_path` so that file still
+        builds the complete current schema.
+
+        Args:
+            schema_diff: How the schema changed since the previous run.
+            previous_sql: The DDL generated by the previous run.
+            output_path: The file path to save the full SQL DDL.
+            migration_output_path: The file path to save the migration script.
+            relationships: Relationships of the current analysis report,
+                rendered as foreign keys of new tables and added columns.
+            schema_df: The current schema catalog. Without it, new tables
+                and columns are added without keys or `NOT NULL`.
+
+        Returns:
+            The full SQL DDL, previous DDL followed by the migration. For an
+            empty diff nothing is appended and the previous DDL is returned.
+        """
+        self.logger.info("Generating schema migration from the schema diff...")
+        migration_sql = schema_diff.to_migration_sql(schema_df, relationships)
+        self.sql_writer.save_sql(sql_content=migration_sql, output_path=migration_output_path)
+        if schema_diff.is_empty:
+            self.sql_writer.save_sql(sql_content=previous_sql, output_path=output_path)
+            self.logger.info("Schema is unchanged; the previous DDL is kept as is.")
+            return previous_sql
+        generated_sql = previous_sql.rstrip() + "\n\n" + migration_sql
+        self.sql_writer.save_sql(sql_content=generated_sql, output_path=output_path)
+        self.logger.info(f"Schema migration saved to {migration_output_path}")
+        return generated_sql
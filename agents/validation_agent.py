@@ -1,21 +1,36 @@
 # In file: agents/validation_agent.py
 
-import json
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Iterator, Optional
+import pandas as pd
 from agents.base_agent import BaseAgent
-from prompts.validation_prompt import VALIDATION_PROMPT
+from config import settings
+from prompts.validation_prompt import BUSINESS_RULES_PROMPT, VALIDATION_PROMPT
+from tools.prompt_builder import compact_json
 from tools.sql_writer import SqlWriter
+from tools.validation_query_generator import ValidationQueryGenerator
 
 class DataValidationAgent(BaseAgent):
     """
     An agent that generates SQL validation queries based on a schema analysis.
+
+    Given the source catalog, row count, NULL and orphan checks are written
+    from templates (see ValidationQueryGenerator) and the model is only asked
+    for business-rule checks. Without it, the model writes every query.
     """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.sql_writer = SqlWriter()
+        self.query_generator = ValidationQueryGenerator()
         self.logger.info("DataValidationAgent initialized.")
 
-    def run(self, schema_analysis: Dict[str, Any], output_path: str, context: str = "") -> None:
+    def run(
+        self,
+        schema_analysis: Dict[str, Any],
+        output_path: str,
+        context: str = "",
+        on_chunk: Optional[Callable[[str], None]] = None,
+        schema_df: Optional[pd.DataFrame] = None
+    ) -> bool:
         """
         Generates and saves SQL validation queries.
 
@@ -23,25 +38,91 @@ class DataValidationAgent(BaseAgent):
             schema_analysis: The structured analysis from the SourceAnalysisAgent.
             output_path: The file path for the validation SQL script.
             context: Optional context from previous runs.
+            on_chunk: Optional callback for each chunk of the response. When
+                given, the response is streamed to the output file as it
+                arrives instead of being written once complete.
+            schema_df: The source catalog. When given and
+                TEMPLATE_VALIDATION_QUERIES is on, the standard checks are
+                generated from it without a model call.
+
+        Returns:
+            True if the validation script was generated, False if an error was saved instead.
         """
         self.logger.info("Starting data validation planning...")
         try:
-            analysis_json_str = json.dumps(schema_analysis, indent=2)
-            
-            prompt = VALIDATION_PROMPT.format(
-                schema_analysis_json=analysis_json_str,
-                context=context
-            )
+            if schema_df is not None and settings.TEMPLATE_VALIDATION_QUERIES:
+                chunks = self._template_chunks(schema_analysis, schema_df, context, stream=on_chunk is not None)
+                if on_chunk is not None:
+                    self.sql_writer.stream_sql(chunks, output_path=output_path, on_chunk=on_chunk)
+                else:
+                    self.sql_writer.save_sql(sql_content="".join(chunks), output_path=output_path)
+                self.logger.info(f"Validation SQL successfully generated and saved to {output_path}")
+                return True
 
-            validation_sql = self._execute_prompt(prompt)
+            analysis_json_str = compact_json(schema_analysis)
             
-            self.sql_writer.save_sql(
-                sql_content=validation_sql,
-                output_path=output_path
+            prompt = self.prompt_builder.build(
+                VALIDATION_PROMPT,
+                {"schema_analysis_json": analysis_json_str, "context": context},
+                trimmable=["context"]
             )
+
+            if on_chunk is not None:
+                self.sql_writer.stream_sql(
+                    self._execute_prompt_stream(prompt),
+                    output_path=output_path,
+                    on_chunk=on_chunk
+                )
+            else:
+                validation_sql = self._execute_prompt(prompt)
+
+                self.sql_writer.save_sql(
+                    sql_content=validation_sql,
+                    output_path=output_path
+                )
             self.logger.info(f"Validation SQL successfully generated and saved to {output_path}")
+            return True
 
         except Exception as e:
             self.logger.error(f"An error occurred during data validation: {e}", exc_info=True)
             error_content = f"-- Validation SQL Generation Failed\n-- An error occurred: {e}"
             self.sql_writer.save_sql(sql_content=error_content, output_path=output_path)
+            return False
+
+    def _template_chunks(
+        self,
+        schema_analysis: Dict[str, Any],
+        schema_df: pd.DataFrame,
+        context: str,
+        stream: bool
+    ) -> Iterator[str]:
+        """
+        Yields the template checks, then the model's business-rule checks as
+        they arrive. A failed model call leaves a comment instead of failing
+        the script.
+        """
+        yield self.query_generator.generate(
+            schema_df,
+            schema_analysis.get("key_tables") or [],
+            schema_analysis.get("relationships") or []
+        )
+        if not settings.VALIDATION_BUSINESS_RULES:
+            return
+        yield "\n-- Business-rule checks\n"
+        try:
+            prompt = self.prompt_builder.build(
+                BUSINESS_RULES_PROMPT,
+                {
+                    "schema_analysis_json": compact_json(schema_analysis),
+                    "context": context,
+                    "target_schema": self.query_generator.target_schema or "target",
+                },
+                trimmable=["context"]
+            )
+            if stream:
+                yield from self._execute_prompt_stream(prompt)
+            else:
+                yield self._execute_prompt(prompt)
+        except Exception as e:
+            self.logger.warning(f"Could not generate business-rule checks: {e}")
+            yield f"\n-- Business-rule checks could not be generated: {e}\n"
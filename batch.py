@@ -0,0 +1,190 @@
+# In file: batch.py
+
+import argparse
+import datetime
+import importlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from config.logging_config import setup_logging
+from config import settings
+from main import build_orchestrator
+from tools.csv_connector import CsvConnector
+from tools.database_connector import BaseConnector
+from tools.dbapi_connector import DbApiConnector
+from tools.memory_manager import MemoryManager
+from tools.sqlite_connector import SqliteConnector
+
+logger = logging.getLogger("BatchRunner")
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+def load_sources(manifest_path: str) -> List[Dict[str, Any]]:
+    """
+    Reads a batch manifest.
+
+    The manifest is a JSON list of sources, or an object with a `sources`
+    list. Each source has a `path` (or, for `dbapi` sources, a `driver` and
+    `connect` arguments) and optionally a `name` and a `type` of `csv`,
+    `sqlite` or `dbapi`. Relative paths are resolved against the manifest.
+
+    Returns:
+        The sources, each with a unique, filesystem-safe `name`.
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    sources = manifest.get("sources", []) if isinstance(manifest, dict) else manifest
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    resolved = []
+    names = set()
+    for index, source in enumerate(sources):
+        source = dict(source)
+        if source.get("path"):
+            source["path"] = os.path.join(base_dir, source["path"])
+        name = source.get("name") or _default_name(source, index)
+        source["name"] = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        if source["name"] in names:
+            raise ValueError(f"Duplicate source name in batch manifest: {source['name']}")
+        names.add(source["name"])
+        resolved.append(source)
+    return resolved
+
+def create_connector(source: Dict[str, Any]) -> BaseConnector:
+    """Creates the connector described by a manifest entry."""
+    kind = source.get("type")
+    path = source.get("path", "")
+    if kind is None:
+        kind = "sqlite" if path.endswith(SQLITE_EXTENSIONS) else "csv"
+    if kind == "csv":
+        return CsvConnector(filepath=path)
+    if kind == "sqlite":
+        return SqliteConnector(database_path=path)
+    if kind == "dbapi":
+        driver = importlib.import_module(source["driver"])
+        connect_args = source.get("connect", {})
+        return DbApiConnector(
+            lambda: driver.connect(**connect_args),
+            schema=source.get("schema", "public"),
+            paramstyle=driver.paramstyle
+        )
+    raise ValueError(f"Unknown source type: {kind}")
+
+def run_batch(
+    manifest_path: str,
+    output_root: str = "output/batch",
+    max_workers: Optional[int] = None,
+    force: bool = False,
+    orchestrator_factory: Callable[..., Any] = build_orchestrator
+) -> Dict[str, Any]:
+    """
+    Runs one pipeline per source in a manifest, several at a time.
+
+    Every source gets its own output directory and memory under
+    `output_root/<name>`. A source that fails is recorded as failed and the
+    others carry on. Sources share the process-wide model client, response
+    cache and model-call concurrency limit.
+
+    Args:
+        manifest_path: Path to the batch manifest (see `load_sources`).
+        output_root: Directory holding one output directory per source.
+        max_workers: Number of sources migrated at the same time.
+        force: Re-run every step of every source.
+        orchestrator_factory: Builds an orchestrator from a connector, a
+            memory manager and an `output_dir`.
+
+    Returns:
+        The batch summary, which is also written to
+        `output_root/batch_summary.json`.
+    """
+    sources = load_sources(manifest_path)
+    max_workers = max_workers or settings.BATCH_MAX_WORKERS
+    logger.info(f"Starting batch of {len(sources)} sources with {max_workers} workers...")
+    started_at = datetime.datetime.now().isoformat()
+    start = time.perf_counter()
+
+    def run_source(source: Dict[str, Any]) -> Dict[str, Any]:
+        return _run_source(source, output_root, force, orchestrator_factory)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="axon-batch") as executor:
+        results = list(executor.map(run_source, sources))
+
+    summary = {
+        "started_at": started_at,
+        "seconds": round(time.perf_counter() - start, 3),
+        "max_workers": max_workers,
+        "succeeded": sum(result["status"] == "succeeded" for result in results),
+        "failed": sum(result["status"] == "failed" for result in results),
+        "sources": results,
+    }
+    os.makedirs(output_root, exist_ok=True)
+    summary_path = os.path.join(output_root, "batch_summary.json")
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    for result in results:
+        logger.info(f"  {result['name']}: {result['status']} in {result['seconds']:.2f}s")
+    logger.info(
+        f"Batch finished in {summary['seconds']:.2f}s: {summary['succeeded']} succeeded, "
+        f"{summary['failed']} failed. Summary saved to {summary_path}"
+    )
+    return summary
+
+def _run_source(
+    source: Dict[str, Any],
+    output_root: str,
+    force: bool,
+    orchestrator_factory: Callable[..., Any]
+) -> Dict[str, Any]:
+    """Runs the pipeline for one source, turning any failure into a status."""
+    name = source["name"]
+    output_dir = os.path.join(output_root, name)
+    result = {"name": name, "output_dir": output_dir, "status": "failed", "error": None, "skipped_steps": []}
+    start = time.perf_counter()
+    logger.info(f"[{name}] Starting pipeline...")
+    try:
+        connector = create_connector(source)
+        memory_manager = MemoryManager(filepath=os.path.join(output_dir, "memory.json"))
+        orchestrator = orchestrator_factory(connector, memory_manager, output_dir=output_dir)
+        if orchestrator.run_pipeline(force=force):
+            result["status"] = "succeeded"
+        else:
+            result["error"] = orchestrator.last_error
+        result["skipped_steps"] = sorted(orchestrator.skipped_steps)
+    except Exception as e:
+        logger.error(f"[{name}] Pipeline could not run: {e}", exc_info=True)
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(f"[{name}] Pipeline {result['status']} in {result['seconds']:.2f}s.")
+    return result
+
+def _default_name(source: Dict[str, Any], index: int) -> str:
+    path = source.get("path")
+    if not path:
+        return f"source_{index + 1}"
+    name = os.path.basename(path)
+    for extension in (".gz",) + SQLITE_EXTENSIONS + (".csv",):
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+    return name
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for batch migrations."""
+    parser = argparse.ArgumentParser(description="Run the Axon pipeline for every source in a manifest.")
+    parser.add_argument("manifest", help="JSON manifest listing the sources to migrate.")
+    parser.add_argument("--output-dir", default="output/batch", help="Directory for per-source outputs and the summary.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of sources migrated at the same time.")
+    parser.add_argument("--force", action="store_true", help="Re-run every step of every source.")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    summary = run_batch(args.manifest, args.output_dir, args.workers, args.force)
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
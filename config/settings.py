@@ -10,7 +10,139 @@ GCP_REGION = "us-central1"
 GEMINI_MODEL_NAME = "gemini-2.5-pro"
 GEMINI_TEMPERATURE = 0.5
 GEMINI_MAX_OUTPUT_TOKENS = 8192
+# When False, agents use a placeholder client that returns a canned response
+# instead of calling Vertex AI.
+USE_VERTEX_MODEL = False
+# When True, pipeline steps stream model output to their files and the
+# dashboard as it arrives instead of waiting for the full response.
+STREAM_MODEL_RESPONSES = True
 
 # Logging Configuration
 LOGS_DIR = os.path.join(os.path.dirname(__file__), "..", "logs")
 LOG_FILE = os.path.join(LOGS_DIR, "axon.log")
+
+# Pipeline Scheduling
+# Maximum number of pipeline steps allowed to run at the same time.
+PIPELINE_MAX_WORKERS = 4
+
+# Model Call Concurrency
+# Maximum number of model calls in flight at once across all agents.
+MAX_CONCURRENT_MODEL_CALLS = 16
+
+# Fused Generation
+# When True, the plan, DDL and validation queries are generated with a single
+# model call instead of three (see agents/fused_agent.py).
+FUSED_ARTIFACT_GENERATION = False
+# Analyses larger than this many estimated tokens are sent in separate calls,
+# so the combined response fits in GEMINI_MAX_OUTPUT_TOKENS.
+FUSED_MAX_ANALYSIS_TOKENS = 2000
+
+# DDL Generation
+# When True, the DDL is generated from the source catalog and the analysis
+# relationships without a model call (see tools/ddl_generator.py).
+RULE_BASED_DDL = True
+# When True, rule-based DDL asks the model for a comment on each key table.
+# Otherwise the table descriptions from the analysis are used.
+DDL_MODEL_COMMENTS = False
+
+# Validation Queries
+# When True, row count, NULL and orphan checks are generated from templates
+# (see tools/validation_query_generator.py) and the model only writes
+# business-rule checks.
+TEMPLATE_VALIDATION_QUERIES = True
+# When False, no model call is made for business-rule checks.
+VALIDATION_BUSINESS_RULES = True
+# Schemas holding the source tables and the migrated tables. None leaves
+# table names unqualified.
+VALIDATION_SOURCE_SCHEMA = "source"
+VALIDATION_TARGET_SCHEMA = "target"
+
+# Index Advice
+# When True, indexes and partitioning are recommended by rules from the
+# foreign-key graph and the DDL (see tools/index_advisor.py), and saved as
+# SQL and JSON.
+INDEX_ADVISOR = True
+# When True, the model reviews the rule-based recommendations and adds its own.
+INDEX_ADVISOR_MODEL_REVIEW = False
+
+# Model Quotas
+# Per-minute quotas shared by every model call in the process. Tokens count
+# both the prompt and the response. Set to None to not enforce a quota.
+MODEL_REQUESTS_PER_MINUTE = 60
+MODEL_TOKENS_PER_MINUTE = 1000000
+# Response tokens reserved per call before the actual size is known.
+MODEL_ESTIMATED_OUTPUT_TOKENS = 1024
+# Model calls allowed in flight at first. The limit then grows while calls
+# answer within the latency target, and halves on rate-limit errors or slow
+# calls, up to MAX_CONCURRENT_MODEL_CALLS.
+MODEL_INITIAL_CONCURRENCY = 4
+MODEL_LATENCY_TARGET_SECONDS = 60.0
+
+# Model Call Resilience
+# Retries for transient model errors (unavailable, rate limited, timed out),
+# with exponential backoff and full jitter between attempts.
+MODEL_CALL_MAX_RETRIES = 3
+MODEL_CALL_BACKOFF_BASE_SECONDS = 1.0
+MODEL_CALL_BACKOFF_MAX_SECONDS = 30.0
+# Send a duplicate request when a call has not answered after this many
+# seconds and use whichever reply comes first. None disables hedging.
+MODEL_CALL_HEDGE_AFTER_SECONDS = None
+# Consecutive transient failures after which model calls fail fast, and how
+# long to wait before trying the model again.
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+CIRCUIT_BREAKER_RESET_SECONDS = 30.0
+
+# LLM Response Cache
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "output", "llm_cache")
+RESPONSE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+RESPONSE_CACHE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+# Model Response Parsing
+# Times the analysis prompt is re-sent when a response cannot be parsed or
+# repaired into a valid report.
+ANALYSIS_PARSE_MAX_RETRIES = 1
+
+# Schema Analysis Sharding
+# Schemas whose estimated prompt size exceeds this many tokens are split by
+# table into chunks of at most this size and analyzed concurrently.
+SCHEMA_SHARD_TOKEN_BUDGET = 20000
+
+# Memory Store
+# Number of past runs kept when the memory log is compacted. Compaction runs
+# once the log holds twice this many records.
+MEMORY_MAX_RECORDS = 1000
+# Dimension of the hashed n-gram vectors used for memory similarity search.
+MEMORY_VECTOR_DIM = 1024
+# Number of most similar past runs used as context for a new run.
+MEMORY_CONTEXT_TOP_K = 3
+
+# Prompt Budgets
+# Estimated token budget for a single prompt, per agent class. Low-priority
+# prompt sections such as context from previous runs are trimmed to fit.
+DEFAULT_PROMPT_TOKEN_BUDGET = 24000
+PROMPT_TOKEN_BUDGETS = {
+    "SourceAnalysisAgent": 48000,
+    "MigrationPlanAgent": 16000,
+    "SchemaTransformationAgent": 24000,
+    "DataValidationAgent": 24000,
+    "QueryOptimizationAgent": 32000,
+}
+
+# Source Connectors
+# Maximum number of connections a connector opens to read the catalog.
+CONNECTOR_POOL_SIZE = 4
+# Number of catalog rows fetched per round trip by DB-API connectors.
+CONNECTOR_FETCH_BATCH_SIZE = 1000
+# Rows per chunk when a CSV catalog is streamed with CsvConnector.iter_schema.
+CSV_CHUNK_SIZE = 100000
+
+# Schema Snapshots
+# Where artifacts are archived per schema fingerprint, so unchanged schemas can reuse them.
+SCHEMA_SNAPSHOT_DIR = "output/snapshots"
+# Largest share of tables that may change before a full re-analysis is done instead of a partial one.
+INCREMENTAL_ANALYSIS_MAX_FRACTION = 0.5
+
+# Batch Mode
+# Number of sources migrated at the same time by batch.py.
+BATCH_MAX_WORKERS = 4
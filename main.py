@@ -1,28 +1,30 @@
 # In file: main.py
 
+import argparse
 import logging
 import os
-import json
-import datetime
+from typing import List, Optional
 from config.logging_config import setup_logging
 from config import settings
 from agents.source_agent import SourceAnalysisAgent
 from agents.planning_agent import MigrationPlanAgent
 from agents.transformation_agent import SchemaTransformationAgent
+from agents.validation_agent import DataValidationAgent
+from agents.optimization_agent import QueryOptimizationAgent
+from agents.fused_agent import MigrationArtifactsAgent
+from orchestrator import STEP_PROMPTS, PipelineOrchestrator
 from tools.csv_connector import CsvConnector
-from tools.memory_manager import MemoryManager # Import the new tool
+from tools.database_connector import BaseConnector
+from tools.memory_manager import MemoryManager
 
-def main():
-    """The main entry point for the application."""
-    setup_logging()
-    logging.info("Starting Axon application pipeline...")
+def setup_data_source(schema_csv_path: str = "data/source_schema.csv") -> str:
+    """
+    Writes the sample schema CSV used for development, if it does not exist.
 
-    try:
-        # --- Setup Tools ---
-        memory_manager = MemoryManager()
-        
-        # --- Create a dummy CSV file for the CsvConnector to use ---
-        schema_csv_path = "data/source_schema.csv"
+    Returns:
+        The path to the schema CSV.
+    """
+    if not os.path.exists(schema_csv_path):
         os.makedirs(os.path.dirname(schema_csv_path), exist_ok=True)
         with open(schema_csv_path, "w") as f:
             f.write("table_name,column_name,data_type\n")
@@ -31,75 +33,66 @@ def main():
             f.write("orders,order_id,INTEGER\n")
             f.write("orders,customer_id,INTEGER\n")
             f.write("orders,order_date,TIMESTAMP\n")
+    return schema_csv_path
 
-        # === PRE-PIPELINE: Load Context from Memory ===
-        logging.info("\n[PIPELINE] Loading context from memory...")
-        context = memory_manager.get_context_for_prompt()
-
-        # === STEP 1: Run Source Analysis Agent ===
-        logging.info("\n[PIPELINE] Running Step 1: Source Analysis...")
-        csv_connector = CsvConnector(filepath=schema_csv_path)
-        analysis_agent = SourceAnalysisAgent(
-            connector=csv_connector,
-            model_name=settings.GEMINI_MODEL_NAME,
-            project=settings.GCP_PROJECT_ID,
-            location=settings.GCP_REGION
-        )
-        analysis_report_str = analysis_agent.run(context=context)
-        analysis_report_dict = json.loads(analysis_report_str)
-        
-        logging.info("--- Schema Analysis Report (Advanced) ---")
-        print(analysis_report_str)
-        
-        if "error" in analysis_report_dict:
-            logging.error("Source analysis failed. Halting pipeline.")
-            return
+def build_orchestrator(
+    connector: BaseConnector,
+    memory_manager: Optional[MemoryManager] = None,
+    socketio=None,
+    output_dir: Optional[str] = None,
+    fused: Optional[bool] = None
+) -> PipelineOrchestrator:
+    """Creates the agents and wires them into a pipeline orchestrator."""
+    agent_settings = dict(
+        model_name=settings.GEMINI_MODEL_NAME,
+        project=settings.GCP_PROJECT_ID,
+        location=settings.GCP_REGION
+    )
+    return PipelineOrchestrator(
+        connector=connector,
+        memory_manager=memory_manager or MemoryManager(),
+        analysis_agent=SourceAnalysisAgent(connector=connector, **agent_settings),
+        planning_agent=MigrationPlanAgent(**agent_settings),
+        transformation_agent=SchemaTransformationAgent(**agent_settings),
+        validation_agent=DataValidationAgent(**agent_settings),
+        optimization_agent=QueryOptimizationAgent(**agent_settings),
+        socketio=socketio,
+        output_dir=output_dir,
+        fused_agent=MigrationArtifactsAgent(**agent_settings),
+        fused=fused
+    )
 
-        # === STEP 2: Run Migration Planning Agent ===
-        logging.info("\n[PIPELINE] Running Step 2: Migration Planning...")
-        planning_agent = MigrationPlanAgent(
-            model_name=settings.GEMINI_MODEL_NAME,
-            project=settings.GCP_PROJECT_ID,
-            location=settings.GCP_REGION
-        )
-        plan_output_path = "output/migration_plan.md"
-        planning_agent.run(
-            schema_analysis=analysis_report_dict,
-            output_path=plan_output_path,
-            context=context
-        )
-        logging.info(f"--- Migration Plan Generated ---")
-        logging.info(f"Plan saved to: {plan_output_path}")
-        
-        # === STEP 3: Run Schema Transformation Agent ===
-        logging.info("\n[PIPELINE] Running Step 3: Schema Transformation...")
-        transformation_agent = SchemaTransformationAgent(
-            model_name=settings.GEMINI_MODEL_NAME,
-            project=settings.GCP_PROJECT_ID,
-            location=settings.GCP_REGION
-        )
-        sql_output_path = "output/schema.sql"
-        transformation_agent.run(
-            schema_analysis=analysis_report_dict,
-            output_path=sql_output_path,
-            context=context
-        )
-        logging.info(f"--- SQL Schema Generated ---")
-        logging.info(f"SQL script saved to: {sql_output_path}")
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Axon migration pipeline.")
+    parser.add_argument("--schema", help="Path to the schema CSV (.csv or .csv.gz). Defaults to the sample schema.")
+    parser.add_argument(
+        "--force",
+        action="append",
+        choices=sorted(STEP_PROMPTS) + ["all"],
+        default=[],
+        metavar="STEP",
+        help="Re-run a step even if its output is up to date. Repeat for several steps, or use 'all'."
+    )
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        default=None,
+        help="Generate the plan, DDL and validation queries with a single model call."
+    )
+    return parser.parse_args(argv)
 
-        # === POST-PIPELINE: Save Results to Memory ===
-        logging.info("\n[PIPELINE] Saving results to memory...")
-        new_memory = {
-            "timestamp": datetime.datetime.now().isoformat(),
-            "analysis": analysis_report_dict,
-            "plan_file": plan_output_path,
-            "sql_file": sql_output_path
-        }
-        memory_manager.save_memory(new_memory)
+def main(argv: Optional[List[str]] = None):
+    """The main entry point for the application."""
+    args = parse_args(argv)
+    setup_logging()
+    logging.info("Starting Axon application pipeline...")
 
-    except Exception as e:
-        logging.error(f"An application pipeline error occurred: {e}", exc_info=True)
+    schema_csv_path = args.schema or setup_data_source()
+    orchestrator = build_orchestrator(CsvConnector(filepath=schema_csv_path), fused=args.fused)
+    if "all" in args.force:
+        orchestrator.run_pipeline(force=True)
+    else:
+        orchestrator.run_pipeline(force_steps=args.force)
 
 if __name__ == "__main__":
     main()
-
@@ -1,20 +1,80 @@
 # In file: orchestrator.py
 
+import hashlib
 import json
 import logging
-from typing import Dict, Any
+import os
+import shutil
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
 
+import pandas as pd
+
+from agents.fused_agent import MigrationArtifactsAgent
 from agents.source_agent import SourceAnalysisAgent
 from agents.planning_agent import MigrationPlanAgent
 from agents.transformation_agent import SchemaTransformationAgent
 from agents.validation_agent import DataValidationAgent
 from agents.optimization_agent import QueryOptimizationAgent
+from config import settings
+from prompts.fused_prompt import FUSED_ARTIFACTS_PROMPT
+from prompts.optimization_prompt import OPTIMIZATION_PROMPT, OPTIMIZATION_REVIEW_PROMPT
+from prompts.planning_prompt import MIGRATION_PLAN_PROMPT
+from prompts.source_analysis_prompt import SCHEMA_ANALYSIS_PROMPT_ADVANCED
+from prompts.transformation_prompt import TABLE_COMMENTS_PROMPT, TRANSFORMATION_PROMPT
+from prompts.validation_prompt import BUSINESS_RULES_PROMPT, VALIDATION_PROMPT
+from tools.build_manifest import BuildManifest, hash_inputs
 from tools.memory_manager import MemoryManager
+from tools.prompt_builder import compact_json, estimate_tokens
 from tools.database_connector import BaseConnector
+from tools.schema_diff import SchemaDiff, diff_schemas
+from tools.step_scheduler import PipelineStep, StepScheduler
+
+# The prompt template behind each pipeline step.
+STEP_PROMPTS = {
+    "analysis": SCHEMA_ANALYSIS_PROMPT_ADVANCED,
+    "planning": MIGRATION_PLAN_PROMPT,
+    "transformation": TRANSFORMATION_PROMPT,
+    "validation": VALIDATION_PROMPT,
+    "optimization": OPTIMIZATION_PROMPT,
+}
+
+# The steps replaced by a single model call in fused mode.
+FUSED_STEPS = ("planning", "transformation", "validation")
+
+# The dashboard output panel fed by each streaming step.
+STEP_FILE_TYPES = {
+    "planning": "plan",
+    "transformation": "schema",
+    "validation": "validation",
+    "optimization": "optimization",
+}
 
 class PipelineOrchestrator:
     """
     Orchestrates the entire multi-agent pipeline for database migration.
+
+    The pipeline is described as a dependency graph of steps. Steps whose
+    inputs are ready run concurrently: planning, transformation and validation
+    only need the analysis report, while optimization waits for the DDL
+    produced by the transformation step.
+
+    Every run is stored with a fingerprint of the source schema. When the
+    schema is unchanged since a previous run, that run's analysis and
+    artifacts are restored instead of calling the model again. When it changed,
+    only the affected tables are re-analyzed and the DDL step emits an
+    `ALTER TABLE` migration for the difference.
+
+    Within a run, steps whose inputs are unchanged since their output was last
+    built are skipped, like make targets, so a prompt tweak only re-runs the
+    steps that use that prompt.
+
+    Steps stream model output to their files as it is generated and forward
+    each chunk to the dashboard as a `file_chunk` event.
+
+    In fused mode, planning, transformation and validation are replaced by a
+    single `fused` step that generates all three artifacts with one model
+    call, falling back to the separate agents if that fails.
     """
     def __init__(
         self,
@@ -24,8 +84,25 @@ class PipelineOrchestrator:
         planning_agent: MigrationPlanAgent,
         transformation_agent: SchemaTransformationAgent,
         validation_agent: DataValidationAgent,
-        optimization_agent: QueryOptimizationAgent
+        optimization_agent: QueryOptimizationAgent,
+        socketio=None,
+        scheduler: Optional[StepScheduler] = None,
+        output_dir: Optional[str] = None,
+        fused_agent: Optional[MigrationArtifactsAgent] = None,
+        fused: Optional[bool] = None
     ):
+        """
+        Initializes the PipelineOrchestrator.
+
+        Args:
+            output_dir: Directory for every file the pipeline writes. By
+                default artifacts go to `output/` and snapshots to
+                SCHEMA_SNAPSHOT_DIR.
+            fused_agent: Agent generating the plan, DDL and validation
+                queries in one call, used in fused mode.
+            fused: Whether to run in fused mode when a `fused_agent` is
+                given. Defaults to FUSED_ARTIFACT_GENERATION.
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.connector = connector
         self.memory_manager = memory_manager
@@ -34,87 +111,562 @@ class PipelineOrchestrator:
         self.transformation_agent = transformation_agent
         self.validation_agent = validation_agent
         self.optimization_agent = optimization_agent
-        
+        self.fused_agent = fused_agent
+        self.fused = settings.FUSED_ARTIFACT_GENERATION if fused is None else fused
+        self.socketio = socketio
+        self.scheduler = scheduler or StepScheduler()
+
         # Define output paths
-        self.plan_output_path = "output/migration_plan.md"
-        self.sql_output_path = "output/schema.sql"
-        self.validation_output_path = "output/validation_queries.sql"
-        self.optimization_output_path = "output/optimization_suggestions.sql"
+        self.output_dir = output_dir or "output"
+        self.plan_output_path = os.path.join(self.output_dir, "migration_plan.md")
+        self.sql_output_path = os.path.join(self.output_dir, "schema.sql")
+        self.validation_output_path = os.path.join(self.output_dir, "validation_queries.sql")
+        self.optimization_output_path = os.path.join(self.output_dir, "optimization_suggestions.sql")
+        self.index_advice_output_path = os.path.join(self.output_dir, "index_advice.json")
+        self.migration_output_path = os.path.join(self.output_dir, "schema_migration.sql")
+        self.analysis_output_path = os.path.join(self.output_dir, "source_analysis.json")
+        self.manifest_path = os.path.join(self.output_dir, "build_manifest.json")
+        self.snapshot_dir = os.path.join(output_dir, "snapshots") if output_dir else settings.SCHEMA_SNAPSHOT_DIR
+        self.skipped_steps = set()
+        self.last_error: Optional[str] = None
+        self.first_chunk_seconds: Dict[str, float] = {}
 
-    def run_pipeline(self):
+    def build_steps(
+        self,
+        context: str,
+        previous_run: Optional[Dict[str, Any]] = None,
+        schema_diff: Optional[SchemaDiff] = None,
+        fingerprint: Optional[str] = None,
+        force_steps: Iterable[str] = (),
+        schema_df: Optional[pd.DataFrame] = None
+    ) -> List[PipelineStep]:
         """
-        Executes the full, multi-step agentic pipeline.
+        Describes the pipeline as a dependency graph.
+
+        Each step hashes its inputs (prompt template, model settings, analysis
+        report and upstream artifacts) and is skipped, reusing its output file,
+        when the build manifest shows the output was built from the same inputs.
+
+        Args:
+            context: Context from previous runs, shared by all steps.
+            previous_run: The memory of the previous run, for incremental runs.
+            schema_diff: How the schema changed since `previous_run`. When
+                given, analysis is partial and the DDL step emits a migration.
+            fingerprint: The schema fingerprint. Analysis is only skipped when
+                it is known.
+            force_steps: Names of steps to run even if they are up to date.
+                In fused mode, forcing any fused step forces the fused call.
+            schema_df: The source catalog, from which the DDL and the standard
+                validation checks are generated when RULE_BASED_DDL and
+                TEMPLATE_VALIDATION_QUERIES are on.
         """
-        self.logger.info("Starting Axon application pipeline...")
-        full_context = ""
-        try:
-            # Load context from past runs
-            self.logger.info("\n[PIPELINE] Loading context from memory...")
-            past_runs = self.memory_manager.load_memories()
-            if past_runs:
-                full_context = json.dumps(past_runs, indent=2)
+        manifest = BuildManifest(self.manifest_path)
+        force_steps = set(force_steps)
+        # An incremental run emits the DDL without a model call, so there is little to fuse
+        fused = self._fused_mode() and schema_diff is None
+        if fused and force_steps & set(FUSED_STEPS):
+            force_steps.add("fused")
+        self.skipped_steps = set()
+        self.first_chunk_seconds = {}
+        catalog_hash = hash_inputs(schema_df.astype(str).to_dict("list")) if schema_df is not None else None
 
-            # Step 1: Source Analysis
-            self.logger.info("\n[PIPELINE] Running Step 1: Source Analysis...")
-            analysis_report_str = self.analysis_agent.run(context=full_context)
+        def analysis(_: Dict[str, Any]):
+            if schema_diff is not None:
+                analysis_report_str = self.analysis_agent.run(
+                    context=context,
+                    previous_analysis=previous_run["source_analysis"],
+                    schema_diff=schema_diff,
+                    schema_df=schema_df
+                )
+            else:
+                analysis_report_str = self.analysis_agent.run(context=context, schema_df=schema_df)
             analysis_report_dict = json.loads(analysis_report_str)
             self.logger.info("--- Schema Analysis Report (Advanced) ---")
             self.logger.info(json.dumps(analysis_report_dict, indent=2))
-
-            if analysis_report_dict.get("error"):
+            if analysis_report_dict.get("error") or analysis_report_dict.get("status") == "error":
                 raise ValueError("Source analysis failed. Halting pipeline.")
+            directory = os.path.dirname(self.analysis_output_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.analysis_output_path, "w") as f:
+                json.dump(analysis_report_dict, f, indent=2)
+            return analysis_report_dict, fingerprint is not None
+
+        def load_analysis() -> Dict[str, Any]:
+            with open(self.analysis_output_path) as f:
+                return json.load(f)
 
-            # Step 2: Migration Planning
-            self.logger.info("\n[PIPELINE] Running Step 2: Migration Planning...")
-            self.planning_agent.run(
-                schema_analysis=analysis_report_dict,
+        def planning(upstream: Dict[str, Any]):
+            built = self.planning_agent.run(
+                schema_analysis=upstream["analysis"],
                 output_path=self.plan_output_path,
-                context=full_context
+                on_chunk=self._chunk_forwarder("planning")
             )
-            self.logger.info("--- Migration Plan Generated ---")
             self.logger.info(f"Plan saved to: {self.plan_output_path}")
+            return self.plan_output_path, built
 
-            # Step 3: Schema Transformation
-            self.logger.info("\n[PIPELINE] Running Step 3: Schema Transformation...")
-            self.transformation_agent.run(
-                schema_analysis=analysis_report_dict,
+        def transformation(upstream: Dict[str, Any]):
+            if schema_diff is not None:
+                with open(previous_run["artifacts"]["transformation"]) as f:
+                    previous_sql = f.read()
+                generated_sql = self.transformation_agent.run_delta(
+                    schema_diff=schema_diff,
+                    previous_sql=previous_sql,
+                    output_path=self.sql_output_path,
+                    migration_output_path=self.migration_output_path,
+                    relationships=upstream["analysis"].get("relationships", []),
+                    schema_df=schema_df
+                )
+                self.logger.info(f"Schema migration saved to: {self.migration_output_path}")
+                return generated_sql, bool(generated_sql)
+            generated_sql = self.transformation_agent.run(
+                schema_analysis=upstream["analysis"],
                 output_path=self.sql_output_path,
-                context=full_context
+                on_chunk=self._chunk_forwarder("transformation"),
+                schema_df=schema_df
             )
-            self.logger.info("--- SQL Schema Generated ---")
             self.logger.info(f"SQL script saved to: {self.sql_output_path}")
-            
-            # Step 4: Data Validation
-            self.logger.info("\n[PIPELINE] Running Step 4: Data Validation...")
-            self.validation_agent.run(
-                schema_analysis=analysis_report_dict,
-                generated_sql=analysis_report_dict.get("generated_sql", ""), # Placeholder
+            return generated_sql, bool(generated_sql)
+
+        def load_sql() -> str:
+            with open(self.sql_output_path) as f:
+                return f.read()
+
+        def validation(upstream: Dict[str, Any]):
+            built = self.validation_agent.run(
+                schema_analysis=upstream["analysis"],
                 output_path=self.validation_output_path,
-                context=full_context
+                context=context,
+                on_chunk=self._chunk_forwarder("validation"),
+                schema_df=schema_df
             )
-            self.logger.info("--- Validation Queries Generated ---")
             self.logger.info(f"Validation script saved to: {self.validation_output_path}")
+            return self.validation_output_path, built
+
+        def fused_step(upstream: Dict[str, Any]):
+            analysis = upstream["analysis"]
+            artifacts = None
+            if estimate_tokens(compact_json(analysis)) <= settings.FUSED_MAX_ANALYSIS_TOKENS:
+                artifacts = self.fused_agent.run(
+                    schema_analysis=analysis,
+                    plan_output_path=self.plan_output_path,
+                    sql_output_path=self.sql_output_path,
+                    validation_output_path=self.validation_output_path,
+                    context=context
+                )
+            else:
+                self.logger.info("Schema analysis is too large for a fused call.")
+            if artifacts is None:
+                self.logger.warning("Generating the plan, DDL and validation queries with separate, concurrent calls.")
+                # The three calls are independent, as in the non-fused graph
+                separate = StepScheduler(max_workers=len(FUSED_STEPS)).run([
+                    PipelineStep(name, lambda _, func=func: func(upstream))
+                    for name, func in (("planning", planning), ("transformation", transformation), ("validation", validation))
+                ])
+                return {name: result for name, (result, _) in separate.items()}, all(built for _, built in separate.values())
+            for name, content in artifacts.items():
+                self._emit('file_content', {'file_type': STEP_FILE_TYPES[name], 'content': content})
+            self.logger.info(f"Plan, DDL and validation queries saved to: {self.output_dir}")
+            return {
+                "planning": self.plan_output_path,
+                "transformation": artifacts["transformation"],
+                "validation": self.validation_output_path,
+            }, True
 
-            # Step 5: Query Optimization
-            self.logger.info("\n[PIPELINE] Running Step 5: Query Optimization...")
-            self.optimization_agent.run(
-                generated_sql=analysis_report_dict.get("generated_sql", ""), # Placeholder
+        def load_fused() -> Dict[str, Any]:
+            return {
+                "planning": self.plan_output_path,
+                "transformation": load_sql(),
+                "validation": self.validation_output_path,
+            }
+
+        def upstream_sql(upstream: Dict[str, Any]) -> str:
+            if "fused" in upstream:
+                return upstream["fused"]["transformation"]
+            return upstream["transformation"]
+
+        def optimization(upstream: Dict[str, Any]):
+            generated_sql = upstream_sql(upstream)
+            if not generated_sql:
+                self.logger.warning("No DDL was generated; optimization runs on the analysis only.")
+            built = self.optimization_agent.run(
+                generated_sql=generated_sql,
+                schema_analysis=upstream["analysis"],
                 output_path=self.optimization_output_path,
-                context=full_context
+                context=context,
+                on_chunk=self._chunk_forwarder("optimization"),
+                advice_output_path=self.index_advice_output_path
             )
-            self.logger.info("--- Optimization Suggestions Generated ---")
             self.logger.info(f"Optimization script saved to: {self.optimization_output_path}")
+            return self.optimization_output_path, built
+
+        # Context from memory changes on every run, so it is left out of the
+        # input hashes; otherwise no step would ever be up to date.
+        def analysis_inputs(_: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            if fingerprint is None:
+                return None
+            return {**self._step_settings("analysis"), "schema_fingerprint": fingerprint}
+
+        def analysis_report_inputs(step: str):
+            return lambda upstream: {**self._step_settings(step), "analysis": upstream["analysis"]}
+
+        def transformation_inputs(upstream: Dict[str, Any]) -> Dict[str, Any]:
+            if schema_diff is not None:
+                return {
+                    "schema_diff": schema_diff.to_dict(),
+                    "previous_sql": load_previous_sql_hash(),
+                    "relationships": upstream["analysis"].get("relationships", []),
+                    "schema_catalog": catalog_hash,
+                }
+            inputs = {**self._step_settings("transformation"), "analysis": upstream["analysis"]}
+            if catalog_hash is not None and settings.RULE_BASED_DDL:
+                inputs.update(
+                    schema_catalog=catalog_hash,
+                    model_comments=settings.DDL_MODEL_COMMENTS,
+                    comments_prompt=TABLE_COMMENTS_PROMPT
+                )
+            return inputs
+
+        def validation_inputs(upstream: Dict[str, Any]) -> Dict[str, Any]:
+            inputs = {**self._step_settings("validation"), "analysis": upstream["analysis"]}
+            if catalog_hash is not None and settings.TEMPLATE_VALIDATION_QUERIES:
+                inputs.update(
+                    schema_catalog=catalog_hash,
+                    business_rules=settings.VALIDATION_BUSINESS_RULES,
+                    business_rules_prompt=BUSINESS_RULES_PROMPT,
+                    source_schema=settings.VALIDATION_SOURCE_SCHEMA,
+                    target_schema=settings.VALIDATION_TARGET_SCHEMA
+                )
+            return inputs
+
+        def load_previous_sql_hash() -> str:
+            with open(previous_run["artifacts"]["transformation"], "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+
+        def optimization_inputs(upstream: Dict[str, Any]) -> Dict[str, Any]:
+            inputs = {
+                **self._step_settings("optimization"),
+                "analysis": upstream["analysis"],
+                "generated_sql": upstream_sql(upstream)
+            }
+            if settings.INDEX_ADVISOR:
+                inputs.update(model_review=settings.INDEX_ADVISOR_MODEL_REVIEW, review_prompt=OPTIMIZATION_REVIEW_PROMPT)
+            return inputs
+
+        # The index advice JSON is written next to the optimization script
+        optimization_outputs = [self.index_advice_output_path] if settings.INDEX_ADVISOR else []
+
+        def step(name, func, inputs, output_path, load=None, depends_on=(), extra_outputs=()) -> PipelineStep:
+            return PipelineStep(
+                name,
+                self._skippable(name, func, inputs, output_path, load, manifest, name in force_steps, extra_outputs),
+                depends_on=depends_on
+            )
+
+        if fused:
+            return [
+                step("analysis", analysis, analysis_inputs, self.analysis_output_path, load_analysis),
+                step("fused", fused_step, analysis_report_inputs("fused"), self.plan_output_path, load_fused,
+                     depends_on=["analysis"], extra_outputs=[self.sql_output_path, self.validation_output_path]),
+                step("optimization", optimization, optimization_inputs, self.optimization_output_path,
+                     depends_on=["analysis", "fused"], extra_outputs=optimization_outputs),
+            ]
+        return [
+            step("analysis", analysis, analysis_inputs, self.analysis_output_path, load_analysis),
+            step("planning", planning, analysis_report_inputs("planning"), self.plan_output_path,
+                 depends_on=["analysis"]),
+            step("transformation", transformation, transformation_inputs, self.sql_output_path, load_sql,
+                 depends_on=["analysis"]),
+            step("validation", validation, validation_inputs, self.validation_output_path,
+                 depends_on=["analysis"]),
+            step("optimization", optimization, optimization_inputs, self.optimization_output_path,
+                 depends_on=["analysis", "transformation"], extra_outputs=optimization_outputs),
+        ]
+
+    def _skippable(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Tuple[Any, bool]],
+        inputs: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+        output_path: str,
+        load: Optional[Callable[[], Any]],
+        manifest: BuildManifest,
+        force: bool,
+        extra_outputs: Iterable[str] = ()
+    ) -> Callable[[Dict[str, Any]], Any]:
+        """
+        Wraps a step so it is skipped when its output is up to date.
+
+        `func` returns the step's result and whether its output was built
+        successfully; only successful builds are recorded in the manifest.
+        Skipped steps return `load()`, or the output path if there is no loader.
+        A step writing several files is only skipped if `extra_outputs` exist too.
+        """
+        def run(upstream: Dict[str, Any]) -> Any:
+            step_inputs = inputs(upstream)
+            input_hash = hash_inputs(step_inputs) if step_inputs is not None else None
+            if (input_hash and not force and manifest.is_up_to_date(name, input_hash, output_path)
+                    and all(os.path.exists(path) for path in extra_outputs)):
+                self.logger.info(f"Step '{name}' is up to date; reusing {output_path}.")
+                self.skipped_steps.add(name)
+                return load() if load is not None else output_path
+            result, built = func(upstream)
+            if input_hash and built and os.path.exists(output_path):
+                manifest.record(name, input_hash, output_path)
+            else:
+                manifest.invalidate(name)
+            return result
+        return run
+
+    def _step_settings(self, step: str) -> Dict[str, Any]:
+        """The prompt template and model settings a step's output depends on."""
+        agent = {
+            "analysis": self.analysis_agent,
+            "planning": self.planning_agent,
+            "transformation": self.transformation_agent,
+            "validation": self.validation_agent,
+            "optimization": self.optimization_agent,
+            "fused": self.fused_agent,
+        }[step]
+        return {
+            "prompt": FUSED_ARTIFACTS_PROMPT if step == "fused" else STEP_PROMPTS[step],
+            "model_name": str(getattr(agent, "model_name", "")),
+            "temperature": settings.GEMINI_TEMPERATURE,
+            "max_output_tokens": settings.GEMINI_MAX_OUTPUT_TOKENS,
+        }
+
+    def _pipeline_hash(self) -> str:
+        """Hashes the settings of every step, to tell whether a whole run can be reused."""
+        steps = list(STEP_PROMPTS) + (["fused"] if self._fused_mode() else [])
+        return hash_inputs({step: self._step_settings(step) for step in steps})
 
+    def _fused_mode(self) -> bool:
+        return self.fused and self.fused_agent is not None
+
+    def run_pipeline(self, force: bool = False, force_steps: Iterable[str] = ()) -> bool:
+        """
+        Executes the full, multi-step agentic pipeline.
+
+        Args:
+            force: Run every step even if the schema and settings are
+                unchanged since a previous run.
+            force_steps: Names of steps to run even if their outputs are up
+                to date; other steps are still skipped when possible.
+
+        Returns:
+            True if the run completed, False if it failed. The error of a
+            failed run is kept in `last_error`.
+        """
+        self.logger.info("Starting Axon application pipeline...")
+        force_steps = set(STEP_PROMPTS) if force else set(force_steps)
+        unknown = force_steps - set(STEP_PROMPTS)
+        if unknown:
+            raise ValueError(f"Unknown pipeline steps: {', '.join(sorted(unknown))}")
+        self.last_error = None
+        try:
+            schema_df = self._read_schema()
+            fingerprint = self.connector.get_schema_fingerprint(schema_df) if schema_df is not None else None
+            if fingerprint and not force_steps and self._reuse_previous_run(fingerprint):
+                return True
+            previous_run, schema_diff = (None, None) if force else self._diff_against_previous_run(schema_df)
+
+            # Load context from the past runs most similar to this schema
+            self.logger.info("\n[PIPELINE] Loading context from memory...")
+            full_context = self.memory_manager.get_context_for_prompt(query=self._schema_query(schema_df))
+
+            self.logger.info("\n[PIPELINE] Running pipeline steps...")
+            results = self.scheduler.run(
+                self.build_steps(full_context, previous_run, schema_diff, fingerprint, force_steps, schema_df),
+                on_start=self._on_step_start,
+                on_finish=self._on_step_finish
+            )
+            if self.skipped_steps:
+                self.logger.info(f"Skipped up-to-date steps: {', '.join(sorted(self.skipped_steps))}")
 
             # Save the results of this run to memory
             self.logger.info("\n[PIPELINE] Saving results to memory...")
             self.memory_manager.save_memory({
-                "source_analysis": analysis_report_dict,
+                "source_analysis": results["analysis"],
                 "migration_plan_path": self.plan_output_path,
                 "generated_sql_path": self.sql_output_path,
                 "validation_queries_path": self.validation_output_path,
-                "optimization_suggestions_path": self.optimization_output_path
+                "optimization_suggestions_path": self.optimization_output_path,
+                "schema_fingerprint": fingerprint,
+                "schema_diff": schema_diff.to_dict() if schema_diff is not None else None,
+                "analysis_settings_hash": hash_inputs(self._step_settings("analysis")),
+                "pipeline_hash": self._pipeline_hash(),
+                **(self._archive_run(fingerprint, schema_df) if fingerprint else {})
             })
+            return True
 
         except Exception as e:
             self.logger.error(f"An application pipeline error occurred: {e}", exc_info=True)
+            self.last_error = str(e)
+            return False
+
+    def _read_schema(self) -> Optional[pd.DataFrame]:
+        """Reads the current source schema, or returns None if it can't be read."""
+        try:
+            self.connector.connect()
+            try:
+                return self.connector.get_schema()
+            finally:
+                self.connector.disconnect()
+        except Exception as e:
+            self.logger.warning(f"Could not read the schema before the run: {e}")
+            return None
+
+    def _schema_query(self, schema_df: Optional[pd.DataFrame]) -> str:
+        """
+        Describes the current schema by its table and column names, for
+        similarity search over past runs.
+        """
+        if schema_df is None or "table_name" not in schema_df.columns:
+            return ""
+        names = list(schema_df["table_name"].astype(str).unique())
+        if "column_name" in schema_df.columns:
+            names += list(schema_df["column_name"].astype(str).unique())
+        return " ".join(names)
+
+    def _artifact_paths(self) -> Dict[str, str]:
+        """The output files of the steps, keyed by step name or, for extra files, artifact name."""
+        paths = {
+            "planning": self.plan_output_path,
+            "transformation": self.sql_output_path,
+            "validation": self.validation_output_path,
+            "optimization": self.optimization_output_path,
+        }
+        if settings.INDEX_ADVISOR:
+            paths["index_advice"] = self.index_advice_output_path
+        return paths
+
+    def _archive_run(self, fingerprint: str, schema_df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Copies this run's artifacts and schema to a directory named by the
+        schema fingerprint.
+
+        Returns:
+            The memory fields locating the archive: `artifacts`, mapping step
+            names to archived files, and `schema_snapshot`.
+        """
+        snapshot = os.path.join(self.snapshot_dir, fingerprint)
+        os.makedirs(snapshot, exist_ok=True)
+        archived = {}
+        for step, path in self._artifact_paths().items():
+            if os.path.exists(path):
+                archived[step] = os.path.join(snapshot, os.path.basename(path))
+                shutil.copyfile(path, archived[step])
+        schema_path = os.path.join(snapshot, "schema.csv.gz")
+        schema_df.to_csv(schema_path, index=False)
+        return {"artifacts": archived, "schema_snapshot": schema_path}
+
+    def _diff_against_previous_run(self, schema_df: Optional[pd.DataFrame]):
+        """
+        Compares the current schema with the one of the latest run.
+
+        Returns:
+            The latest run's memory and the SchemaDiff, or `(None, None)` if
+            there is no usable previous run to build on or the schema is
+            unchanged, in which case the steps run in full and the build
+            manifest skips those that are up to date.
+        """
+        previous = self.memory_manager.load_latest_memory()
+        if schema_df is None or not isinstance(previous, dict):
+            return None, None
+        analysis = previous.get("source_analysis")
+        snapshot = previous.get("schema_snapshot")
+        previous_sql = (previous.get("artifacts") or {}).get("transformation")
+        if (not isinstance(analysis, dict) or analysis.get("error")
+                or previous.get("analysis_settings_hash") != hash_inputs(self._step_settings("analysis"))
+                or not snapshot or not os.path.exists(snapshot)
+                or not previous_sql or not os.path.exists(previous_sql)):
+            return None, None
+        try:
+            schema_diff = diff_schemas(pd.read_csv(snapshot, keep_default_na=False), schema_df)
+        except Exception as e:
+            self.logger.warning(f"Could not compare with the previous schema snapshot: {e}")
+            return None, None
+        if schema_diff.is_empty:
+            return None, None
+        self.logger.info(
+            f"Schema changed since the previous run: {len(schema_diff.added_tables)} tables added, "
+            f"{len(schema_diff.dropped_tables)} dropped, {len(schema_diff.changed_tables)} changed."
+        )
+        return previous, schema_diff
+
+    def _reuse_previous_run(self, fingerprint: str) -> bool:
+        """
+        Restores the analysis and artifacts of a previous run of the same schema.
+
+        Returns:
+            True if a complete previous run was restored, False if the
+            pipeline has to run.
+        """
+        previous = self.memory_manager.find_by_fingerprint(fingerprint)
+        if not previous or not previous.get("source_analysis"):
+            return False
+        if previous.get("pipeline_hash") != self._pipeline_hash():
+            self.logger.info("Schema is unchanged, but prompts or model settings changed since that run.")
+            return False
+        artifacts = previous.get("artifacts") or {}
+        targets = self._artifact_paths()
+        if set(artifacts) != set(targets) or not all(os.path.exists(path) for path in artifacts.values()):
+            self.logger.info("Schema is unchanged, but the previous run's artifacts are incomplete. Re-running.")
+            return False
+
+        self.logger.info(f"Schema is unchanged (fingerprint {fingerprint[:12]}). Reusing the previous run.")
+        self._emit('status_update', {'step': 'analysis', 'status': 'complete', 'message': 'analysis reused, schema unchanged.'})
+        for step, path in targets.items():
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            shutil.copyfile(artifacts[step], path)
+            if step in STEP_PROMPTS:
+                self._emit('status_update', {'step': step, 'status': 'complete', 'message': f'{step} reused, schema unchanged.'})
+        # The restored files were not built from the inputs the manifest recorded
+        BuildManifest(self.manifest_path).invalidate()
+        return True
+
+    def _chunk_forwarder(self, step: str) -> Optional[Callable[[str], None]]:
+        """
+        Returns a callback that forwards a step's streamed output to the dashboard.
+
+        The time from the call to the first chunk is logged, reported to the
+        dashboard and kept in `first_chunk_seconds`. Returns None when
+        streaming is disabled, so the step waits for the full response.
+        """
+        if not settings.STREAM_MODEL_RESPONSES:
+            return None
+        file_type = STEP_FILE_TYPES[step]
+        started = time.perf_counter()
+
+        def forward(chunk: str):
+            if step not in self.first_chunk_seconds:
+                seconds = time.perf_counter() - started
+                self.first_chunk_seconds[step] = seconds
+                self.logger.info(f"{step}: first output after {seconds:.2f}s.")
+                self._emit('status_update', {'step': step, 'status': 'running', 'message': f'{step} streaming, first output after {seconds:.2f}s.'})
+            self._emit('file_chunk', {'file_type': file_type, 'chunk': chunk})
+        return forward
+
+    def _emit(self, event: str, payload: Dict[str, Any]):
+        """Forwards an event to the dashboard, if one is attached."""
+        if self.socketio is not None:
+            self.socketio.emit(event, payload)
+
+    def _on_step_start(self, step: str):
+        for name in self._dashboard_steps(step):
+            self._emit('status_update', {'step': name, 'status': 'running', 'message': f'{name} started.'})
+
+    def _on_step_finish(self, step: str, error: Optional[Exception]):
+        for name in self._dashboard_steps(step):
+            if error is None and step in self.skipped_steps:
+                self._emit('status_update', {'step': name, 'status': 'complete', 'message': f'{name} up to date, skipped.'})
+            elif error is None:
+                self._emit('status_update', {'step': name, 'status': 'complete', 'message': f'{name} complete.'})
+            else:
+                self._emit('status_update', {'step': name, 'status': 'error', 'message': str(error)})
+
+    def _dashboard_steps(self, step: str) -> Iterable[str]:
+        """The dashboard shows the fused step as the three steps it replaces."""
+        return FUSED_STEPS if step == "fused" else (step,)
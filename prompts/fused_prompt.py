@@ -0,0 +1,25 @@
+# In file: prompts/fused_prompt.py
+
+FUSED_ARTIFACTS_PROMPT = """
+You are a database migration expert. Based on the following JSON schema analysis, produce three migration artifacts in a single response.
+
+1.  `migration_plan`: A high-level, step-by-step migration plan in Markdown with the sections
+    "## 1. Executive Summary", "## 2. Pre-Migration Steps", "## 3. Migration Sequence" (dimension tables before fact tables, with the reasoning)
+    and "## 4. Post-Migration Validation".
+2.  `schema_sql`: A complete SQL script with a `CREATE TABLE` statement for each table in `key_tables`, using standard SQL data types,
+    a primary key for each table (typically the `_id` column) and comments explaining each table's purpose.
+3.  `validation_sql`: A SQL script of commented validation queries: row count checks comparing source and target for each table,
+    NULL checks for important columns such as IDs and names, and orphan-record checks for each relationship.
+
+Respond with a single JSON object with exactly the string keys `migration_plan`, `schema_sql` and `validation_sql`, and nothing else.
+
+CONTEXT FROM PREVIOUS RUN:
+---
+{context}
+---
+
+SCHEMA ANALYSIS:
+```json
+{schema_analysis_json}
+```
+"""
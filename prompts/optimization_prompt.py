@@ -24,3 +24,32 @@ GENERATED `CREATE TABLE` SCRIPT:
 {generated_sql}
 ```
 """
+
+OPTIMIZATION_REVIEW_PROMPT = """
+You are an expert database performance tuning specialist. The index and partitioning recommendations below were generated
+by rules from the foreign-key graph of the `CREATE TABLE` script. Review them against the schema analysis.
+
+Write only SQL comments and statements that add to the recommendations: indexes the rules missed, recommendations you would
+drop and why, and other optimizations worth considering. Do not repeat the recommendations, and do not include any text or
+formatting outside of the SQL code itself.
+
+CONTEXT FROM PREVIOUS RUN:
+---
+{context}
+---
+
+ORIGINAL SCHEMA ANALYSIS:
+```json
+{schema_analysis_json}
+```
+
+GENERATED `CREATE TABLE` SCRIPT:
+```sql
+{generated_sql}
+```
+
+RULE-BASED RECOMMENDATIONS:
+```sql
+{index_sql}
+```
+"""
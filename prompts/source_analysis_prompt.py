@@ -46,3 +46,40 @@ Schema:
 ```
 """
 
+
+# Appended to the analysis prompt when a large schema is analyzed in parts
+SCHEMA_ANALYSIS_SHARD_SUFFIX = """
+This schema is part {shard_number} of {shard_count} of a larger database. Only describe the tables shown above in `key_tables`.
+Relationships may point to tables outside this part. The tables outside this part that its `*_id` columns refer to are listed below with their identifier columns, so you can reference them.
+
+Table directory:
+```json
+{table_directory}
+```
+"""
+
+# Appended to the analysis prompt when only the changed part of a schema is re-analyzed
+SCHEMA_ANALYSIS_INCREMENTAL_SUFFIX = """
+These tables were added or changed since the database was last analyzed, or are related to tables that changed. Only describe the tables shown above in `key_tables`.
+Relationships may point to other tables of the database. The tables that these tables' `*_id` columns refer to are listed below with their identifier columns, so you can reference them.
+
+Table directory:
+```json
+{table_directory}
+```
+"""
+
+# Appended to the analysis prompt when the previous response could not be parsed
+SCHEMA_ANALYSIS_RETRY_SUFFIX = """
+Your previous response to this request could not be used: {error}
+Respond again with a single, complete JSON object with the keys `summary`, `key_tables` and `relationships`, and nothing else.
+"""
+
+# Appended to the analysis prompt when relationships were inferred up front
+SCHEMA_ANALYSIS_SEED_SUFFIX = """
+The following relationships were already inferred from column naming conventions and type compatibility.
+Include them in `relationships` and add any others you can identify:
+```json
+{seed_relationships}
+```
+"""
@@ -15,3 +15,15 @@ Here is the schema analysis:
 {schema_analysis_json}
 ```
 """
+
+TABLE_COMMENTS_PROMPT = """
+Act as an expert database architect. The SQL DDL for the tables in the following JSON schema analysis has already been generated.
+Write a one-sentence comment describing the purpose of each table listed in `key_tables`, for use as a SQL comment above its `CREATE TABLE` statement.
+
+Respond with a single JSON object mapping each table name to its comment, and nothing else.
+
+Here is the schema analysis:
+```json
+{schema_analysis_json}
+```
+"""
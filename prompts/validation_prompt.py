@@ -21,3 +21,22 @@ SCHEMA ANALYSIS:
 {schema_analysis_json}
 ```
 """
+
+BUSINESS_RULES_PROMPT = """
+You are a data quality assurance expert. Row count, NULL and orphan-record checks for the following schema have already been generated.
+Write only additional SQL validation queries for business rules the data should satisfy after migration, such as value ranges,
+allowed status values, date ordering and totals that must reconcile. Tables are in the `{target_schema}` schema.
+
+Use comments to explain the purpose of each query. Do not include any text or formatting outside of the SQL code itself.
+If the analysis suggests no business rules, return only a SQL comment saying so.
+
+CONTEXT FROM PREVIOUS RUN:
+---
+{context}
+---
+
+SCHEMA ANALYSIS:
+```json
+{schema_analysis_json}
+```
+"""
@@ -3,7 +3,9 @@
 import unittest
 import pandas as pd
 import json
-from unittest.mock import MagicMock, patch
+import os
+import tempfile
+from unittest.mock import AsyncMock, MagicMock
 from agents.source_agent import SourceAnalysisAgent
 from tools.csv_connector import CsvConnector
 from tools.schema_parser import SchemaParser
@@ -27,13 +29,19 @@ class TestAdvancedAnalysis(unittest.TestCase):
     def test_csv_connector_get_schema(self):
         """Tests that the CsvConnector can read a schema from a CSV."""
         csv_data = "table_name,column_name,data_type\nusers,id,int\nusers,name,string"
-        
-        # We use patch from unittest.mock to simulate reading a file
-        with patch("pandas.read_csv", return_value=pd.read_csv(pd.io.common.StringIO(csv_data))) as mock_read_csv:
-            schema = self.mock_connector.get_schema()
-            self.assertIsInstance(schema, pd.DataFrame)
-            self.assertEqual(len(schema), 2)
-            mock_read_csv.assert_called_with("dummy_path.csv")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "schema.csv")
+            with open(filepath, "w") as f:
+                f.write(csv_data)
+            connector = CsvConnector(filepath=filepath)
+            connector.connect()
+            schema = connector.get_schema()
+            connector.disconnect()
+
+        self.assertIsInstance(schema, pd.DataFrame)
+        self.assertEqual(len(schema), 2)
+        self.assertIsInstance(schema["table_name"].dtype, pd.CategoricalDtype)
 
     def test_schema_parser_handles_structured_json(self):
         """Tests that the SchemaParser can correctly parse a JSON response."""
@@ -79,6 +87,77 @@ class TestAdvancedAnalysis(unittest.TestCase):
         result_dict = json.loads(result_str)
         self.assertEqual(result_dict["summary"], "Database for customers and orders.")
 
+    def test_schema_parser_sharded_analysis_merges_reports(self):
+        """Tests that a large schema is split by table and shard reports are merged."""
+        schema_df = pd.DataFrame({
+            "table_name": ["customers", "customers", "orders", "orders", "orders"],
+            "column_name": ["customer_id", "customer_name", "order_id", "customer_id", "order_date"],
+            "data_type": ["INTEGER", "VARCHAR", "INTEGER", "INTEGER", "TIMESTAMP"]
+        })
+        customers_report = {
+            "summary": "Customer data.",
+            "key_tables": [{"table_name": "customers", "role": "Dimension", "description": "Customers."}],
+            "relationships": [
+                {"from_table": "customers", "from_column": "customer_id", "to_table": "orders",
+                 "to_column": "customer_id", "relationship_type": "One-to-Many"}
+            ]
+        }
+        orders_report = {
+            "summary": "Order data.",
+            "key_tables": [{"table_name": "orders", "role": "Fact", "description": "Orders."}],
+            "relationships": [
+                {"from_table": "orders", "from_column": "customer_id", "to_table": "customers",
+                 "to_column": "customer_id", "relationship_type": "Many-to-One"},
+                {"from_table": "orders", "from_column": "region_id", "to_table": "regions",
+                 "to_column": "region_id", "relationship_type": "Many-to-One"}
+            ]
+        }
+
+        async def fake_aexecute(prompt):
+            return json.dumps(customers_report if '"customer_name"' in prompt else orders_report)
+
+        self.agent._aexecute_prompt = AsyncMock(side_effect=fake_aexecute)
+        parser = SchemaParser(agent=self.agent, shard_token_budget=60)
+
+        self.assertEqual(len(parser.split_into_shards(schema_df)), 2)
+        result = parser.analyze_schema(schema_df, "{schema_json}")
+
+        self.assertEqual(self.agent._aexecute_prompt.await_count, 2)
+        self.assertEqual([t["table_name"] for t in result["key_tables"]], ["customers", "orders"])
+        # Both shards reported the same relationship from opposite ends; the
+        # reference to a table outside the schema is dropped.
+        self.assertEqual(result["relationships"], [
+            {"from_table": "orders", "from_column": "customer_id", "to_table": "customers",
+             "to_column": "customer_id", "relationship_type": "Many-to-One"}
+        ])
+
+    def test_shard_directory_lists_only_referenced_tables(self):
+        """Tests that a shard sees only the outside tables it references, and that they count against its budget."""
+        rows = []
+        for table in ["customers", "products", "regions"]:
+            rows += [(table, f"{table[:-1]}_id", "INTEGER"), (table, f"{table[:-1]}_name", "VARCHAR")]
+        rows += [("orders", "order_id", "INTEGER"), ("orders", "customer_id", "INTEGER"),
+                 ("orders", "product_id", "INTEGER"),
+                 ("suppliers", "supplier_id", "INTEGER"), ("suppliers", "supplier_name", "VARCHAR")]
+        schema_df = pd.DataFrame(rows, columns=["table_name", "column_name", "data_type"])
+        prompts = []
+
+        async def fake_aexecute(prompt):
+            prompts.append(prompt)
+            return json.dumps({"summary": "Part.", "key_tables": [], "relationships": []})
+
+        self.agent._aexecute_prompt = AsyncMock(side_effect=fake_aexecute)
+        # regions and orders fit in 100 tokens on their own, but not with the directory orders needs
+        parser = SchemaParser(agent=self.agent, shard_token_budget=100)
+        self.assertEqual(parser.estimate_tokens(schema_df[schema_df["table_name"].isin(["regions", "orders"])]), 92)
+        shards = [shard["table_name"].unique().tolist() for shard in parser.split_into_shards(schema_df)]
+        self.assertEqual(shards, [["customers", "products"], ["regions"], ["orders"], ["suppliers"]])
+
+        parser.analyze_schema(schema_df, "{schema_json}")
+        orders_prompt = next(prompt for prompt in prompts if '"order_id"' in prompt)
+        directory = json.loads(orders_prompt.split("```json")[1].split("```")[0])
+        self.assertEqual(directory, {"customers": ["customer_id"], "products": ["product_id"]})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,7 @@
+import asyncio
 import unittest
 from agents.base_agent import BaseAgent
+from tools import async_runtime
 
 class TestBaseAgent(unittest.TestCase):
     """Unit tests for the BaseAgent class."""
@@ -28,5 +30,49 @@ class TestBaseAgent(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             agent.run()
 
+    def test_async_execution_respects_concurrency_limit(self):
+        """Tests that concurrent async prompts never exceed the shared limit."""
+        agent = BaseAgent(
+            model_name="test-model",
+            project="test-project",
+            location="us-central1",
+            use_cache=False
+        )
+        state = {"in_flight": 0, "peak": 0}
+
+        async def fake_generate(prompt):
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+            return f"response to {prompt}"
+
+        agent._agenerate = fake_generate
+        async_runtime.set_concurrency_limit(3)
+        try:
+            async def fan_out():
+                return await asyncio.gather(*(agent._aexecute_prompt(f"p{i}") for i in range(12)))
+            responses = asyncio.run(fan_out())
+        finally:
+            async_runtime.set_concurrency_limit(async_runtime.settings.MAX_CONCURRENT_MODEL_CALLS)
+
+        self.assertEqual(responses[5], "response to p5")
+        self.assertEqual(state["peak"], 3)
+
+    def test_sync_execution_wraps_async_path(self):
+        """Tests that _execute_prompt returns the async path's response."""
+        agent = BaseAgent(
+            model_name="test-model",
+            project="test-project",
+            location="us-central1",
+            use_cache=False
+        )
+
+        async def fake_generate(prompt):
+            return "sync ok"
+
+        agent._agenerate = fake_generate
+        self.assertEqual(agent._execute_prompt("hello"), "sync ok")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
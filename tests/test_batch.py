@@ -0,0 +1,104 @@
+# In file: tests/test_batch.py
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from batch import load_sources, run_batch
+from orchestrator import PipelineOrchestrator
+
+CSV_DATA = "table_name,column_name,data_type\ncustomers,customer_id,INTEGER\n"
+
+class TestBatch(unittest.TestCase):
+    """
+    Tests for running the pipeline over a manifest of sources.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        for name in ("shop", "crm"):
+            with open(os.path.join(self.tmp_dir.name, f"{name}.csv"), "w") as f:
+                f.write(CSV_DATA)
+        self.manifest_path = os.path.join(self.tmp_dir.name, "sources.json")
+        with open(self.manifest_path, "w") as f:
+            json.dump({"sources": [
+                {"path": "shop.csv"},
+                {"name": "crm", "path": "crm.csv", "type": "csv"},
+                {"name": "broken", "path": "missing.csv"},
+            ]}, f)
+        self.output_root = os.path.join(self.tmp_dir.name, "out")
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_orchestrator(self, connector, memory_manager, output_dir):
+        """Builds an orchestrator whose agents are mocks."""
+        def analyze(context, schema_df=None):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            try:
+                connector.connect()
+                connector.disconnect()
+                time.sleep(0.05)
+                return json.dumps({"summary": output_dir, "key_tables": [], "relationships": []})
+            finally:
+                with self.lock:
+                    self.active -= 1
+
+        analysis_agent = MagicMock()
+        analysis_agent.run.side_effect = analyze
+        transformation_agent = MagicMock()
+        transformation_agent.run.return_value = "CREATE TABLE customers (customer_id INTEGER);"
+        return PipelineOrchestrator(
+            connector=connector,
+            memory_manager=memory_manager,
+            analysis_agent=analysis_agent,
+            planning_agent=MagicMock(),
+            transformation_agent=transformation_agent,
+            validation_agent=MagicMock(),
+            optimization_agent=MagicMock(),
+            output_dir=output_dir
+        )
+
+    def test_load_sources_names_and_paths(self):
+        """Tests that sources get unique names and manifest-relative paths."""
+        sources = load_sources(self.manifest_path)
+        self.assertEqual([source["name"] for source in sources], ["shop", "crm", "broken"])
+        self.assertEqual(sources[0]["path"], os.path.join(self.tmp_dir.name, "shop.csv"))
+
+    def test_batch_isolates_sources_and_failures(self):
+        """Tests that each source runs in its own directory and a failure doesn't stop the rest."""
+        summary = run_batch(self.manifest_path, self.output_root, max_workers=2,
+                            orchestrator_factory=self.make_orchestrator)
+
+        statuses = {result["name"]: result["status"] for result in summary["sources"]}
+        self.assertEqual(statuses, {"shop": "succeeded", "crm": "succeeded", "broken": "failed"})
+        self.assertEqual((summary["succeeded"], summary["failed"]), (2, 1))
+        self.assertIsNotNone(summary["sources"][2]["error"])
+        self.assertTrue(all(result["seconds"] >= 0 for result in summary["sources"]))
+        self.assertLessEqual(self.max_active, 2)
+
+        for name in ("shop", "crm"):
+            with open(os.path.join(self.output_root, name, "source_analysis.json")) as f:
+                self.assertEqual(json.load(f)["summary"], os.path.join(self.output_root, name))
+            self.assertTrue(os.path.exists(os.path.join(self.output_root, name, "memory.jsonl")))
+
+        with open(os.path.join(self.output_root, "batch_summary.json")) as f:
+            self.assertEqual(json.load(f)["failed"], 1)
+
+    def test_duplicate_names_are_rejected(self):
+        """Tests that two sources cannot share an output directory."""
+        with open(self.manifest_path, "w") as f:
+            json.dump([{"path": "shop.csv"}, {"path": "shop.csv"}], f)
+        with self.assertRaises(ValueError):
+            load_sources(self.manifest_path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+# In file: tests/test_csv_connector.py
+
+import gzip
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from tools.csv_connector import CsvConnector
+
+CSV_DATA = (
+    "table_name,column_name,data_type\n"
+    "customers,customer_id,INTEGER\n"
+    "customers,customer_name,VARCHAR\n"
+    "orders,order_id,INTEGER\n"
+    "orders,customer_id,INTEGER\n"
+    "orders,order_date,TIMESTAMP\n"
+)
+
+# Rows in the synthetic catalog used by the benchmark. Set AXON_BENCHMARK_ROWS
+# to run it, e.g. AXON_BENCHMARK_ROWS=5000000.
+BENCHMARK_ROWS = int(os.environ.get("AXON_BENCHMARK_ROWS", "0"))
+
+def write_synthetic_catalog(filepath: str, rows: int, tables: int = 20000):
+    """Writes a catalog export with `rows` columns spread over `tables` tables."""
+    rng = np.random.default_rng(0)
+    types = np.array(["INTEGER", "BIGINT", "VARCHAR(255)", "TEXT", "TIMESTAMP", "DATE", "NUMERIC(10,2)", "BOOLEAN"])
+    pd.DataFrame({
+        "table_name": np.char.add("table_", (np.arange(rows) * tables // rows).astype(str)),
+        "column_name": np.char.add("column_", (np.arange(rows) % 200).astype(str)),
+        "data_type": types[rng.integers(0, len(types), rows)],
+    }).to_csv(filepath, index=False)
+
+class TestCsvConnector(unittest.TestCase):
+    """
+    Tests for the CSV schema connector.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tmp_dir.name, "schema.csv")
+        with open(self.filepath, "w") as f:
+            f.write(CSV_DATA)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_schema_uses_categorical_dtypes(self):
+        """Tests that low-cardinality columns are read as categoricals."""
+        connector = CsvConnector(filepath=self.filepath)
+        connector.connect()
+        schema_df = connector.get_schema()
+        connector.disconnect()
+
+        self.assertIsInstance(schema_df["table_name"].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(schema_df["data_type"].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(schema_df["table_name"].cat.categories), ["customers", "orders"])
+        self.assertEqual(len(schema_df), 5)
+
+    def test_file_is_opened_once_per_run(self):
+        """Tests that connect opens the file and reads reuse the same handle."""
+        connector = CsvConnector(filepath=self.filepath)
+        with patch("builtins.open", wraps=open) as mock_open:
+            connector.connect()
+            first = connector.get_schema()
+            second = connector.get_schema()
+            connector.disconnect()
+
+        mock_open.assert_called_once_with(self.filepath, "rb")
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_gzip_input(self):
+        """Tests that a .csv.gz catalog is decompressed transparently."""
+        gz_path = self.filepath + ".gz"
+        with gzip.open(gz_path, "wt") as f:
+            f.write(CSV_DATA)
+
+        connector = CsvConnector(filepath=gz_path)
+        connector.connect()
+        schema_df = connector.get_schema()
+        connector.disconnect()
+
+        self.assertEqual(list(schema_df["column_name"])[:2], ["customer_id", "customer_name"])
+
+    def test_iter_schema_streams_chunks(self):
+        """Tests that the iterator mode yields the file in chunks."""
+        connector = CsvConnector(filepath=self.filepath, chunksize=2)
+        connector.connect()
+        chunks = list(connector.iter_schema())
+        connector.disconnect()
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(pd.concat(chunks)["column_name"].tolist()[-1], "order_date")
+
+    def test_missing_file_fails_to_connect(self):
+        """Tests that a wrong path raises on connect."""
+        connector = CsvConnector(filepath=os.path.join(self.tmp_dir.name, "missing.csv"))
+        with self.assertRaises(FileNotFoundError):
+            connector.connect()
+
+    @unittest.skipUnless(BENCHMARK_ROWS, "set AXON_BENCHMARK_ROWS to run the CSV loading benchmark")
+    def test_benchmark_large_catalog(self):
+        """Compares memory and time of the typed read with a default read_csv."""
+        filepath = os.path.join(self.tmp_dir.name, "large_schema.csv")
+        write_synthetic_catalog(filepath, BENCHMARK_ROWS)
+
+        start = time.perf_counter()
+        baseline = pd.read_csv(filepath, dtype=object)
+        baseline_seconds = time.perf_counter() - start
+        baseline_bytes = baseline.memory_usage(deep=True).sum()
+        del baseline
+
+        connector = CsvConnector(filepath=filepath)
+        connector.connect()
+        start = time.perf_counter()
+        typed = connector.get_schema()
+        typed_seconds = time.perf_counter() - start
+        typed_bytes = typed.memory_usage(deep=True).sum()
+        connector.disconnect()
+
+        print(
+            f"\n{BENCHMARK_ROWS} rows: object dtypes {baseline_bytes / 2**20:.0f} MiB in {baseline_seconds:.2f}s, "
+            f"categorical {typed_bytes / 2**20:.0f} MiB in {typed_seconds:.2f}s"
+        )
+        self.assertLess(typed_bytes, baseline_bytes)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# In file: tests/test_dbapi_connector.py
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from tools.connection_pool import ConnectionPool
+from tools.dbapi_connector import DbApiConnector
+
+# SQLite has no information_schema, so the tests stand in equivalent
+# catalog queries built on its pragma table functions.
+SQLITE_CATALOG_QUERIES = {
+    "columns": (
+        "SELECT m.name, p.name, p.type, CASE WHEN p.\"notnull\" OR p.pk THEN 'NO' ELSE 'YES' END "
+        "FROM sqlite_master m JOIN pragma_table_info(m.name, {param}) p "
+        "WHERE m.type = 'table' ORDER BY m.name, p.cid"
+    ),
+    "primary_keys": (
+        "SELECT m.name, p.name FROM sqlite_master m JOIN pragma_table_info(m.name, {param}) p "
+        "WHERE m.type = 'table' AND p.pk > 0"
+    ),
+    "foreign_keys": (
+        "SELECT m.name, f.\"from\", f.\"table\", f.\"to\" "
+        "FROM sqlite_master m JOIN pragma_foreign_key_list(m.name, {param}) f "
+        "WHERE m.type = 'table' ORDER BY m.name, f.\"from\""
+    ),
+}
+
+class CountingConnection:
+    """Wraps a sqlite3 connection and counts fetchmany round trips."""
+    fetchmany_calls = 0
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def cursor(self):
+        connection = self
+        cursor = self.conn.cursor()
+
+        class Cursor:
+            def execute(self, *args):
+                return cursor.execute(*args)
+
+            def fetchone(self):
+                return cursor.fetchone()
+
+            def fetchmany(self, size):
+                CountingConnection.fetchmany_calls += 1
+                return cursor.fetchmany(size)
+
+            def fetchall(self):
+                raise AssertionError("Catalog must be read in batches.")
+
+            def close(self):
+                cursor.close()
+
+        return Cursor()
+
+    def close(self):
+        self.conn.close()
+
+class TestDbApiConnector(unittest.TestCase):
+    """
+    Tests for the generic DB-API connector, using sqlite3 as the driver.
+    """
+
+    def setUp(self):
+        """Creates a SQLite database and a connector over it."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "source.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, email TEXT NOT NULL);
+            CREATE TABLE orders (
+                order_id INTEGER PRIMARY KEY,
+                customer_id INTEGER REFERENCES customers(customer_id),
+                order_date TIMESTAMP
+            );
+        """)
+        conn.close()
+        self.opened = []
+        self.connector = DbApiConnector(
+            self._connect,
+            schema="main",
+            paramstyle=sqlite3.paramstyle,
+            pool_size=3,
+            batch_size=2,
+            catalog_queries=SQLITE_CATALOG_QUERIES
+        )
+
+    def tearDown(self):
+        self.connector.disconnect()
+        self.tmp_dir.cleanup()
+
+    def _connect(self):
+        conn = CountingConnection(sqlite3.connect(self.db_path, check_same_thread=False))
+        self.opened.append(conn)
+        return conn
+
+    def test_get_schema_reads_catalog(self):
+        """Tests that columns, nullability, primary and foreign keys are read."""
+        self.connector.connect()
+        schema_df = self.connector.get_schema()
+
+        self.assertEqual(list(schema_df["column_name"]),
+                         ["customer_id", "email", "order_id", "customer_id", "order_date"])
+        self.assertEqual(list(schema_df["is_primary_key"]), [True, False, True, False, False])
+        self.assertEqual(list(schema_df["is_nullable"]), [False, False, False, True, True])
+        self.assertEqual(self.connector.get_foreign_keys(), [{
+            "from_table": "orders", "from_column": "customer_id", "to_table": "customers",
+            "to_column": "customer_id", "relationship_type": "Many-to-One"
+        }])
+        self.assertLessEqual(len(self.opened), 3)
+
+    def test_catalog_is_fetched_in_batches(self):
+        """Tests that result sets are read with fetchmany in batch_size rows."""
+        CountingConnection.fetchmany_calls = 0
+        self.connector.connect()
+        self.connector.get_schema()
+
+        # 5 columns -> 3 batches + end, 2 keys -> 1 batch + end, 1 FK -> 1 batch + end
+        self.assertEqual(CountingConnection.fetchmany_calls, 4 + 2 + 2)
+
+    def test_unhealthy_connections_are_replaced(self):
+        """Tests that a dead pooled connection is discarded, not handed out."""
+        self.connector.connect()
+        self.opened[0].close()
+
+        schema_df = self.connector.get_schema()
+
+        self.assertEqual(len(schema_df), 5)
+        self.assertGreater(len(self.opened), 1)
+
+    def test_pool_respects_max_size(self):
+        """Tests that the pool blocks instead of opening more than max_size connections."""
+        pool = ConnectionPool(lambda: object(), max_size=1)
+        conn = pool.acquire()
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+        pool.release(conn)
+        self.assertIs(pool.acquire(timeout=0.05), conn)
+
+if __name__ == "__main__":
+    unittest.main()
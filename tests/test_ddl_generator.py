@@ -0,0 +1,92 @@
+# In file: tests/test_ddl_generator.py
+
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from tools.ddl_generator import DdlGenerator
+from tools.relationship_inference import RelationshipInferrer
+
+class TestDdlGenerator(unittest.TestCase):
+    """
+    Tests for the rule-based DDL generator.
+    """
+
+    def setUp(self):
+        self.generator = DdlGenerator()
+
+    def test_keys_and_dependency_order(self):
+        """Tests that referenced tables are created first, with PK and FK constraints."""
+        schema_df = pd.DataFrame({
+            "table_name": ["orders", "orders", "orders", "customers", "customers"],
+            "column_name": ["order_id", "customer_id", "order_date", "customer_id", "customer_name"],
+            "data_type": ["INTEGER", "INTEGER", "TIMESTAMP", "INTEGER", "VARCHAR(255)"],
+        })
+        relationships = [{"from_table": "orders", "from_column": "customer_id",
+                          "to_table": "customers", "to_column": "customer_id"}]
+
+        sql = self.generator.generate(schema_df, relationships, {"customers": "Stores customer data."})
+
+        self.assertLess(sql.index("CREATE TABLE customers"), sql.index("CREATE TABLE orders"))
+        self.assertIn("-- Stores customer data.\nCREATE TABLE customers", sql)
+        self.assertIn("    PRIMARY KEY (order_id)", sql)
+        self.assertIn("    FOREIGN KEY (customer_id) REFERENCES customers (customer_id)", sql)
+        self.assertIn("    order_date TIMESTAMP", sql)
+
+    def test_declared_keys_and_nullability(self):
+        """Tests that declared primary keys and NOT NULL columns from the catalog are used."""
+        schema_df = pd.DataFrame({
+            "table_name": ["events", "events", "events"],
+            "column_name": ["source", "seq", "payload"],
+            "data_type": ["VARCHAR(20)", "BIGINT", ""],
+            "is_nullable": [False, False, True],
+            "is_primary_key": [True, True, False],
+        })
+        sql = self.generator.generate(schema_df)
+
+        self.assertIn("    PRIMARY KEY (source, seq)", sql)
+        self.assertIn("    payload TEXT,", sql)
+        self.assertNotIn("NOT NULL", sql)
+
+    def test_cycles_and_invalid_relationships(self):
+        """Tests that cyclic FKs are added after the tables, and unknown targets are skipped."""
+        schema_df = pd.DataFrame({
+            "table_name": ["departments", "departments", "employees", "employees"],
+            "column_name": ["department_id", "manager_id", "employee_id", "department_id"],
+            "data_type": ["INTEGER"] * 4,
+        })
+        relationships = [
+            {"from_table": "departments", "from_column": "manager_id", "to_table": "employees", "to_column": "employee_id"},
+            {"from_table": "employees", "from_column": "department_id", "to_table": "departments", "to_column": "department_id"},
+            {"from_table": "employees", "from_column": "region_id", "to_table": "regions", "to_column": "region_id"},
+        ]
+        sql = self.generator.generate(schema_df, relationships)
+
+        self.assertLess(sql.index("CREATE TABLE departments"), sql.index("CREATE TABLE employees"))
+        self.assertIn("ALTER TABLE departments ADD FOREIGN KEY (manager_id) REFERENCES employees (employee_id);", sql)
+        self.assertIn("    FOREIGN KEY (department_id) REFERENCES departments (department_id)", sql)
+        self.assertNotIn("regions", sql)
+
+    def test_large_catalog_is_fast(self):
+        """Tests that thousands of tables are generated well within a second."""
+        table_count, columns_per_table = 2000, 10
+        tables = np.repeat([f"entity{i}s" for i in range(table_count)], columns_per_table)
+        columns = []
+        for i in range(table_count):
+            columns.append(f"entity{i}_id")
+            columns.extend(f"entity{(i + k) % table_count}_id" for k in range(1, 4))
+            columns.extend(f"attribute_{k}" for k in range(columns_per_table - 4))
+        schema_df = pd.DataFrame({"table_name": tables, "column_name": columns,
+                                  "data_type": ["INTEGER"] * (table_count * columns_per_table)})
+        relationships = RelationshipInferrer().infer(schema_df)
+
+        start = time.perf_counter()
+        sql = self.generator.generate(schema_df, relationships)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(sql.count("CREATE TABLE"), table_count)
+        self.assertEqual(sql.count("FOREIGN KEY"), table_count * 3)
+        self.assertLess(elapsed, 1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# In file: tests/test_fused_agent.py
+
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+from agents.fused_agent import MigrationArtifactsAgent
+
+FUSED_RESPONSE = json.dumps({
+    "migration_plan": "## 1. Executive Summary",
+    "schema_sql": "CREATE TABLE t (id INTEGER);",
+    "validation_sql": "SELECT COUNT(*) FROM t;",
+})
+
+class TestMigrationArtifactsAgent(unittest.TestCase):
+    """
+    Tests for the MigrationArtifactsAgent, which generates three artifacts in one call.
+    """
+
+    def setUp(self):
+        """Initializes the agent for testing."""
+        self.agent = MigrationArtifactsAgent(
+            model_name="test-model",
+            project="test-project",
+            location="us-central1"
+        )
+        self.agent._execute_prompt = MagicMock(return_value=f"```json\n{FUSED_RESPONSE}\n```")
+
+    def test_run_splits_and_saves_artifacts(self):
+        """Tests that one call produces the plan, DDL and validation files."""
+        with patch("tools.plan_writer.PlanWriter.save_plan") as mock_save_plan, \
+             patch("tools.sql_writer.SqlWriter.save_sql") as mock_save_sql:
+            artifacts = self.agent.run({"summary": "A test schema"}, "plan.md", "schema.sql", "validation.sql")
+
+        self.agent._execute_prompt.assert_called_once()
+        self.assertEqual(artifacts["transformation"], "CREATE TABLE t (id INTEGER);")
+        mock_save_plan.assert_called_once_with(plan_content="## 1. Executive Summary", output_path="plan.md")
+        self.assertEqual(
+            [call.kwargs["output_path"] for call in mock_save_sql.call_args_list],
+            ["schema.sql", "validation.sql"]
+        )
+
+    def test_incomplete_response_writes_nothing(self):
+        """Tests that a response missing an artifact is rejected as a whole."""
+        self.agent._execute_prompt.return_value = json.dumps({"migration_plan": "plan", "schema_sql": ""})
+        with patch("tools.plan_writer.PlanWriter.save_plan") as mock_save_plan:
+            self.assertIsNone(self.agent.run({"summary": "A test schema"}, "plan.md", "schema.sql", "validation.sql"))
+        mock_save_plan.assert_not_called()
+
+        with self.assertRaises(ValueError):
+            self.agent.split_response('["not", "an", "object"]')
+
+if __name__ == "__main__":
+    unittest.main()
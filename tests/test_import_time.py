@@ -0,0 +1,68 @@
+# In file: tests/test_import_time.py
+
+import os
+import subprocess
+import sys
+import unittest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Cumulative import time allowed for each entry point, in seconds.
+IMPORT_TIME_BUDGET_SECONDS = 1.5
+
+def measure_import(module: str) -> dict:
+    """
+    Imports a module in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        A dictionary with the module's cumulative import time in seconds and
+        whether the Vertex AI SDK was loaded as a side effect.
+    """
+    code = (
+        f"import sys; import {module}; "
+        "print('SDK_LOADED=' + str('google.cloud.aiplatform' in sys.modules or 'vertexai' in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <module>"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1].strip())
+    return {
+        "seconds": cumulative_us / 1_000_000,
+        "sdk_loaded": "SDK_LOADED=True" in result.stdout
+    }
+
+class TestImportTime(unittest.TestCase):
+    """
+    Startup benchmark for the application entry points.
+    """
+
+    def _assert_fast_import(self, module: str):
+        measurement = measure_import(module)
+        self.assertFalse(measurement["sdk_loaded"], f"Importing {module} loaded the Vertex AI SDK.")
+        self.assertLess(
+            measurement["seconds"],
+            IMPORT_TIME_BUDGET_SECONDS,
+            f"Importing {module} took {measurement['seconds']:.2f}s."
+        )
+
+    def test_orchestrator_import_time(self):
+        """Tests that importing the orchestrator stays within budget."""
+        self._assert_fast_import("orchestrator")
+
+    def test_main_import_time(self):
+        """Tests that importing the CLI entry point stays within budget."""
+        self._assert_fast_import("main")
+
+if __name__ == "__main__":
+    for name in ("orchestrator", "main"):
+        measurement = measure_import(name)
+        print(f"{name}: {measurement['seconds']:.3f}s (Vertex AI SDK loaded: {measurement['sdk_loaded']})")
@@ -0,0 +1,100 @@
+# In file: tests/test_index_advisor.py
+
+import unittest
+from tools.index_advisor import IndexAdvisor, parse_ddl
+from tools.schema_diff import SchemaDiff
+
+DDL = """
+-- Stores customer data.
+CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, customer_name VARCHAR(255));
+CREATE TABLE products (product_id INTEGER, price DECIMAL(10, 2) NOT NULL, PRIMARY KEY (product_id));
+CREATE TABLE orders (
+    order_id INTEGER,
+    customer_id INTEGER NOT NULL,
+    updated_at TIMESTAMP,
+    order_date TIMESTAMP,
+    PRIMARY KEY (order_id)
+);
+CREATE TABLE order_items (order_id INTEGER, product_id INTEGER, quantity INT, PRIMARY KEY (order_id, product_id));
+CREATE TABLE reviews (review_id INTEGER PRIMARY KEY, customer_id INTEGER, product_id INTEGER);
+CREATE INDEX idx_reviews_product ON reviews (product_id);
+"""
+
+def relationship(from_table, from_column, to_table):
+    return {"from_table": from_table, "from_column": from_column, "to_table": to_table, "to_column": from_column}
+
+RELATIONSHIPS = [
+    relationship("orders", "customer_id", "customers"),
+    relationship("order_items", "order_id", "orders"),
+    relationship("order_items", "product_id", "products"),
+    relationship("reviews", "customer_id", "customers"),
+    relationship("reviews", "product_id", "products"),
+]
+
+class TestIndexAdvisor(unittest.TestCase):
+    """
+    Tests for the rule-based index and partitioning advisor.
+    """
+
+    def setUp(self):
+        self.advisor = IndexAdvisor()
+
+    def test_parse_ddl(self):
+        """Tests that column types and key columns are read from the DDL."""
+        tables = parse_ddl(DDL)
+
+        self.assertEqual(tables["products"]["columns"]["price"], "DECIMAL(10, 2)")
+        self.assertEqual(tables["order_items"]["indexes"], [["order_id", "product_id"]])
+        self.assertEqual(tables["reviews"]["indexes"], [["review_id"], ["product_id"]])
+
+    def test_uncovered_foreign_keys_are_indexed(self):
+        """Tests that only FK columns not leading a key or index get an index."""
+        advice = self.advisor.advise(DDL, RELATIONSHIPS)
+        indexed = {(index["table"], tuple(index["columns"])) for index in advice["indexes"]}
+
+        self.assertEqual(indexed, {
+            ("orders", ("customer_id",)),
+            # order_id leads the primary key; product_id does not
+            ("order_items", ("product_id",)),
+            # The join path index also serves customer_id on its own
+            ("reviews", ("customer_id", "product_id")),
+        })
+        self.assertIn("CREATE INDEX idx_orders_customer_id ON orders (customer_id);", self.advisor.to_sql(advice))
+
+    def test_timestamped_fact_tables_are_partition_candidates(self):
+        """Tests that tables with FKs are flagged by their event-time column."""
+        advice = self.advisor.advise(DDL, RELATIONSHIPS)
+
+        self.assertEqual(advice["partition_candidates"], [{
+            "table": "orders",
+            "column": "order_date",
+            "data_type": "TIMESTAMP",
+            "reason": advice["partition_candidates"][0]["reason"],
+        }])
+        self.assertIn("--   CREATE TABLE orders (...) PARTITION BY RANGE (order_date);", self.advisor.to_sql(advice))
+
+    def test_migration_statements_are_applied(self):
+        """Tests that foreign keys on columns added by a delta migration are indexed."""
+        migration = SchemaDiff(
+            added_tables={"stores": [{"column_name": "store_id", "data_type": "INTEGER", "is_primary_key": True}]},
+            added_columns=[{"table_name": "orders", "column_name": "store_id", "data_type": "INTEGER"}],
+            altered_columns=[{"table_name": "products", "column_name": "price",
+                              "old_type": "DECIMAL(10, 2)", "new_type": "NUMERIC(12, 2)"}],
+            dropped_columns=[{"table_name": "order_items", "column_name": "product_id", "data_type": "INTEGER"}],
+            dropped_tables=["reviews"]
+        ).to_migration_sql()
+        sql = DDL + "\n" + migration
+
+        tables = parse_ddl(sql)
+        self.assertEqual(tables["orders"]["columns"]["store_id"], "INTEGER")
+        self.assertEqual(tables["products"]["columns"]["price"], "NUMERIC(12, 2)")
+        self.assertNotIn("product_id", tables["order_items"]["columns"])
+        self.assertEqual(tables["order_items"]["indexes"], [])
+        self.assertNotIn("reviews", tables)
+
+        advice = self.advisor.advise(sql, RELATIONSHIPS + [relationship("orders", "store_id", "stores")])
+        indexed = {(index["table"], tuple(index["columns"])) for index in advice["indexes"]}
+        self.assertIn(("orders", ("customer_id", "store_id")), indexed)
+
+if __name__ == "__main__":
+    unittest.main()
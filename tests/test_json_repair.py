@@ -0,0 +1,119 @@
+# In file: tests/test_json_repair.py
+
+import asyncio
+import json
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import pandas as pd
+from agents.base_agent import BaseAgent
+from tools.json_repair import extract_json
+from tools.response_cache import ResponseCache
+from tools.schema_parser import SchemaParser
+
+VALID_REPORT = '{"summary": "s", "key_tables": [{"table_name": "t"}], "relationships": []}'
+
+class TestJsonRepair(unittest.TestCase):
+    """
+    Tests for extracting and repairing JSON from model responses.
+    """
+
+    def test_fenced_and_chatty_responses(self):
+        """Tests that the object is found inside fences and surrounding prose."""
+        fenced = f"```json\n{VALID_REPORT}\n```"
+        chatty = f"Sure! Here is the {{analysis}} you asked for:\n```json\n{VALID_REPORT}\n```\nLet me know {{if}} that helps."
+        prose = f"The report is {VALID_REPORT} as requested."
+        for response in (fenced, chatty, prose):
+            self.assertEqual(extract_json(response)["summary"], "s")
+
+    def test_trailing_commas_are_dropped(self):
+        """Tests that trailing commas in objects and lists are repaired."""
+        response = '{"a": [1, 2, ], "b": {"c": "x, ]",},\n}'
+        self.assertEqual(extract_json(response), {"a": [1, 2], "b": {"c": "x, ]"}})
+
+    def test_truncated_responses_are_closed(self):
+        """Tests that output cut off at the token limit keeps its complete part."""
+        self.assertEqual(
+            extract_json('```json\n{"summary": "s", "key_tables": [{"table_name": "a"}, {"table_na'),
+            {"summary": "s", "key_tables": [{"table_name": "a"}]}
+        )
+        self.assertEqual(extract_json('{"summary": "cut off mid sent'), {"summary": "cut off mid sent"})
+        self.assertEqual(extract_json('{"a": 1, "b":'), {"a": 1})
+        self.assertEqual(extract_json('{"a": 1, "b": tr'), {"a": 1})
+
+    def test_unrecoverable_responses_raise(self):
+        """Tests that text without a JSON object is reported as a decode error."""
+        with self.assertRaises(json.JSONDecodeError):
+            extract_json("I could not analyze this schema.")
+
+class TestSchemaParserRepair(unittest.TestCase):
+    """
+    Tests for how the SchemaParser handles malformed model responses.
+    """
+
+    def setUp(self):
+        self.agent = BaseAgent(
+            model_name="test-model",
+            project="test-project",
+            location="us-central1",
+            use_cache=False
+        )
+        self.parser = SchemaParser(agent=self.agent)
+        self.schema_df = pd.DataFrame({"table_name": ["t"], "column_name": ["id"], "data_type": ["INTEGER"]})
+
+    def test_repairable_response_does_not_reask(self):
+        """Tests that a fixable response costs a single model call."""
+        self.agent._execute_prompt = MagicMock(return_value=f"```json\n{VALID_REPORT[:-1]},\n")
+
+        report = self.parser.analyze_schema(self.schema_df, "prompt {schema_json}{context}")
+
+        self.assertEqual(report["key_tables"], [{"table_name": "t"}])
+        self.agent._execute_prompt.assert_called_once()
+
+    def test_wrong_shape_is_reasked_once(self):
+        """Tests that an invalid report triggers a bounded re-ask."""
+        self.agent._execute_prompt = MagicMock(side_effect=['{"summary": "s"}', VALID_REPORT])
+
+        report = self.parser.analyze_schema(self.schema_df, "prompt {schema_json}{context}")
+
+        self.assertEqual(report["summary"], "s")
+        self.assertEqual(self.agent._execute_prompt.call_count, 2)
+        self.assertIn("key_tables", self.agent._execute_prompt.call_args.args[0].split("could not be used")[1])
+
+    def test_gives_up_after_retries(self):
+        """Tests that the parser reports an error once the retries are used up."""
+        self.agent._execute_prompt = MagicMock(return_value="No JSON here.")
+
+        report = self.parser.analyze_schema(self.schema_df, "prompt {schema_json}{context}")
+
+        self.assertIn("error", report)
+        self.assertEqual(report["raw_response"], "No JSON here.")
+        self.assertEqual(self.agent._execute_prompt.call_count, 2)
+
+    def test_shards_are_reasked_independently(self):
+        """Tests that the async shard path re-asks only the shard that failed."""
+        responses = {"bad": ["[]", VALID_REPORT]}
+        self.agent._aexecute_prompt = AsyncMock(side_effect=lambda prompt, **_: VALID_REPORT if "bad" not in prompt else responses["bad"].pop(0))
+
+        reports = asyncio.run(self.parser._analyze_shards(["good", "bad"]))
+
+        self.assertEqual([report["summary"] for report in reports], ["s", "s"])
+        self.assertEqual(self.agent._aexecute_prompt.await_count, 3)
+
+    def test_unusable_responses_are_not_cached(self):
+        """Tests that a bad response is evicted and the re-ask bypasses the cache."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.agent.use_cache = True
+            self.agent.response_cache = ResponseCache(cache_dir=tmp_dir)
+            self.agent._agenerate = AsyncMock(side_effect=["No JSON here.", VALID_REPORT, VALID_REPORT])
+
+            self.assertEqual(self.parser.analyze_schema(self.schema_df, "prompt {schema_json}{context}")["summary"], "s")
+            self.assertEqual(self.agent.response_cache.stats()["entries"], 0)
+
+            # The next run asks the model again instead of replaying the bad response
+            self.assertEqual(self.parser.analyze_schema(self.schema_df, "prompt {schema_json}{context}")["summary"], "s")
+            self.assertEqual(self.agent._agenerate.await_count, 3)
+            self.assertEqual(self.agent.response_cache.stats()["entries"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
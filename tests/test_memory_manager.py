@@ -3,52 +3,113 @@
 import unittest
 import os
 import json
-from unittest.mock import patch, mock_open, call
+import tempfile
 from tools.memory_manager import MemoryManager
 
 class TestMemoryManager(unittest.TestCase):
     """
     Tests for the MemoryManager tool (Step 6).
     """
-    
+
     def setUp(self):
         """Setup a temporary file path for tests."""
-        self.test_filepath = "fake/memory/test_memory.json"
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.test_filepath = os.path.join(self.tmp_dir.name, "memory", "test_memory.json")
 
-    @patch("os.makedirs")
-    def test_save_and_load_memory(self, mock_makedirs):
+    def test_save_and_load_memory(self):
         """
         Tests that saving and loading memories works correctly.
         """
-        # Mock the file I/O operations
-        m = mock_open(read_data='[]')
-        with patch("builtins.open", m):
-            manager = MemoryManager(filepath=self.test_filepath)
-            
-            # 1. Test saving a new memory
-            new_memory = {"id": 1, "data": "test"}
-            manager.save_memory(new_memory)
-            
-            # Check if open was called correctly for writing
-            m.assert_called_with(self.test_filepath, 'w')
-            
-            # CORRECTED: Join all calls to write() to get the full string
-            # This handles cases where a function writes in chunks, like json.dump()
-            all_written_calls = m().write.call_args_list
-            written_content = "".join(call.args[0] for call in all_written_calls)
-            
-            self.assertIn('"id": 1', written_content)
-            self.assertIn('"data": "test"', written_content)
-            
-            # 2. Test loading memories
-            # Simulate reading the data we just "wrote"
-            m.return_value.read.return_value = '[{"id": 1, "data": "test"}]' 
-            memories = manager.load_memories()
-            self.assertEqual(len(memories), 1)
-            self.assertEqual(memories[0]["data"], "test")
+        manager = MemoryManager(filepath=self.test_filepath)
 
-    def tearDown(self):
-        """Clean up any created fake files if necessary (though mock prevents it)."""
-        if os.path.exists(self.test_filepath):
-            os.remove(self.test_filepath)
+        # 1. Test saving a new memory
+        new_memory = {"id": 1, "data": "test"}
+        manager.save_memory(new_memory)
+
+        # The record is appended as one JSON line
+        with open(manager.log_path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(json.loads(lines[0]), new_memory)
+
+        # 2. Test loading memories
+        manager.save_memory({"id": 2, "data": "second"})
+        memories = manager.load_memories()
+        self.assertEqual(len(memories), 2)
+        self.assertEqual(memories[0]["data"], "test")
+        self.assertEqual(manager.count(), 2)
+
+    def test_latest_memory_is_read_through_index(self):
+        """Tests that the context is the most recent record."""
+        manager = MemoryManager(filepath=self.test_filepath)
+        self.assertEqual(manager.get_context_for_prompt(), "No previous runs available for context.")
+
+        for i in range(5):
+            manager.save_memory({"id": i})
+        self.assertEqual(manager.load_latest_memory(), {"id": 4})
+        self.assertEqual(json.loads(manager.get_context_for_prompt()), {"id": 4})
+
+    def test_legacy_json_file_is_migrated(self):
+        """Tests that an existing memory.json array is imported into the log."""
+        os.makedirs(os.path.dirname(self.test_filepath))
+        with open(self.test_filepath, "w") as f:
+            json.dump([{"id": 1}, {"id": 2}], f, indent=2)
+
+        manager = MemoryManager(filepath=self.test_filepath)
+
+        self.assertEqual(manager.load_memories(), [{"id": 1}, {"id": 2}])
+        self.assertEqual(manager.load_latest_memory(), {"id": 2})
 
+    def test_recovers_from_interrupted_write(self):
+        """Tests that a cut-off record and stale index are repaired on open."""
+        manager = MemoryManager(filepath=self.test_filepath)
+        manager.save_memory({"id": 1})
+        with open(manager.log_path, "ab") as f:
+            f.write(b'{"id": 2, "data": "cut o')
+
+        recovered = MemoryManager(filepath=self.test_filepath)
+
+        self.assertEqual(recovered.load_memories(), [{"id": 1}])
+        recovered.save_memory({"id": 3})
+        self.assertEqual(recovered.load_latest_memory(), {"id": 3})
+        self.assertEqual(recovered.count(), 2)
+
+    def test_compaction_keeps_most_recent_records(self):
+        """Tests that the log is compacted once it reaches twice the limit."""
+        manager = MemoryManager(filepath=self.test_filepath, max_records=3)
+        for i in range(7):
+            manager.save_memory({"id": i})
+
+        self.assertEqual([m["id"] for m in manager.load_memories()], [4, 5, 6])
+        self.assertEqual(manager.load_latest_memory(), {"id": 6})
+
+    def test_similarity_search_returns_most_similar_runs(self):
+        """Tests that context is built from the runs most similar to the query."""
+        manager = MemoryManager(filepath=self.test_filepath)
+        shop = {"source_analysis": {
+            "summary": "Customer orders.",
+            "key_tables": [{"table_name": "customers"}, {"table_name": "orders"}],
+            "relationships": [{"from_table": "orders", "from_column": "customer_id",
+                               "to_table": "customers", "to_column": "customer_id"}]
+        }}
+        hr = {"source_analysis": {
+            "summary": "Employees and departments.",
+            "key_tables": [{"table_name": "employees"}, {"table_name": "departments"}],
+            "relationships": [{"from_table": "employees", "from_column": "department_id",
+                               "to_table": "departments", "to_column": "department_id"}]
+        }}
+        manager.save_memory(shop)
+        manager.save_memory(hr)
+
+        results = manager.search("customers customer_id customer_name orders order_id", k=1)
+        self.assertEqual(results, [shop])
+        context = json.loads(manager.get_context_for_prompt(query="employees department_id", k=1))
+        self.assertEqual(context, [hr])
+
+        # The index is persisted and reloaded next to the memory log
+        reloaded = MemoryManager(filepath=self.test_filepath)
+        self.assertEqual(len(reloaded.vector_index), 2)
+        self.assertEqual(reloaded.search("departments", k=1), [hr])
+
+    def tearDown(self):
+        """Clean up the temporary directory."""
+        self.tmp_dir.cleanup()
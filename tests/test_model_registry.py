@@ -0,0 +1,69 @@
+# In file: tests/test_model_registry.py
+
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from agents.base_agent import BaseAgent
+from config import settings
+from tools.model_registry import ModelClientRegistry, PlaceholderModelClient, class_identity, get_registry
+from tools.response_cache import ResponseCache
+
+class TestModelClientRegistry(unittest.TestCase):
+    """
+    Tests for the shared model client registry.
+    """
+
+    def test_client_created_once_per_key(self):
+        """Tests that the factory runs once per (project, location, model)."""
+        factory = MagicMock(side_effect=lambda project, location, model: object())
+        registry = ModelClientRegistry(factory=factory)
+
+        first = registry.get_client("p", "us-central1", "m")
+        second = registry.get_client("p", "us-central1", "m")
+        other = registry.get_client("p", "europe-west1", "m")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(factory.call_count, 2)
+
+    def test_agent_construction_is_lazy_and_uses_injected_client(self):
+        """Tests that agents fetch the shared client only when they call the model."""
+        fake_client = MagicMock()
+        fake_client.generate_content_async = AsyncMock(return_value=MagicMock(text="fake response"))
+        get_registry().register("fake-project", "us-central1", "fake-model", fake_client)
+        try:
+            agent = BaseAgent(
+                model_name="fake-model",
+                project="fake-project",
+                location="us-central1",
+                use_cache=False
+            )
+            self.assertIsNone(agent._model)
+
+            self.assertEqual(agent._execute_prompt("hello"), "fake response")
+            self.assertIs(agent.model, fake_client)
+            fake_client.generate_content_async.assert_awaited_once()
+        finally:
+            get_registry().clear()
+
+    def test_cache_hit_does_not_create_client(self):
+        """Tests that the cache key names the client without creating it, even with Vertex AI on."""
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(settings, "USE_VERTEX_MODEL", True):
+            cache = ResponseCache(cache_dir=tmp_dir)
+            agent = BaseAgent(
+                model_name="test-model",
+                project="test-project",
+                location="us-central1",
+                response_cache=cache
+            )
+            cache.put(agent._cache_key(cache, "hello"), "cached response")
+
+            self.assertEqual(agent._execute_prompt("hello"), "cached response")
+            self.assertIsNone(agent._model)
+            self.assertEqual(get_registry().client_identity("test-project", "us-central1", "test-model"),
+                             "vertexai.generative_models.GenerativeModel")
+        self.assertEqual(get_registry().client_identity("test-project", "us-central1", "test-model"),
+                         class_identity(PlaceholderModelClient))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+# In file: tests/test_model_resilience.py
+
+import asyncio
+import random
+import unittest
+from agents.base_agent import BaseAgent
+from tools.model_resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, is_retryable_error
+
+class ServiceUnavailable(Exception):
+    """Named like the google.api_core error for HTTP 503."""
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModelClient:
+    """
+    A model client that replays scripted behaviours, one per call.
+
+    Each behaviour is a (latency in seconds, response text or exception) pair;
+    the last behaviour repeats once the script runs out.
+    """
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        latency, outcome = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        await asyncio.sleep(latency)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if stream:
+            return self._stream(outcome)
+        return FakeResponse(outcome)
+
+    async def _stream(self, text):
+        for chunk in text.split(" "):
+            yield FakeResponse(chunk)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestModelResilience(unittest.TestCase):
+    """
+    Tests for retries, hedging and the circuit breaker around model calls.
+    """
+
+    def setUp(self):
+        self.sleeps = []
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10, clock=self.clock)
+
+    def make_agent(self, client, **resilience_options):
+        async def record_sleep(seconds):
+            self.sleeps.append(seconds)
+
+        options = dict(breaker=self.breaker, max_retries=3, backoff_base_seconds=1.0,
+                       backoff_max_seconds=4.0, sleep=record_sleep, rng=random.Random(0))
+        options.update(resilience_options)
+        agent = BaseAgent(
+            model_name="test-model",
+            project="test-project",
+            location="us-central1",
+            use_cache=False,
+            resilience=ResilientCaller(**options)
+        )
+        agent.model = client
+        return agent
+
+    def test_transient_errors_are_retried_with_backoff(self):
+        """Tests that retryable errors are retried with jittered, growing delays."""
+        client = FakeModelClient([(0, ServiceUnavailable("503")), (0, ConnectionError("reset")), (0, "ok")])
+        agent = self.make_agent(client)
+
+        self.assertEqual(agent._execute_prompt("p"), "ok")
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertLessEqual(self.sleeps[0], 1.0)
+        self.assertLessEqual(self.sleeps[1], 2.0)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_other_errors_are_not_retried(self):
+        """Tests that a request the model rejects fails on the first attempt."""
+        client = FakeModelClient([(0, ValueError("invalid argument"))])
+        agent = self.make_agent(client)
+
+        with self.assertRaises(ValueError):
+            agent._execute_prompt("p")
+        self.assertEqual(client.calls, 1)
+        self.assertFalse(is_retryable_error(ValueError()))
+
+    def test_backoff_is_capped(self):
+        """Tests that the backoff ceiling doubles up to the maximum."""
+        caller = ResilientCaller(breaker=self.breaker, backoff_base_seconds=1.0, backoff_max_seconds=4.0,
+                                 rng=random.Random(0))
+        self.assertTrue(all(caller.backoff_delay(10) <= 4.0 for _ in range(50)))
+
+    def test_slow_call_is_hedged(self):
+        """Tests that a duplicate request is sent after the threshold and the first reply wins."""
+        client = FakeModelClient([(1.0, "slow"), (0, "fast")])
+        agent = self.make_agent(client, hedge_after_seconds=0.05)
+
+        self.assertEqual(agent._execute_prompt("p"), "fast")
+        self.assertEqual(client.calls, 2)
+
+    def test_fast_call_is_not_hedged(self):
+        """Tests that calls answering within the threshold are sent once."""
+        client = FakeModelClient([(0, "fast")])
+        agent = self.make_agent(client, hedge_after_seconds=0.5)
+
+        self.assertEqual(agent._execute_prompt("p"), "fast")
+        self.assertEqual(client.calls, 1)
+
+    def test_circuit_opens_and_recovers(self):
+        """Tests that repeated failures fail fast until a trial call succeeds."""
+        client = FakeModelClient([(0, ServiceUnavailable("503"))])
+        agent = self.make_agent(client, max_retries=0)
+
+        for _ in range(3):
+            with self.assertRaises(ServiceUnavailable):
+                agent._execute_prompt("p")
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            agent._execute_prompt("p")
+        self.assertEqual(client.calls, 3)
+
+        # After the reset time one trial call goes through and closes the circuit
+        self.clock.now = 10
+        client.script = [(0, "recovered")]
+        client.calls = 0
+        self.assertEqual(agent._execute_prompt("p"), "recovered")
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_reopens_circuit(self):
+        """Tests that a failing half-open trial opens the circuit again."""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 10
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_cancelled_trial_releases_the_circuit(self):
+        """Tests that a cancelled or abandoned half-open trial lets the next call through."""
+        caller = ResilientCaller(breaker=self.breaker, max_retries=0)
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 10
+
+        async def cancel_trial():
+            task = asyncio.ensure_future(caller.call(lambda: asyncio.sleep(60)))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        async def abandon_stream_trial():
+            async def chunks():
+                yield "first"
+                yield "second"
+            stream = caller.stream(chunks)
+            self.assertEqual(await stream.__anext__(), "first")
+            await stream.aclose()
+
+        async def fast():
+            return "ok"
+
+        asyncio.run(cancel_trial())
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        asyncio.run(abandon_stream_trial())
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(asyncio.run(caller.call(fast)), "ok")
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_stream_is_retried_before_first_chunk(self):
+        """Tests that a stream that fails to start is retried."""
+        client = FakeModelClient([(0, ServiceUnavailable("503")), (0, "streamed reply")])
+        agent = self.make_agent(client)
+
+        self.assertEqual(list(agent._execute_prompt_stream("p")), ["streamed", "reply"])
+        self.assertEqual(client.calls, 2)
+
+if __name__ == "__main__":
+    unittest.main()
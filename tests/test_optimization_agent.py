@@ -1,5 +1,8 @@
 # In file: tests/test_optimization_agent.py
 
+import json
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from agents.optimization_agent import QueryOptimizationAgent
@@ -40,5 +43,41 @@ class TestQueryOptimizationAgent(unittest.TestCase):
                 output_path=output_path
             )
 
+    def test_run_with_advice_path_uses_the_index_advisor(self):
+        """
+        Tests that indexes are recommended by rules, as SQL and JSON, without the model.
+        """
+        schema_analysis = {"relationships": [{"from_table": "orders", "from_column": "customer_id",
+                                              "to_table": "customers", "to_column": "customer_id"}]}
+        generated_sql = ("CREATE TABLE customers (customer_id INT PRIMARY KEY);\n"
+                         "CREATE TABLE orders (order_id INT PRIMARY KEY, customer_id INT, order_date TIMESTAMP);")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "optimizations.sql")
+            advice_path = os.path.join(tmp_dir, "index_advice.json")
+            self.assertTrue(self.agent.run(generated_sql, schema_analysis, output_path, advice_output_path=advice_path))
+
+            with open(output_path) as f:
+                self.assertIn("CREATE INDEX idx_orders_customer_id ON orders (customer_id);", f.read())
+            with open(advice_path) as f:
+                advice = json.load(f)
+        self.assertEqual(advice["indexes"][0]["columns"], ["customer_id"])
+        self.assertEqual(advice["partition_candidates"][0]["column"], "order_date")
+        self.agent._execute_prompt.assert_not_called()
+
+    def test_model_review_is_optional(self):
+        """
+        Tests that the model review is appended after the rule-based script when enabled.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+             patch("agents.optimization_agent.settings.INDEX_ADVISOR_MODEL_REVIEW", True):
+            output_path = os.path.join(tmp_dir, "optimizations.sql")
+            self.agent.run("", {}, output_path, advice_output_path=os.path.join(tmp_dir, "advice.json"))
+            with open(output_path) as f:
+                sql = f.read()
+
+        self.assertTrue(sql.startswith("-- Index recommendations"))
+        self.assertTrue(sql.rstrip().endswith("-- Mocked Optimization SQL"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,309 @@
+# In file: tests/test_orchestrator.py
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+import orchestrator
+from orchestrator import PipelineOrchestrator
+from tools.database_connector import MockConnector
+from tools.memory_manager import MemoryManager
+from tools.schema_fingerprint import schema_fingerprint
+from tools.step_scheduler import PipelineStep, StepScheduler
+
+class TestStepScheduler(unittest.TestCase):
+    """
+    Tests for the dependency-graph step scheduler.
+    """
+
+    def test_independent_steps_run_concurrently(self):
+        """Tests that steps with satisfied dependencies overlap in time."""
+        barrier = threading.Barrier(3, timeout=2)
+
+        def wait_for_siblings(upstream):
+            barrier.wait()
+            return upstream["root"] + 1
+
+        steps = [
+            PipelineStep("root", lambda upstream: 1),
+            PipelineStep("a", wait_for_siblings, depends_on=["root"]),
+            PipelineStep("b", wait_for_siblings, depends_on=["root"]),
+            PipelineStep("c", wait_for_siblings, depends_on=["root"]),
+            PipelineStep("sink", lambda upstream: sum(upstream.values()), depends_on=["a", "b", "c"]),
+        ]
+        results = StepScheduler(max_workers=4).run(steps)
+        self.assertEqual(results["sink"], 6)
+
+    def test_cycle_is_rejected(self):
+        """Tests that a cyclic graph raises a ValueError before running."""
+        steps = [
+            PipelineStep("a", lambda upstream: None, depends_on=["b"]),
+            PipelineStep("b", lambda upstream: None, depends_on=["a"]),
+        ]
+        with self.assertRaises(ValueError):
+            StepScheduler().run(steps)
+
+    def test_failure_stops_downstream_steps(self):
+        """Tests that a failing step prevents its dependants from running."""
+        downstream = MagicMock()
+
+        def fail(upstream):
+            raise RuntimeError("boom")
+
+        steps = [
+            PipelineStep("a", fail),
+            PipelineStep("b", downstream, depends_on=["a"]),
+        ]
+        with self.assertRaises(RuntimeError):
+            StepScheduler().run(steps)
+        downstream.assert_not_called()
+
+    def test_critical_path(self):
+        """Tests that the critical path follows the slowest dependency chain."""
+        steps = [
+            PipelineStep("root", lambda upstream: None),
+            PipelineStep("fast", lambda upstream: None, depends_on=["root"]),
+            PipelineStep("slow", lambda upstream: time.sleep(0.05), depends_on=["root"]),
+            PipelineStep("sink", lambda upstream: None, depends_on=["fast", "slow"]),
+        ]
+        scheduler = StepScheduler()
+        scheduler.run(steps)
+        self.assertEqual(scheduler.critical_path(steps), ["root", "slow", "sink"])
+
+class TestPipelineOrchestrator(unittest.TestCase):
+    """
+    Tests for the PipelineOrchestrator.
+    """
+
+    def setUp(self):
+        """Builds an orchestrator with mocked agents."""
+        self.analysis = {"summary": "Test.", "key_tables": [], "relationships": []}
+        self.memory_manager = MagicMock()
+        self.memory_manager.get_context_for_prompt.return_value = ""
+        self.memory_manager.find_by_fingerprint.return_value = None
+        self.memory_manager.load_latest_memory.return_value = None
+        self.connector = MockConnector()
+        self.analysis_agent = MagicMock()
+        self.analysis_agent.run.return_value = json.dumps(self.analysis)
+        self.transformation_agent = MagicMock()
+        self.transformation_agent.run.return_value = "CREATE TABLE customers (customer_id INTEGER);"
+        self.optimization_agent = MagicMock()
+        self.orchestrator = PipelineOrchestrator(
+            connector=self.connector,
+            memory_manager=self.memory_manager,
+            analysis_agent=self.analysis_agent,
+            planning_agent=MagicMock(),
+            transformation_agent=self.transformation_agent,
+            validation_agent=MagicMock(),
+            optimization_agent=self.optimization_agent
+        )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.orchestrator.snapshot_dir = os.path.join(self.tmp_dir.name, "snapshots")
+        self.orchestrator.manifest_path = os.path.join(self.tmp_dir.name, "build_manifest.json")
+        self.orchestrator.analysis_output_path = os.path.join(self.tmp_dir.name, "source_analysis.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_optimization_receives_generated_ddl(self):
+        """Tests that optimization is fed the DDL from the transformation step."""
+        self.orchestrator.run_pipeline()
+
+        kwargs = self.optimization_agent.run.call_args.kwargs
+        self.assertEqual(kwargs["generated_sql"], "CREATE TABLE customers (customer_id INTEGER);")
+        self.assertEqual(kwargs["schema_analysis"], self.analysis)
+        self.memory_manager.save_memory.assert_called_once()
+        # Memory is searched with the current schema's table and column names
+        query = self.memory_manager.get_context_for_prompt.call_args.kwargs["query"]
+        self.assertIn("orders", query.split())
+        self.assertIn("user_id", query.split())
+
+    def test_analysis_reuses_the_catalog_read_for_the_run(self):
+        """Tests that the catalog read before the run is passed to analysis instead of read again."""
+        self.connector.get_schema = MagicMock(wraps=self.connector.get_schema)
+        self.orchestrator.run_pipeline()
+
+        self.assertEqual(self.connector.get_schema.call_count, 1)
+        schema_df = self.analysis_agent.run.call_args.kwargs["schema_df"]
+        self.assertEqual(list(schema_df["table_name"].unique()), ["users", "orders"])
+
+    def test_failed_analysis_halts_pipeline(self):
+        """Tests that no downstream agent runs when analysis reports an error."""
+        self.analysis_agent.run.return_value = json.dumps({"status": "error", "message": "bad"})
+        self.orchestrator.run_pipeline()
+
+        self.transformation_agent.run.assert_not_called()
+        self.memory_manager.save_memory.assert_not_called()
+
+    def test_unchanged_schema_reuses_previous_run(self):
+        """Tests that a second run of the same schema restores artifacts without the model."""
+        self.orchestrator.memory_manager = MemoryManager(filepath=os.path.join(self.tmp_dir.name, "memory.json"))
+        for name in ("plan_output_path", "sql_output_path", "validation_output_path", "optimization_output_path",
+                     "index_advice_output_path"):
+            setattr(self.orchestrator, name, os.path.join(self.tmp_dir.name, "output", name + ".txt"))
+            os.makedirs(os.path.dirname(getattr(self.orchestrator, name)), exist_ok=True)
+            with open(getattr(self.orchestrator, name), "w") as f:
+                f.write(name)
+
+        self.orchestrator.run_pipeline()
+        os.remove(self.orchestrator.sql_output_path)
+        self.orchestrator.run_pipeline()
+
+        self.assertEqual(self.analysis_agent.run.call_count, 1)
+        with open(self.orchestrator.sql_output_path) as f:
+            self.assertEqual(f.read(), "sql_output_path")
+        memory = self.orchestrator.memory_manager.load_latest_memory()
+        self.assertEqual(memory["schema_fingerprint"], schema_fingerprint(self.connector.get_schema()))
+
+        # A forced run calls the model again
+        self.orchestrator.run_pipeline(force=True)
+        self.assertEqual(self.analysis_agent.run.call_count, 2)
+
+    def test_changed_schema_runs_incrementally(self):
+        """Tests that a changed schema is diffed against the previous run's snapshot."""
+        self.orchestrator.memory_manager = MemoryManager(filepath=os.path.join(self.tmp_dir.name, "memory.json"))
+        self.orchestrator.sql_output_path = os.path.join(self.tmp_dir.name, "schema.sql")
+        with open(self.orchestrator.sql_output_path, "w") as f:
+            f.write("CREATE TABLE users (user_id INTEGER);")
+        self.transformation_agent.run_delta.return_value = "-- migrated"
+        self.orchestrator.run_pipeline()
+
+        changed_schema = self.connector.get_schema()
+        changed_schema.loc[len(changed_schema)] = ["users", "last_login", "TIMESTAMP"]
+        self.connector.get_schema = MagicMock(return_value=changed_schema)
+        self.orchestrator.run_pipeline()
+
+        kwargs = self.analysis_agent.run.call_args.kwargs
+        self.assertEqual(kwargs["previous_analysis"], self.analysis)
+        self.assertEqual(kwargs["schema_diff"].added_columns,
+                         [{"table_name": "users", "column_name": "last_login", "data_type": "TIMESTAMP"}])
+        delta_kwargs = self.transformation_agent.run_delta.call_args.kwargs
+        self.assertEqual(delta_kwargs["previous_sql"], "CREATE TABLE users (user_id INTEGER);")
+        self.assertEqual(self.transformation_agent.run.call_count, 1)
+        self.assertEqual(self.optimization_agent.run.call_args.kwargs["generated_sql"], "-- migrated")
+
+    def test_unchanged_schema_is_not_run_incrementally(self):
+        """Tests that a forced rerun of an unchanged schema takes the full path, not an empty delta."""
+        self.orchestrator.memory_manager = MemoryManager(filepath=os.path.join(self.tmp_dir.name, "memory.json"))
+        self.orchestrator.sql_output_path = os.path.join(self.tmp_dir.name, "schema.sql")
+        with open(self.orchestrator.sql_output_path, "w") as f:
+            f.write("CREATE TABLE users (user_id INTEGER);")
+        self.orchestrator.run_pipeline()
+        self.orchestrator.run_pipeline(force_steps=["planning"])
+
+        self.transformation_agent.run_delta.assert_not_called()
+        self.assertNotIn("schema_diff", self.analysis_agent.run.call_args.kwargs)
+
+    def test_up_to_date_steps_are_skipped(self):
+        """Tests that steps rebuild only when their inputs change or they are forced."""
+        agents = {
+            "planning": (self.orchestrator.planning_agent, "plan_output_path"),
+            "validation": (self.orchestrator.validation_agent, "validation_output_path"),
+            "optimization": (self.optimization_agent, "optimization_output_path"),
+        }
+        for step, (agent, path_attr) in agents.items():
+            path = os.path.join(self.tmp_dir.name, f"{step}.out")
+            setattr(self.orchestrator, path_attr, path)
+            agent.run.side_effect = lambda output_path, **kwargs: open(output_path, "w").close() or True
+        self.orchestrator.index_advice_output_path = os.path.join(self.tmp_dir.name, "index_advice.json")
+        self.optimization_agent.run.side_effect = lambda output_path, advice_output_path, **kwargs: (
+            open(output_path, "w").close() or open(advice_output_path, "w").close() or True
+        )
+        self.orchestrator.sql_output_path = os.path.join(self.tmp_dir.name, "schema.sql")
+
+        def write_sql(schema_analysis, output_path, **kwargs):
+            with open(output_path, "w") as f:
+                f.write("CREATE TABLE t (id INTEGER);")
+            return "CREATE TABLE t (id INTEGER);"
+        self.transformation_agent.run.side_effect = write_sql
+
+        self.orchestrator.run_pipeline()
+        self.orchestrator.run_pipeline()
+        # Nothing changed: no agent runs again, and the DDL is read back for optimization
+        self.assertEqual(self.analysis_agent.run.call_count, 1)
+        self.assertEqual(self.transformation_agent.run.call_count, 1)
+        self.assertEqual(self.optimization_agent.run.call_count, 1)
+        self.assertEqual(self.orchestrator.skipped_steps,
+                         {"analysis", "planning", "transformation", "validation", "optimization"})
+
+        # A tweaked planning prompt re-runs planning only
+        with patch.dict(orchestrator.STEP_PROMPTS, {"planning": "A new planning prompt."}):
+            self.orchestrator.run_pipeline()
+        self.assertEqual(self.orchestrator.planning_agent.run.call_count, 2)
+        self.assertEqual(self.orchestrator.validation_agent.run.call_count, 1)
+
+        # A forced step re-runs even though it is up to date
+        self.orchestrator.run_pipeline(force_steps=["validation"])
+        self.assertEqual(self.orchestrator.validation_agent.run.call_count, 2)
+        self.assertEqual(self.transformation_agent.run.call_count, 1)
+
+        with self.assertRaises(ValueError):
+            self.orchestrator.run_pipeline(force_steps=["deploy"])
+
+    def test_fused_mode_generates_artifacts_in_one_call(self):
+        """Tests that fused mode replaces three agent calls and falls back when it fails."""
+        fused_agent = MagicMock()
+        fused_agent.run.return_value = {
+            "planning": "plan", "transformation": "CREATE TABLE fused (id INTEGER);", "validation": "checks"
+        }
+        self.orchestrator.fused_agent = fused_agent
+        self.orchestrator.fused = True
+        for name in ("plan_output_path", "sql_output_path", "validation_output_path", "optimization_output_path"):
+            setattr(self.orchestrator, name, os.path.join(self.tmp_dir.name, name + ".txt"))
+
+        self.orchestrator.run_pipeline()
+
+        fused_agent.run.assert_called_once()
+        self.orchestrator.planning_agent.run.assert_not_called()
+        self.transformation_agent.run.assert_not_called()
+        self.assertEqual(self.optimization_agent.run.call_args.kwargs["generated_sql"],
+                         "CREATE TABLE fused (id INTEGER);")
+
+        # An unusable fused response falls back to the separate agents
+        fused_agent.run.return_value = None
+        self.orchestrator.run_pipeline(force_steps=["planning"])
+        self.assertEqual(fused_agent.run.call_count, 2)
+        self.orchestrator.planning_agent.run.assert_called_once()
+        self.orchestrator.validation_agent.run.assert_called_once()
+        self.assertEqual(self.optimization_agent.run.call_args.kwargs["generated_sql"],
+                         "CREATE TABLE customers (customer_id INTEGER);")
+
+    def test_fused_fallback_runs_separate_calls_concurrently(self):
+        """Tests that the fallback for a failed fused call runs planning, DDL and validation at once."""
+        fused_agent = MagicMock()
+        fused_agent.run.return_value = None
+        self.orchestrator.fused_agent = fused_agent
+        self.orchestrator.fused = True
+        for name in ("plan_output_path", "sql_output_path", "validation_output_path", "optimization_output_path"):
+            setattr(self.orchestrator, name, os.path.join(self.tmp_dir.name, name + ".txt"))
+        # Each call waits for the other two; run one after another they would time out
+        barrier = threading.Barrier(3, timeout=5)
+
+        def after_all_started(result):
+            def run(**_):
+                barrier.wait()
+                return result
+            return run
+
+        self.orchestrator.planning_agent.run.side_effect = after_all_started(True)
+        self.transformation_agent.run.side_effect = after_all_started("CREATE TABLE t (id INTEGER);")
+        self.orchestrator.validation_agent.run.side_effect = after_all_started(True)
+
+        self.assertTrue(self.orchestrator.run_pipeline())
+        self.assertEqual(self.optimization_agent.run.call_args.kwargs["generated_sql"], "CREATE TABLE t (id INTEGER);")
+
+    def test_schema_fingerprint_is_stable(self):
+        """Tests that the fingerprint ignores row order and changes with types."""
+        schema_df = self.connector.get_schema()
+        shuffled = schema_df.iloc[::-1].reset_index(drop=True)
+        self.assertEqual(schema_fingerprint(schema_df), schema_fingerprint(shuffled))
+
+        altered = schema_df.copy()
+        altered.loc[1, "data_type"] = "TEXT"
+        self.assertNotEqual(schema_fingerprint(schema_df), schema_fingerprint(altered))
+
+if __name__ == "__main__":
+    unittest.main()
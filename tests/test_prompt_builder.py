@@ -0,0 +1,49 @@
+# In file: tests/test_prompt_builder.py
+
+import unittest
+from unittest.mock import MagicMock
+from agents.validation_agent import DataValidationAgent
+from tools.prompt_builder import PromptBuilder, compact_json, estimate_tokens
+
+class TestPromptBuilder(unittest.TestCase):
+    """
+    Tests for the token-budgeted prompt builder.
+    """
+
+    def test_prompt_within_budget_is_unchanged(self):
+        """Tests that nothing is trimmed when the prompt fits."""
+        builder = PromptBuilder(token_budget=100)
+        prompt = builder.build("A {x} B {context}", {"x": "1", "context": "history"}, trimmable=["context"])
+        self.assertEqual(prompt, "A 1 B history")
+
+    def test_trimmable_fields_are_cut_in_priority_order(self):
+        """Tests that the lowest-priority field is trimmed first and required ones never."""
+        builder = PromptBuilder(token_budget=50)
+        fields = {"schema": "s" * 100, "context": "c" * 400, "sql": "q" * 50}
+        prompt = builder.build("{schema}|{sql}|{context}", fields, trimmable=["context", "sql"])
+
+        schema, sql, context = prompt.split("|")
+        self.assertEqual(schema, "s" * 100)
+        self.assertEqual(sql, "q" * 50)
+        self.assertLess(len(context), 400)
+        self.assertLessEqual(estimate_tokens(prompt), 50)
+
+    def test_compact_json_has_no_whitespace(self):
+        """Tests the compact serializer."""
+        self.assertEqual(compact_json({"a": [1, 2], "b": "c"}), '{"a":[1,2],"b":"c"}')
+
+    def test_agent_prompt_respects_budget(self):
+        """Tests that an agent trims stale context to stay within its budget."""
+        agent = DataValidationAgent(model_name="test-model", project="test-project", location="us-central1")
+        agent.prompt_builder.token_budget = 400
+        agent._execute_prompt = MagicMock(return_value="-- SQL")
+        agent.sql_writer = MagicMock()
+
+        agent.run({"summary": "A test schema"}, "fake/output/validation.sql", context="old run\n" * 1000)
+
+        prompt = agent._execute_prompt.call_args.args[0]
+        self.assertLessEqual(estimate_tokens(prompt), 400)
+        self.assertIn('{"summary":"A test schema"}', prompt)
+
+if __name__ == "__main__":
+    unittest.main()
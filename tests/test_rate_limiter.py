@@ -0,0 +1,163 @@
+# In file: tests/test_rate_limiter.py
+
+import asyncio
+import unittest
+from agents.base_agent import BaseAgent
+from tools import async_runtime
+from tools.rate_limiter import ModelRateLimiter
+
+class TooManyRequests(Exception):
+    """Named like the google.api_core error for HTTP 429."""
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        await asyncio.sleep(0)
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModelClient:
+    """A model client that records the order in which prompts are answered."""
+    def __init__(self, clock, latency=1.0):
+        self.clock = clock
+        self.latency = latency
+        self.answered = []
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.clock.now += self.latency
+        await asyncio.sleep(0)
+        self.answered.append(prompt)
+        return FakeResponse(f"answer to {prompt}")
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Tests for the token-bucket rate limiter and its adaptive concurrency.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make_limiter(self, **options):
+        defaults = dict(requests_per_minute=0, tokens_per_minute=0, initial_concurrency=10,
+                        max_concurrency=10, latency_target_seconds=10, clock=self.clock, sleep=self.clock.sleep)
+        defaults.update(options)
+        return ModelRateLimiter(**defaults)
+
+    def test_requests_per_minute(self):
+        """Tests that calls beyond the request quota wait for the bucket to refill."""
+        limiter = self.make_limiter(requests_per_minute=2)
+        leases = [limiter.submit("agent", 10) for _ in range(3)]
+
+        self.assertAlmostEqual(limiter.grant_ready(), 30.0)
+        self.assertEqual([lease.granted for lease in leases], [True, True, False])
+
+        self.clock.now = 30.0
+        self.assertIsNone(limiter.grant_ready())
+        self.assertTrue(leases[2].granted)
+
+    def test_tokens_per_minute_with_actual_usage(self):
+        """Tests that token reservations are charged and corrected by actual usage."""
+        limiter = self.make_limiter(tokens_per_minute=1200)
+        first = limiter.submit("agent", 800)
+        second = limiter.submit("agent", 800)
+
+        self.assertAlmostEqual(limiter.grant_ready(), 20.0)
+        self.assertTrue(first.granted)
+        self.assertFalse(second.granted)
+
+        # The first call used far fewer tokens than reserved, so the second fits now
+        limiter.release(first, actual_tokens=100)
+        self.assertTrue(second.granted)
+
+    def test_callers_take_turns(self):
+        """Tests that a caller with many queued calls cannot starve another."""
+        limiter = self.make_limiter(initial_concurrency=1, max_concurrency=1)
+        shards = [limiter.submit("analysis", 1) for _ in range(3)]
+        plan = limiter.submit("planning", 1)
+
+        order = []
+        for _ in range(4):
+            limiter.grant_ready()
+            granted = next(lease for lease in shards + [plan] if lease.granted)
+            order.append(granted.key)
+            limiter.release(granted)
+            self.clock.now += 1
+
+        self.assertEqual(order, ["analysis", "planning", "analysis", "analysis"])
+
+    def test_aimd_concurrency(self):
+        """Tests additive increase on fast calls and multiplicative decrease on 429s and slow calls."""
+        limiter = self.make_limiter(initial_concurrency=4, max_concurrency=16)
+        for _ in range(8):
+            lease = limiter.submit("agent", 1)
+            limiter.grant_ready()
+            self.clock.now += 1
+            limiter.release(lease)
+        self.assertEqual(limiter.stats()["concurrency_limit"], 5)
+
+        lease = limiter.submit("agent", 1)
+        limiter.grant_ready()
+        limiter.release(lease, error=TooManyRequests("quota exceeded"))
+        self.assertEqual(limiter.stats()["concurrency_limit"], 2)
+
+        # Failures landing together only halve the limit once per latency target
+        lease = limiter.submit("agent", 1)
+        limiter.grant_ready()
+        self.clock.now += 11
+        limiter.release(lease)
+        self.assertEqual(limiter.stats()["concurrency_limit"], 1)
+        limit = limiter.concurrency_limit
+        lease = limiter.submit("agent", 1)
+        limiter.grant_ready()
+        limiter.release(lease, error=TooManyRequests("quota exceeded"))
+        self.assertEqual(limiter.concurrency_limit, limit)
+
+    def test_agents_wait_for_quota_on_simulated_clock(self):
+        """Tests that agents sharing a limiter are paced by the request quota."""
+        limiter = self.make_limiter(requests_per_minute=2, initial_concurrency=1, max_concurrency=1,
+                                    latency_target_seconds=1000)
+        client = FakeModelClient(self.clock)
+        agents = []
+        for _ in range(2):
+            agent = BaseAgent(model_name="test-model", project="test-project", location="us-central1",
+                              use_cache=False, rate_limiter=limiter)
+            agent.model = client
+            agents.append(agent)
+
+        async def block():
+            lease = limiter.submit("other", 1)
+            limiter.grant_ready()
+            return lease
+
+        async def unblock(lease):
+            limiter.release(lease)
+
+        async def run_all():
+            # Hold the only slot until every call is queued
+            blocker = await async_runtime.run_on_shared_loop(block())
+            calls = asyncio.gather(
+                *(agents[0]._aexecute_prompt(f"shard {i}") for i in range(4)),
+                agents[1]._aexecute_prompt("plan")
+            )
+            while limiter.queued < 5:
+                await asyncio.sleep(0.001)
+            await async_runtime.run_on_shared_loop(unblock(blocker))
+            await calls
+        asyncio.run(run_all())
+
+        # The planning call does not wait behind every queued shard
+        self.assertEqual(client.answered, ["shard 0", "plan", "shard 1", "shard 2", "shard 3"])
+        # Six calls at two per minute: the last four each wait for the bucket to refill
+        self.assertGreaterEqual(self.clock.now, 120.0)
+        self.assertEqual(limiter.stats()["in_flight"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# In file: tests/test_relationship_inference.py
+
+import json
+import time
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+from agents.base_agent import BaseAgent
+from tools.relationship_inference import RelationshipInferrer
+from tools.schema_parser import SchemaParser
+
+class TestRelationshipInferrer(unittest.TestCase):
+    """
+    Tests for the naming-convention foreign-key inference pass.
+    """
+
+    def setUp(self):
+        self.inferrer = RelationshipInferrer()
+
+    def test_infers_entity_id_relationships(self):
+        """Tests the basic `<entity>_id` to primary key match."""
+        schema_df = pd.DataFrame({
+            "table_name": ["customers", "customers", "orders", "orders", "categories", "products", "products"],
+            "column_name": ["customer_id", "customer_name", "order_id", "customer_id", "id", "product_id", "category_id"],
+            "data_type": ["INTEGER", "VARCHAR", "INTEGER", "BIGINT", "INT", "INTEGER", "INTEGER"]
+        })
+        relationships = self.inferrer.infer(schema_df)
+
+        self.assertIn({
+            "from_table": "orders", "from_column": "customer_id",
+            "to_table": "customers", "to_column": "customer_id",
+            "relationship_type": "Many-to-One"
+        }, relationships)
+        self.assertIn({
+            "from_table": "products", "from_column": "category_id",
+            "to_table": "categories", "to_column": "id",
+            "relationship_type": "Many-to-One"
+        }, relationships)
+        self.assertEqual(len(relationships), 2)
+
+    def test_incompatible_types_are_skipped(self):
+        """Tests that an integer FK is not matched to a string key."""
+        schema_df = pd.DataFrame({
+            "table_name": ["customers", "orders"],
+            "column_name": ["customer_id", "customer_id"],
+            "data_type": ["VARCHAR(36)", "INTEGER"]
+        })
+        self.assertEqual(self.inferrer.infer(schema_df), [])
+
+    def test_large_catalog_is_fast(self):
+        """Tests that 100k columns are processed in well under a second."""
+        table_count, columns_per_table = 5000, 20
+        tables = np.repeat([f"entity{i}s" for i in range(table_count)], columns_per_table)
+        columns = []
+        for i in range(table_count):
+            columns.append(f"entity{i}_id")
+            columns.extend(f"entity{(i + k) % table_count}_id" for k in range(1, 6))
+            columns.extend(f"attribute_{k}" for k in range(columns_per_table - 6))
+        types = np.tile(["INTEGER"] * 6 + ["VARCHAR(255)"] * (columns_per_table - 6), table_count)
+        schema_df = pd.DataFrame({"table_name": tables, "column_name": columns, "data_type": types})
+
+        start = time.perf_counter()
+        relationships = self.inferrer.infer(schema_df)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(relationships), table_count * 5)
+        self.assertLess(elapsed, 1.0)
+
+    def test_schema_parser_adds_missed_seed_relationships(self):
+        """Tests that inferred relationships are sent to and merged after the model."""
+        agent = BaseAgent(model_name="test-model", project="test-project", location="us-central1")
+        agent._execute_prompt = MagicMock(return_value=json.dumps({
+            "summary": "Shop.", "key_tables": [], "relationships": []
+        }))
+        schema_df = pd.DataFrame({
+            "table_name": ["customers", "orders"],
+            "column_name": ["customer_id", "customer_id"],
+            "data_type": ["INTEGER", "INTEGER"]
+        })
+
+        result = SchemaParser(agent=agent).analyze_schema(schema_df, "{schema_json}")
+
+        self.assertIn("customer_id", agent._execute_prompt.call_args.args[0].split("inferred")[1])
+        self.assertEqual(result["relationships"][0]["to_table"], "customers")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# In file: tests/test_response_cache.py
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import AsyncMock
+from agents.base_agent import BaseAgent
+from tools.model_registry import PlaceholderModelClient
+from tools.response_cache import ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Tests for the persistent model response cache.
+    """
+
+    def setUp(self):
+        """Creates a cache in a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, "llm_cache")
+        self.cache = ResponseCache(cache_dir=self.cache_dir)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_key_depends_on_model_params_and_prompt(self):
+        """Tests that every keyed input changes the cache key."""
+        base = ResponseCache.make_key("model", 0.5, 100, "prompt")
+        self.assertEqual(base, ResponseCache.make_key("model", 0.5, 100, "prompt"))
+        self.assertNotEqual(base, ResponseCache.make_key("other", 0.5, 100, "prompt"))
+        self.assertNotEqual(base, ResponseCache.make_key("model", 0.7, 100, "prompt"))
+        self.assertNotEqual(base, ResponseCache.make_key("model", 0.5, 200, "prompt"))
+        self.assertNotEqual(base, ResponseCache.make_key("model", 0.5, 100, "prompt!"))
+        self.assertNotEqual(base, ResponseCache.make_key("model", 0.5, 100, "prompt", client="vertex"))
+
+    def test_hit_miss_and_persistence(self):
+        """Tests counters and that entries survive a new cache instance."""
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.put("k", "response")
+        self.assertEqual(self.cache.get("k"), "response")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+        reloaded = ResponseCache(cache_dir=self.cache_dir)
+        self.assertEqual(reloaded.get("k"), "response")
+
+    def test_lru_eviction_by_size(self):
+        """Tests that the least recently used entry is evicted first."""
+        cache = ResponseCache(cache_dir=self.cache_dir, max_bytes=60)
+        cache.put("a", "x" * 10)
+        cache.put("b", "y" * 10)
+        cache.get("a")
+        cache.put("c", "z" * 10)
+
+        self.assertEqual(cache.get("a"), "x" * 10)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "z" * 10)
+
+    def test_expired_entries_are_misses(self):
+        """Tests that entries unused for longer than the max age are dropped."""
+        cache = ResponseCache(cache_dir=self.cache_dir, max_age_seconds=0.01)
+        cache.put("k", "response")
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_agent_uses_cache_unless_bypassed(self):
+        """Tests that a repeated prompt only reaches the model once."""
+        agent = BaseAgent(
+            model_name="test-model",
+            project="test-project",
+            location="us-central1",
+            response_cache=self.cache
+        )
+        agent._agenerate = AsyncMock(return_value="model output")
+
+        self.assertEqual(agent._execute_prompt("same prompt"), "model output")
+        self.assertEqual(agent._execute_prompt("same prompt"), "model output")
+        agent._agenerate.assert_awaited_once()
+
+        agent.use_cache = False
+        agent._execute_prompt("same prompt")
+        self.assertEqual(agent._agenerate.await_count, 2)
+
+    def test_placeholder_responses_are_not_served_to_a_real_client(self):
+        """Tests that responses cached under one model client are misses for another."""
+        agent = BaseAgent(
+            model_name="test-model",
+            project="test-project",
+            location="us-central1",
+            response_cache=self.cache
+        )
+        agent.model = PlaceholderModelClient("test-model")
+        agent._agenerate = AsyncMock(return_value="placeholder output")
+        agent._execute_prompt("same prompt")
+
+        agent.model = object()
+        agent._agenerate = AsyncMock(return_value="model output")
+        self.assertEqual(agent._execute_prompt("same prompt"), "model output")
+        agent._agenerate.assert_awaited_once()
+
+if __name__ == "__main__":
+    unittest.main()
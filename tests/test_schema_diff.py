@@ -0,0 +1,178 @@
+# In file: tests/test_schema_diff.py
+
+import json
+import unittest
+from unittest.mock import MagicMock
+import pandas as pd
+from agents.transformation_agent import SchemaTransformationAgent
+from tools.prompt_builder import PromptBuilder
+from tools.schema_diff import diff_schemas
+from tools.schema_parser import SchemaParser
+
+def make_schema(rows):
+    return pd.DataFrame(rows, columns=["table_name", "column_name", "data_type"])
+
+PREVIOUS_SCHEMA = make_schema([
+    ("customers", "customer_id", "INTEGER"),
+    ("customers", "email", "VARCHAR(255)"),
+    ("orders", "order_id", "INTEGER"),
+    ("orders", "customer_id", "INTEGER"),
+    ("products", "product_id", "INTEGER"),
+    ("audit_log", "entry", "TEXT"),
+])
+
+CURRENT_SCHEMA = make_schema([
+    ("customers", "customer_id", "INTEGER"),
+    ("customers", "email", "VARCHAR(255)"),
+    ("orders", "order_id", "INTEGER"),
+    ("orders", "customer_id", "BIGINT"),
+    ("products", "product_id", "INTEGER"),
+    ("products", "sku", "VARCHAR(64)"),
+    ("shipments", "shipment_id", "INTEGER"),
+])
+
+PREVIOUS_REPORT = {
+    "summary": "A small shop.",
+    "key_tables": [
+        {"table_name": "customers", "role": "Dimension", "description": "Customers."},
+        {"table_name": "orders", "role": "Fact", "description": "Orders."},
+        {"table_name": "products", "role": "Dimension", "description": "Products."},
+        {"table_name": "audit_log", "role": "Fact", "description": "Audit entries."},
+    ],
+    "relationships": [
+        {"from_table": "orders", "from_column": "customer_id", "to_table": "customers",
+         "to_column": "customer_id", "relationship_type": "Many-to-One"},
+    ],
+}
+
+class TestSchemaDiff(unittest.TestCase):
+    """
+    Tests for schema diffing and incremental re-analysis.
+    """
+
+    def test_diff_reports_added_dropped_and_altered(self):
+        """Tests that tables and columns are classified by how they changed."""
+        schema_diff = diff_schemas(PREVIOUS_SCHEMA, CURRENT_SCHEMA)
+
+        self.assertEqual(list(schema_diff.added_tables), ["shipments"])
+        self.assertEqual(schema_diff.dropped_tables, ["audit_log"])
+        self.assertEqual(schema_diff.added_columns,
+                         [{"table_name": "products", "column_name": "sku", "data_type": "VARCHAR(64)"}])
+        self.assertEqual(schema_diff.altered_columns, [{
+            "table_name": "orders", "column_name": "customer_id", "old_type": "INTEGER", "new_type": "BIGINT"
+        }])
+        self.assertTrue(diff_schemas(PREVIOUS_SCHEMA, PREVIOUS_SCHEMA).is_empty)
+        json.dumps(schema_diff.to_dict())
+
+    def test_affected_tables_include_relationship_neighbours(self):
+        """Tests that tables related to a changed table are re-analyzed too."""
+        schema_diff = diff_schemas(PREVIOUS_SCHEMA, CURRENT_SCHEMA)
+        affected = schema_diff.affected_tables(PREVIOUS_REPORT["relationships"])
+        self.assertEqual(affected, {"orders", "customers", "products", "shipments"})
+
+    def test_migration_sql(self):
+        """Tests that the diff renders as ALTER TABLE migrations."""
+        migration = diff_schemas(PREVIOUS_SCHEMA, CURRENT_SCHEMA).to_migration_sql()
+
+        self.assertIn("CREATE TABLE shipments (\n    shipment_id INTEGER\n);", migration)
+        self.assertIn("ALTER TABLE products ADD COLUMN sku VARCHAR(64);", migration)
+        self.assertIn("ALTER TABLE orders ALTER COLUMN customer_id TYPE BIGINT;", migration)
+        self.assertIn("DROP TABLE audit_log;", migration)
+
+    def test_migration_sql_with_catalog_keeps_keys(self):
+        """Tests that a migration from the catalog carries the same keys as a full run's DDL."""
+        previous = PREVIOUS_SCHEMA.assign(is_nullable=True)
+        current = pd.concat([
+            CURRENT_SCHEMA,
+            make_schema([("orders", "shipment_id", "INTEGER"), ("shipments", "order_id", "INTEGER")]),
+        ], ignore_index=True).assign(is_nullable=True)
+        current.loc[current["column_name"] == "sku", "is_nullable"] = False
+        relationships = [
+            {"from_table": "shipments", "from_column": "order_id", "to_table": "orders", "to_column": "order_id"},
+            {"from_table": "orders", "from_column": "shipment_id", "to_table": "shipments", "to_column": "shipment_id"},
+            {"from_table": "orders", "from_column": "customer_id", "to_table": "customers", "to_column": "customer_id"},
+        ]
+
+        migration = diff_schemas(previous, current).to_migration_sql(current, relationships)
+
+        self.assertIn("    PRIMARY KEY (shipment_id),\n    FOREIGN KEY (order_id) REFERENCES orders (order_id)", migration)
+        self.assertIn("ALTER TABLE products ADD COLUMN sku VARCHAR(64) NOT NULL;", migration)
+        self.assertIn("ALTER TABLE orders ADD FOREIGN KEY (shipment_id) REFERENCES shipments (shipment_id);", migration)
+        # Unchanged foreign keys are already in the previous DDL
+        self.assertNotIn("REFERENCES customers", migration)
+        # Drops come before anything that could still refer to them
+        self.assertLess(migration.index("DROP TABLE audit_log;"), migration.index("CREATE TABLE shipments"))
+        self.assertLess(migration.index("CREATE TABLE shipments"), migration.index("ALTER TABLE orders ADD FOREIGN KEY"))
+
+    def test_incremental_analysis_patches_previous_report(self):
+        """Tests that only affected tables are sent to the model and the rest is kept."""
+        previous = make_schema([(f"table_{i}", "id", "INTEGER") for i in range(10)])
+        current = previous.copy()
+        current.loc[len(current)] = ["table_3", "note", "TEXT"]
+        report = {
+            "summary": "Ten tables.",
+            "key_tables": [{"table_name": f"table_{i}", "description": "old"} for i in range(10)],
+            "relationships": [],
+        }
+        agent = MagicMock()
+        agent.prompt_builder = PromptBuilder(token_budget=100000)
+        agent._execute_prompt.return_value = json.dumps({
+            "summary": "Partial.",
+            "key_tables": [{"table_name": "table_3", "description": "new"}],
+            "relationships": [],
+        })
+        parser = SchemaParser(agent=agent)
+
+        patched = parser.analyze_schema_incremental(
+            current, "Analyze: {schema_json} {context}", report, diff_schemas(previous, current)
+        )
+
+        prompt = agent._execute_prompt.call_args.args[0]
+        self.assertIn('"table_name":"table_3"', prompt)
+        self.assertNotIn('"table_name":"table_4"', prompt)
+        self.assertEqual(patched["summary"], "Ten tables.")
+        descriptions = {table["table_name"]: table["description"] for table in patched["key_tables"]}
+        self.assertEqual(descriptions["table_3"], "new")
+        self.assertEqual(descriptions["table_4"], "old")
+        self.assertEqual(len(descriptions), 10)
+
+    def test_transformation_delta_appends_migration(self):
+        """Tests that the DDL step writes a migration instead of regenerating the DDL."""
+        agent = SchemaTransformationAgent(model_name="test-model", project="test-project", location="us-central1")
+        agent.sql_writer = MagicMock()
+        agent._execute_prompt = MagicMock()
+
+        generated_sql = agent.run_delta(
+            diff_schemas(PREVIOUS_SCHEMA, CURRENT_SCHEMA),
+            previous_sql="CREATE TABLE customers (customer_id INTEGER);\n",
+            output_path="out/schema.sql",
+            migration_output_path="out/schema_migration.sql",
+            relationships=[{"from_table": "orders", "from_column": "customer_id",
+                            "to_table": "customers", "to_column": "customer_id"}],
+            schema_df=CURRENT_SCHEMA
+        )
+
+        agent._execute_prompt.assert_not_called()
+        self.assertTrue(generated_sql.startswith("CREATE TABLE customers"))
+        self.assertIn("ALTER TABLE products ADD COLUMN sku VARCHAR(64);", generated_sql)
+        saved_paths = [call.kwargs["output_path"] for call in agent.sql_writer.save_sql.call_args_list]
+        self.assertEqual(saved_paths, ["out/schema_migration.sql", "out/schema.sql"])
+
+    def test_transformation_delta_keeps_ddl_for_empty_diff(self):
+        """Tests that an unchanged schema appends nothing to the previous DDL."""
+        agent = SchemaTransformationAgent(model_name="test-model", project="test-project", location="us-central1")
+        agent.sql_writer = MagicMock()
+        previous_sql = "CREATE TABLE customers (customer_id INTEGER);\n"
+
+        generated_sql = agent.run_delta(
+            diff_schemas(PREVIOUS_SCHEMA, PREVIOUS_SCHEMA),
+            previous_sql=previous_sql,
+            output_path="out/schema.sql",
+            migration_output_path="out/schema_migration.sql"
+        )
+
+        self.assertEqual(generated_sql, previous_sql)
+        agent.sql_writer.save_sql.assert_called_with(sql_content=previous_sql, output_path="out/schema.sql")
+
+if __name__ == "__main__":
+    unittest.main()
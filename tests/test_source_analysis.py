@@ -47,5 +47,24 @@ class TestSourceAnalysisAgent(unittest.TestCase):
         self.assertEqual(report_dict["summary"], "This is a successful analysis.")
         agent._execute_prompt.assert_called_once() # Verify the LLM was called
 
+    def test_run_uses_given_schema(self):
+        """Tests that a schema passed in by the caller is analyzed without reading the catalog again."""
+        connector = MockConnector()
+        connector.get_schema = MagicMock()
+        agent = SourceAnalysisAgent(
+            connector=connector,
+            model_name="test-model",
+            project="test-project",
+            location="us-central1"
+        )
+        agent.schema_parser.analyze_schema = MagicMock(return_value={"summary": "Given.", "key_tables": [], "relationships": []})
+        schema_df = MockConnector().get_schema()
+
+        report_dict = json.loads(agent.run(schema_df=schema_df))
+
+        self.assertEqual(report_dict["summary"], "Given.")
+        connector.get_schema.assert_not_called()
+        self.assertIs(agent.schema_parser.analyze_schema.call_args.args[0], schema_df)
+
 if __name__ == "__main__":
     unittest.main()
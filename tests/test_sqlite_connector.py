@@ -0,0 +1,88 @@
+# In file: tests/test_sqlite_connector.py
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from tools.sqlite_connector import SqliteConnector
+
+class TestSqliteConnector(unittest.TestCase):
+    """
+    Tests for the SQLite catalog connector.
+    """
+
+    def setUp(self):
+        """Creates a small SQLite database with declared foreign keys."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "source.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            CREATE TABLE customers (
+                customer_id INTEGER PRIMARY KEY,
+                customer_name VARCHAR(255) NOT NULL
+            );
+            CREATE TABLE orders (
+                order_id INTEGER PRIMARY KEY,
+                customer_id INTEGER REFERENCES customers(customer_id),
+                placed_by INTEGER REFERENCES customers,
+                order_date TIMESTAMP
+            );
+        """)
+        conn.close()
+        self.connector = SqliteConnector(database_path=self.db_path, pool_size=2)
+
+    def tearDown(self):
+        self.connector.disconnect()
+        self.tmp_dir.cleanup()
+
+    def test_get_schema_reads_columns_and_keys(self):
+        """Tests that columns, types, nullability and primary keys are read."""
+        self.connector.connect()
+        schema_df = self.connector.get_schema()
+
+        self.assertEqual(list(schema_df["table_name"]), ["customers"] * 2 + ["orders"] * 4)
+        orders = schema_df[schema_df["table_name"] == "orders"].set_index("column_name")
+        self.assertEqual(orders.loc["order_date", "data_type"], "TIMESTAMP")
+        self.assertTrue(orders.loc["order_id", "is_primary_key"])
+        self.assertFalse(orders.loc["order_id", "is_nullable"])
+        customers = schema_df[schema_df["table_name"] == "customers"].set_index("column_name")
+        self.assertFalse(customers.loc["customer_name", "is_nullable"])
+
+    def test_declared_foreign_keys(self):
+        """Tests that declared foreign keys are returned, resolving implicit targets."""
+        self.connector.connect()
+        self.connector.get_schema()
+
+        foreign_keys = sorted(self.connector.get_foreign_keys(), key=lambda fk: fk["from_column"])
+        self.assertEqual(foreign_keys, [
+            {"from_table": "orders", "from_column": "customer_id", "to_table": "customers",
+             "to_column": "customer_id", "relationship_type": "Many-to-One"},
+            {"from_table": "orders", "from_column": "placed_by", "to_table": "customers",
+             "to_column": "customer_id", "relationship_type": "Many-to-One"},
+        ])
+
+    def test_many_tables_read_through_bounded_pool(self):
+        """Tests that a large catalog is read concurrently without exceeding the pool."""
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("".join(
+            f"CREATE TABLE t{i:04d} (id INTEGER PRIMARY KEY, customer_id INTEGER REFERENCES customers);"
+            for i in range(300)
+        ))
+        conn.close()
+
+        self.connector.connect()
+        schema_df = self.connector.get_schema()
+
+        self.assertEqual(schema_df["table_name"].nunique(), 302)
+        self.assertEqual(len(self.connector.get_foreign_keys()), 302)
+        self.assertLessEqual(self.connector.pool.size, 2)
+
+    def test_missing_database_fails_to_connect(self):
+        """Tests that a wrong path raises instead of creating an empty database."""
+        connector = SqliteConnector(database_path=os.path.join(self.tmp_dir.name, "missing.db"))
+        with self.assertRaises(sqlite3.Error):
+            connector.connect()
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir.name, "missing.db")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+# In file: tests/test_streaming.py
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+import pandas as pd
+from agents.transformation_agent import SchemaTransformationAgent
+from agents.validation_agent import DataValidationAgent
+from orchestrator import PipelineOrchestrator
+from tools.response_cache import ResponseCache
+from tools.sql_writer import SqlWriter
+
+class FakeStreamingClient:
+    """A model client that streams a fixed response in chunks."""
+    def __init__(self, chunks, gate=None, fail_after=None):
+        self.chunks = chunks
+        self.gate = gate
+        self.fail_after = fail_after
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        return self._stream()
+
+    async def _stream(self):
+        for index, chunk in enumerate(self.chunks):
+            if index == self.fail_after:
+                raise RuntimeError("stream interrupted")
+            yield MagicMock(text=chunk)
+            if index == 0 and self.gate is not None:
+                # Hold the rest back until the consumer has seen the first chunk
+                await asyncio.get_running_loop().run_in_executor(None, self.gate.wait, 5)
+
+class TestStreaming(unittest.TestCase):
+    """
+    Tests for streaming model output to files and the dashboard.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.tmp_dir.name, "schema.sql")
+        self.agent = SchemaTransformationAgent(
+            model_name="test-model",
+            project="test-project",
+            location="us-central1",
+            response_cache=ResponseCache(cache_dir=os.path.join(self.tmp_dir.name, "llm_cache"))
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_chunks_arrive_before_the_response_completes(self):
+        """Tests that the first chunk is written to disk while the model is still generating."""
+        gate = threading.Event()
+        self.agent.model = FakeStreamingClient(["CREATE TABLE a (id INT);\n", "CREATE TABLE b (id INT);\n"], gate=gate)
+        on_disk = []
+
+        def on_chunk(chunk):
+            with open(self.output_path) as f:
+                on_disk.append(f.read())
+            gate.set()
+
+        generated_sql = self.agent.run({"summary": "test"}, self.output_path, on_chunk=on_chunk)
+
+        self.assertEqual(on_disk[0], "CREATE TABLE a (id INT);\n")
+        self.assertEqual(generated_sql, "CREATE TABLE a (id INT);\nCREATE TABLE b (id INT);\n")
+
+    def test_streamed_response_is_cached(self):
+        """Tests that a repeated prompt is served from the cache as one chunk."""
+        client = FakeStreamingClient(["-- a", "-- b"])
+        self.agent.model = client
+
+        first = list(self.agent._execute_prompt_stream("same prompt"))
+        second = list(self.agent._execute_prompt_stream("same prompt"))
+
+        self.assertEqual(first, ["-- a", "-- b"])
+        self.assertEqual(second, ["-- a-- b"])
+        self.assertEqual(self.agent._execute_prompt("same prompt"), "-- a-- b")
+        self.assertEqual(client.calls, 1)
+
+    def test_interrupted_stream_saves_error(self):
+        """Tests that an error mid-stream is reported like any other failure."""
+        validation_agent = DataValidationAgent(
+            model_name="test-model",
+            project="test-project",
+            location="us-central1",
+            use_cache=False
+        )
+        validation_agent.model = FakeStreamingClient(["-- a", "-- b"], fail_after=1)
+
+        built = validation_agent.run({"summary": "test"}, self.output_path, on_chunk=lambda chunk: None)
+
+        self.assertFalse(built)
+        with open(self.output_path) as f:
+            self.assertIn("stream interrupted", f.read())
+
+    def test_sql_writer_streams_to_disk(self):
+        """Tests that streamed content is written in order and counted."""
+        seen = []
+        written = SqlWriter().stream_sql(iter(["SELECT ", "1;"]), self.output_path, on_chunk=seen.append)
+
+        self.assertEqual(written, 9)
+        self.assertEqual(seen, ["SELECT ", "1;"])
+        with open(self.output_path) as f:
+            self.assertEqual(f.read(), "SELECT 1;")
+
+    def test_orchestrator_forwards_chunks_to_dashboard(self):
+        """Tests that partial output reaches Socket.IO and time to first chunk is recorded."""
+        connector = MagicMock()
+        connector.get_schema.return_value = pd.DataFrame(
+            [["customers", "customer_id", "INTEGER"]],
+            columns=["table_name", "column_name", "data_type"]
+        )
+        connector.get_schema_fingerprint.return_value = "abc"
+        memory_manager = MagicMock()
+        memory_manager.get_context_for_prompt.return_value = ""
+        memory_manager.find_by_fingerprint.return_value = None
+        memory_manager.load_latest_memory.return_value = None
+        analysis_agent = MagicMock()
+        analysis_agent.run.return_value = json.dumps({"summary": "s", "key_tables": [], "relationships": []})
+
+        def stream_plan(schema_analysis, output_path, on_chunk):
+            on_chunk("# Plan")
+            on_chunk(" body")
+            return True
+
+        planning_agent = MagicMock()
+        planning_agent.run.side_effect = stream_plan
+        transformation_agent = MagicMock()
+        transformation_agent.run.return_value = "CREATE TABLE customers (customer_id INTEGER);"
+        socketio = MagicMock()
+        orchestrator = PipelineOrchestrator(
+            connector=connector,
+            memory_manager=memory_manager,
+            analysis_agent=analysis_agent,
+            planning_agent=planning_agent,
+            transformation_agent=transformation_agent,
+            validation_agent=MagicMock(),
+            optimization_agent=MagicMock(),
+            socketio=socketio,
+            output_dir=self.tmp_dir.name
+        )
+
+        orchestrator.run_pipeline()
+
+        chunks = [call.args[1] for call in socketio.emit.call_args_list if call.args[0] == "file_chunk"]
+        self.assertEqual(chunks, [
+            {"file_type": "plan", "chunk": "# Plan"},
+            {"file_type": "plan", "chunk": " body"},
+        ])
+        self.assertIn("planning", orchestrator.first_chunk_seconds)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@
 
 import unittest
 from unittest.mock import MagicMock, patch, mock_open
+import pandas as pd
 from agents.transformation_agent import SchemaTransformationAgent
 
 class TestSchemaTransformationAgent(unittest.TestCase):
@@ -50,5 +51,43 @@ class TestSchemaTransformationAgent(unittest.TestCase):
             # Check that the correct content was written to the file
             mocked_file().write.assert_called_once_with(mock_sql_script)
 
+    def test_run_with_catalog_skips_the_model(self):
+        """
+        Tests that the DDL is generated from the catalog, with analysis descriptions as comments.
+        """
+        schema_df = pd.DataFrame({
+            "table_name": ["customers", "customers"],
+            "column_name": ["customer_id", "customer_name"],
+            "data_type": ["INTEGER", "VARCHAR(255)"]
+        })
+        schema_analysis = {
+            "key_tables": [{"table_name": "customers", "description": "Stores customer data."}],
+            "relationships": []
+        }
+        self.agent._execute_prompt = MagicMock()
+
+        with patch("tools.sql_writer.SqlWriter.save_sql") as mock_save_sql:
+            sql = self.agent.run(schema_analysis, "fake/output/schema.sql", schema_df=schema_df)
+
+        self.agent._execute_prompt.assert_not_called()
+        self.assertIn("-- Stores customer data.\nCREATE TABLE customers", sql)
+        mock_save_sql.assert_called_once_with(sql_content=sql, output_path="fake/output/schema.sql")
+
+    def test_model_comments_are_optional(self):
+        """
+        Tests that model comments are used when enabled, and a bad reply keeps the DDL.
+        """
+        schema_df = pd.DataFrame({"table_name": ["t"], "column_name": ["t_id"], "data_type": ["INTEGER"]})
+        self.agent._execute_prompt = MagicMock(return_value='{"t": "Holds t rows."}')
+
+        with patch("agents.transformation_agent.settings.DDL_MODEL_COMMENTS", True), \
+             patch("tools.sql_writer.SqlWriter.save_sql"):
+            sql = self.agent.run({"key_tables": []}, "schema.sql", schema_df=schema_df)
+            self.assertIn("-- Holds t rows.\nCREATE TABLE t", sql)
+
+            self.agent._execute_prompt.return_value = "No comments today."
+            sql = self.agent.run({"key_tables": []}, "schema.sql", schema_df=schema_df)
+            self.assertIn("CREATE TABLE t (", sql)
+
 if __name__ == "__main__":
     unittest.main()
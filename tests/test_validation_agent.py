@@ -2,7 +2,9 @@
 
 import unittest
 from unittest.mock import patch, mock_open, MagicMock
+import pandas as pd
 from agents.validation_agent import DataValidationAgent
+from tools.validation_query_generator import ValidationQueryGenerator
 
 class TestDataValidationAgent(unittest.TestCase):
     """
@@ -39,5 +41,67 @@ class TestDataValidationAgent(unittest.TestCase):
                 output_path=output_path
             )
 
+    def test_run_with_catalog_asks_model_for_business_rules_only(self):
+        """
+        Tests that standard checks come from templates and the model adds business rules.
+        """
+        schema_df = pd.DataFrame({
+            "table_name": ["customers", "customers", "orders", "orders", "orders"],
+            "column_name": ["customer_id", "customer_name", "order_id", "customer_id", "order_date"],
+            "data_type": ["INTEGER", "VARCHAR", "INTEGER", "INTEGER", "TIMESTAMP"]
+        })
+        schema_analysis = {
+            "key_tables": [],
+            "relationships": [{"from_table": "orders", "from_column": "customer_id",
+                               "to_table": "customers", "to_column": "customer_id"}]
+        }
+
+        with patch("tools.sql_writer.SqlWriter.save_sql") as mock_save_sql:
+            self.assertTrue(self.agent.run(schema_analysis, "validation.sql", schema_df=schema_df))
+
+        sql = mock_save_sql.call_args.kwargs["sql_content"]
+        # One scan per table batches the row count and every NULL check
+        self.assertEqual(sql.count("COUNT(*) AS row_count"), 2)
+        self.assertIn("SUM(CASE WHEN t.customer_name IS NULL THEN 1 ELSE 0 END) AS customer_name_nulls", sql)
+        # Every column is NULL-checked; only the referenced key must be 0, since the catalog declares nothing
+        self.assertIn("SUM(CASE WHEN t.order_date IS NULL THEN 1 ELSE 0 END) AS order_date_nulls", sql)
+        self.assertEqual(sql.count("-- Required to be 0:"), 1)
+        self.assertIn("-- Required to be 0: customer_id_nulls\nSELECT\n    'customers' AS table_name", sql)
+        self.assertIn("NOT EXISTS (SELECT 1 FROM target.customers r WHERE r.customer_id = t.customer_id)", sql)
+        self.assertTrue(sql.rstrip().endswith("-- Mocked Validation SQL"))
+        prompt = self.agent._execute_prompt.call_args.args[0]
+        self.assertIn("business rules", prompt)
+
+    def test_required_columns_come_from_the_catalog(self):
+        """
+        Tests that only NOT NULL and primary-key columns of the catalog must have no NULLs.
+        """
+        schema_df = pd.DataFrame({
+            "table_name": ["people"] * 3,
+            "column_name": ["person_id", "first_name", "middle_name"],
+            "data_type": ["INTEGER", "VARCHAR", "VARCHAR"],
+            "is_nullable": [False, False, True],
+            "is_primary_key": [True, False, False],
+        })
+
+        sql = ValidationQueryGenerator().generate(schema_df)
+
+        self.assertIn("-- Required to be 0: person_id_nulls, first_name_nulls\n", sql)
+        self.assertIn("AS middle_name_nulls", sql)
+
+    def test_business_rule_failure_keeps_template_checks(self):
+        """
+        Tests that a failed model call still leaves the template checks in place.
+        """
+        schema_df = pd.DataFrame({"table_name": ["t"], "column_name": ["t_id"], "data_type": ["INTEGER"]})
+        self.agent._execute_prompt.side_effect = RuntimeError("model unavailable")
+
+        with patch("tools.sql_writer.SqlWriter.save_sql") as mock_save_sql:
+            self.assertTrue(self.agent.run({}, "validation.sql", schema_df=schema_df))
+
+        sql = mock_save_sql.call_args.kwargs["sql_content"]
+        self.assertIn("FROM target.t t;", sql)
+        self.assertIn("-- Business-rule checks could not be generated: model unavailable", sql)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,140 @@
+# In file: tools/async_runtime.py
+
+import asyncio
+import logging
+import queue
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional
+
+from config import settings
+
+logger = logging.getLogger("AsyncRuntime")
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_concurrency_limit: Optional[int] = None
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the process-wide event loop used for model calls.
+
+    The loop runs on a daemon thread and is started on first use, so a single
+    loop can keep many model calls in flight for every agent in the process.
+    """
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(
+                target=_loop.run_forever,
+                name="axon-model-loop",
+                daemon=True
+            )
+            _loop_thread.start()
+            logger.info("Started shared event loop for model calls.")
+        return _loop
+
+def set_concurrency_limit(limit: int):
+    """
+    Overrides the maximum number of concurrent model calls.
+
+    Args:
+        limit: The new limit. Takes effect for calls that have not yet
+            acquired a slot.
+    """
+    global _semaphore, _concurrency_limit
+    if limit < 1:
+        raise ValueError("Concurrency limit must be at least 1.")
+    with _lock:
+        _concurrency_limit = limit
+        _semaphore = None
+
+def get_concurrency_limit() -> int:
+    """Returns the active concurrency limit."""
+    return _concurrency_limit or settings.MAX_CONCURRENT_MODEL_CALLS
+
+def model_call_slot() -> asyncio.Semaphore:
+    """
+    Returns the shared semaphore bounding concurrent model calls.
+
+    Must be used from the shared loop (see run_on_shared_loop).
+    """
+    global _semaphore
+    with _lock:
+        if _semaphore is None:
+            _semaphore = asyncio.Semaphore(get_concurrency_limit())
+        return _semaphore
+
+async def run_on_shared_loop(coro: Awaitable[Any]) -> Any:
+    """
+    Awaits a coroutine on the shared loop from any event loop.
+
+    Args:
+        coro: The coroutine to run.
+
+    Returns:
+        The coroutine's result.
+    """
+    loop = get_loop()
+    try:
+        current = asyncio.get_running_loop()
+    except RuntimeError:
+        current = None
+    if current is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """
+    Runs a coroutine on the shared loop and blocks until it completes.
+
+    This is the bridge used by the synchronous agent API.
+
+    Raises:
+        RuntimeError: If called from the shared loop's own thread, where
+            blocking would deadlock the loop.
+    """
+    loop = get_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync cannot be called from the shared model loop; await the coroutine instead.")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+def iterate_sync(agen: AsyncIterator[Any]) -> Iterator[Any]:
+    """
+    Iterates an async generator on the shared loop from a synchronous caller.
+
+    Items are handed over as soon as the generator yields them, so the caller
+    can process the first item while later ones are still being produced.
+    Closing the returned iterator early cancels the generator.
+
+    Raises:
+        RuntimeError: If called from the shared loop's own thread.
+    """
+    loop = get_loop()
+    if threading.current_thread() is _loop_thread:
+        raise RuntimeError("iterate_sync cannot be called from the shared model loop; iterate asynchronously instead.")
+    items: queue.Queue = queue.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put(item)
+        finally:
+            items.put(done)
+
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            yield item
+        # Re-raises any error from the generator
+        future.result()
+    finally:
+        if not future.done():
+            future.cancel()
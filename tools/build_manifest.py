@@ -0,0 +1,81 @@
+# In file: tools/build_manifest.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+def hash_inputs(inputs: Dict[str, Any]) -> str:
+    """
+    Hashes the inputs of a pipeline step.
+
+    Args:
+        inputs: JSON-serializable inputs, e.g. the prompt template, the
+            analysis report, upstream artifacts and model settings.
+
+    Returns:
+        The hex SHA-256 digest of the inputs.
+    """
+    encoded = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class BuildManifest:
+    """
+    Records the input hash each pipeline step's output was built from.
+
+    Like a make target, a step is up to date when its output file exists and
+    was built from inputs with the same hash, and can then be skipped. The
+    manifest is a small JSON file kept next to the outputs.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, str]] = self._load()
+
+    def is_up_to_date(self, step: str, input_hash: str, output_path: str) -> bool:
+        """Returns True if `output_path` was built by `step` from the same inputs."""
+        entry = self._entries.get(step)
+        return (
+            entry is not None
+            and entry.get("input_hash") == input_hash
+            and entry.get("output") == output_path
+            and os.path.exists(output_path)
+        )
+
+    def record(self, step: str, input_hash: str, output_path: str):
+        """Records that `step` built `output_path` from inputs with `input_hash`."""
+        with self._lock:
+            self._entries[step] = {"input_hash": input_hash, "output": output_path}
+            self._save()
+
+    def invalidate(self, step: Optional[str] = None):
+        """Forgets one step's entry, or every entry if no step is given."""
+        with self._lock:
+            if step is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(step, None)
+            self._save()
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (IOError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Ignoring unreadable build manifest at {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,119 @@
+# In file: tools/connection_pool.py
+
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+class ConnectionPool:
+    """
+    A small, thread-safe pool of database connections.
+
+    Connections are created lazily by a factory up to `max_size`. Callers that
+    find the pool exhausted wait until a connection is returned. When a
+    `health_check` is given, idle connections are checked before they are
+    handed out; a connection that fails is closed and replaced.
+    """
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_size: int = 4,
+        health_check: Optional[Callable[[Any], bool]] = None
+    ):
+        if max_size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.factory = factory
+        self.max_size = max_size
+        self.health_check = health_check
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._all: List[Any] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Borrows a connection for the duration of a `with` block.
+
+        Args:
+            timeout: Seconds to wait for a free connection; None waits forever.
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Takes a healthy idle connection, creating one if the pool is not full."""
+        while True:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed.")
+            conn, is_new = self._take(timeout)
+            # Freshly opened connections are trusted; only reused ones are checked
+            if is_new or self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn: Any):
+        """Returns a connection to the pool."""
+        if self._closed:
+            self._close_quietly(conn)
+            return
+        self._idle.put(conn)
+
+    def close(self):
+        """Closes every connection owned by the pool."""
+        with self._lock:
+            self._closed = True
+            for conn in self._all:
+                self._close_quietly(conn)
+            self._all.clear()
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+    @property
+    def size(self) -> int:
+        """The number of connections currently open."""
+        return len(self._all)
+
+    def _take(self, timeout: Optional[float]) -> Tuple[Any, bool]:
+        try:
+            return self._idle.get_nowait(), False
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.max_size:
+                conn = self.factory()
+                self._all.append(conn)
+                self.logger.debug(f"Opened connection {len(self._all)} of {self.max_size}.")
+                return conn, True
+        try:
+            return self._idle.get(timeout=timeout), False
+        except queue.Empty:
+            raise TimeoutError(f"No connection available within {timeout} seconds.")
+
+    def _is_healthy(self, conn: Any) -> bool:
+        if self.health_check is None:
+            return True
+        try:
+            return bool(self.health_check(conn))
+        except Exception as e:
+            self.logger.debug(f"Health check raised: {e}")
+            return False
+
+    def _discard(self, conn: Any):
+        """Drops a broken connection so its slot can be refilled."""
+        self.logger.warning("Discarding a connection that failed its health check.")
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        self._close_quietly(conn)
+
+    def _close_quietly(self, conn: Any):
+        try:
+            conn.close()
+        except Exception as e:
+            self.logger.warning(f"Error while closing connection: {e}")
@@ -1,39 +1,53 @@
 # In file: tools/csv_connector.py
 
+import gzip
 import pandas as pd
 import logging
+from typing import IO, Iterator, Optional
+from config import settings
 from .database_connector import BaseConnector
 
+# Low-cardinality catalog columns stored as categoricals rather than strings.
+CATEGORICAL_COLUMNS = {"table_name": "category", "data_type": "category"}
+
 class CsvConnector(BaseConnector):
     """
     A connector that retrieves schema information from a local CSV file.
     This simulates connecting to a database for development purposes.
+
+    The file is opened once by `connect` and read from that handle. Files
+    ending in `.gz` are decompressed on the fly. `table_name` and `data_type`
+    are read as categoricals, which keeps large catalog exports small in memory.
     """
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, chunksize: Optional[int] = None):
         """
         Initializes the CsvConnector.
 
         Args:
             filepath: The path to the CSV file containing the schema.
+            chunksize: Rows per chunk yielded by `iter_schema`.
         """
         super().__init__()
         self.filepath = filepath
+        self.chunksize = chunksize or settings.CSV_CHUNK_SIZE
+        self._handle: Optional[IO[bytes]] = None
         self.logger.info(f"CSV Connector initialized for file: {self.filepath}")
 
     def connect(self):
-        """Simulates connecting to the data source."""
+        """Opens the CSV file for the rest of the run."""
         self.logger.info(f"Connecting to CSV data source at '{self.filepath}'...")
         try:
-            # In a real scenario, this might check for file existence.
-            with open(self.filepath, 'r') as f:
-                pass
+            self._handle = self._open()
             self.logger.info("CSV data source is accessible.")
         except FileNotFoundError:
             self.logger.error(f"CSV file not found at path: {self.filepath}")
             raise
 
     def disconnect(self):
-        """Simulates disconnecting from the data source."""
+        """Closes the CSV file."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
         self.logger.info("Disconnected from CSV data source.")
 
     def get_schema(self) -> pd.DataFrame:
@@ -42,9 +56,43 @@ class CsvConnector(BaseConnector):
         """
         self.logger.info(f"Fetching schema from {self.filepath}...")
         try:
-            schema_df = pd.read_csv(self.filepath)
+            schema_df = pd.read_csv(self._rewound_handle(), dtype=CATEGORICAL_COLUMNS)
             self.logger.info(f"Successfully loaded schema with {len(schema_df)} rows.")
             return schema_df
         except Exception as e:
             self.logger.error(f"Failed to read or parse CSV file: {e}")
             raise
+
+    def iter_schema(self, chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Streams the schema in chunks instead of loading it all at once.
+
+        Args:
+            chunksize: Rows per chunk; defaults to the connector's chunk size.
+
+        Yields:
+            DataFrames of at most `chunksize` rows, in file order.
+        """
+        self.logger.info(f"Streaming schema from {self.filepath}...")
+        with pd.read_csv(
+            self._rewound_handle(),
+            dtype=CATEGORICAL_COLUMNS,
+            chunksize=chunksize or self.chunksize
+        ) as reader:
+            yield from reader
+
+    def _open(self) -> IO[bytes]:
+        if self.filepath.endswith(".gz"):
+            handle = gzip.open(self.filepath, "rb")
+            # Fail now, not on first read, if the file is not gzip data
+            handle.peek(1)
+            return handle
+        return open(self.filepath, "rb")
+
+    def _rewound_handle(self) -> IO[bytes]:
+        """Returns the open file positioned at its start, opening it if needed."""
+        if self._handle is None:
+            self._handle = self._open()
+        else:
+            self._handle.seek(0)
+        return self._handle
@@ -2,6 +2,8 @@
 
 import pandas as pd
 import logging
+from typing import Any, Dict, List, Optional
+from .schema_fingerprint import schema_fingerprint
 
 class BaseConnector:
     """Base class for all database connectors."""
@@ -18,6 +20,26 @@ class BaseConnector:
         """Retrieves the database schema."""
         raise NotImplementedError
 
+    def get_foreign_keys(self) -> List[Dict[str, Any]]:
+        """
+        Returns the foreign keys declared in the source, in the analysis
+        report's relationship shape. Sources without declared constraints
+        return an empty list.
+        """
+        return []
+
+    def get_schema_fingerprint(self, schema_df: Optional[pd.DataFrame] = None) -> str:
+        """
+        Returns a stable hash of the schema's `(table, column, type)` rows.
+
+        Args:
+            schema_df: A schema already read from this connector; if omitted,
+                the schema is read with `get_schema`.
+        """
+        if schema_df is None:
+            schema_df = self.get_schema()
+        return schema_fingerprint(schema_df)
+
 class MockConnector(BaseConnector):
     """
     A mock database connector for development and testing.
@@ -0,0 +1,214 @@
+# In file: tools/dbapi_connector.py
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+from config import settings
+from .connection_pool import ConnectionPool
+from .database_connector import BaseConnector
+
+# Catalog queries against the ANSI information_schema views. `{param}` is
+# replaced with the driver's placeholder for the schema name.
+INFORMATION_SCHEMA_QUERIES = {
+    "columns": (
+        "SELECT table_name, column_name, data_type, is_nullable "
+        "FROM information_schema.columns "
+        "WHERE table_schema = {param} "
+        "ORDER BY table_name, ordinal_position"
+    ),
+    "primary_keys": (
+        "SELECT kcu.table_name, kcu.column_name "
+        "FROM information_schema.table_constraints tc "
+        "JOIN information_schema.key_column_usage kcu "
+        "ON tc.constraint_schema = kcu.constraint_schema "
+        "AND tc.constraint_name = kcu.constraint_name "
+        "AND tc.table_name = kcu.table_name "
+        "WHERE tc.constraint_type = 'PRIMARY KEY' AND tc.table_schema = {param}"
+    ),
+    "foreign_keys": (
+        "SELECT kcu.table_name, kcu.column_name, ccu.table_name, ccu.column_name "
+        "FROM information_schema.referential_constraints rc "
+        "JOIN information_schema.key_column_usage kcu "
+        "ON rc.constraint_schema = kcu.constraint_schema "
+        "AND rc.constraint_name = kcu.constraint_name "
+        "JOIN information_schema.key_column_usage ccu "
+        "ON rc.unique_constraint_schema = ccu.constraint_schema "
+        "AND rc.unique_constraint_name = ccu.constraint_name "
+        "AND ccu.ordinal_position = kcu.position_in_unique_constraint "
+        "WHERE kcu.table_schema = {param} "
+        "ORDER BY kcu.table_name, kcu.ordinal_position"
+    ),
+}
+
+# Placeholder for a single positional parameter, by PEP-249 paramstyle.
+PLACEHOLDERS = {
+    "qmark": "?",
+    "numeric": ":1",
+    "named": ":schema",
+    "format": "%s",
+    "pyformat": "%(schema)s",
+}
+
+NULLABLE_VALUES = {"YES", "Y", "TRUE", "1"}
+
+class DbApiConnector(BaseConnector):
+    """
+    A connector for any PEP-249 (DB-API 2.0) database.
+
+    Connections come from a caller-supplied factory and are kept in a bounded
+    pool with health checks. The column, primary key and foreign key catalog
+    queries run at the same time on separate pooled connections, and every
+    result set is read in `fetchmany` batches straight into column lists, so
+    a large catalog is never held as a full row list and a DataFrame at once.
+    """
+    def __init__(
+        self,
+        connection_factory: Callable[[], Any],
+        schema: str = "public",
+        paramstyle: str = "format",
+        pool_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        catalog_queries: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initializes the DbApiConnector.
+
+        Args:
+            connection_factory: A callable returning a new DB-API connection.
+            schema: The schema whose tables are introspected.
+            paramstyle: The driver's `paramstyle` (e.g. `psycopg2.paramstyle`).
+            pool_size: Maximum number of open connections.
+            batch_size: Number of rows read per `fetchmany` call.
+            catalog_queries: Overrides for the `columns`, `primary_keys` and
+                `foreign_keys` queries, for databases without information_schema.
+        """
+        super().__init__()
+        if paramstyle not in PLACEHOLDERS:
+            raise ValueError(f"Unsupported paramstyle: {paramstyle}")
+        self.connection_factory = connection_factory
+        self.schema = schema
+        self.paramstyle = paramstyle
+        self.pool_size = pool_size or settings.CONNECTOR_POOL_SIZE
+        self.batch_size = batch_size or settings.CONNECTOR_FETCH_BATCH_SIZE
+        self.catalog_queries = {**INFORMATION_SCHEMA_QUERIES, **(catalog_queries or {})}
+        self.pool: Optional[ConnectionPool] = None
+        self._foreign_keys: Optional[List[Dict[str, Any]]] = None
+        self.logger.info(f"DB-API Connector initialized for schema: {self.schema}")
+
+    def connect(self):
+        """Opens the connection pool and checks that the database answers."""
+        self.logger.info("Connecting to database...")
+        self.pool = ConnectionPool(
+            self.connection_factory,
+            max_size=self.pool_size,
+            health_check=self._ping
+        )
+        try:
+            with self.pool.connection() as conn:
+                if not self._ping(conn):
+                    raise ConnectionError("Database did not answer the health check query.")
+            self.logger.info("Database is accessible.")
+        except Exception as e:
+            self.logger.error(f"Could not connect to the database: {e}")
+            self.pool.close()
+            self.pool = None
+            raise
+
+    def disconnect(self):
+        """Closes every pooled connection."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        self.logger.info("Disconnected from database.")
+
+    def get_schema(self) -> pd.DataFrame:
+        """
+        Reads the column catalog of the configured schema.
+
+        Returns:
+            A DataFrame with `table_name`, `column_name`, `data_type`,
+            `is_nullable` and `is_primary_key` columns.
+        """
+        if self.pool is None:
+            raise RuntimeError("DbApiConnector.connect() must be called before get_schema().")
+
+        self.logger.info(f"Fetching catalog for schema '{self.schema}'...")
+        with ThreadPoolExecutor(max_workers=min(3, self.pool_size), thread_name_prefix="dbapi-catalog") as executor:
+            columns_future = executor.submit(self._fetch_columns, "columns", 4)
+            primary_keys_future = executor.submit(self._fetch_columns, "primary_keys", 2)
+            foreign_keys_future = executor.submit(self._fetch_columns, "foreign_keys", 4)
+            table_names, column_names, data_types, nullables = columns_future.result()
+            pk_tables, pk_columns = primary_keys_future.result()
+            fk_columns = foreign_keys_future.result()
+
+        primary_keys = set(zip(pk_tables, pk_columns))
+        schema_df = pd.DataFrame({
+            "table_name": table_names,
+            "column_name": column_names,
+            "data_type": data_types,
+            "is_nullable": [str(value).upper() in NULLABLE_VALUES for value in nullables],
+            "is_primary_key": [key in primary_keys for key in zip(table_names, column_names)],
+        })
+        self._foreign_keys = [
+            {
+                "from_table": from_table,
+                "from_column": from_column,
+                "to_table": to_table,
+                "to_column": to_column,
+                "relationship_type": "Many-to-One"
+            }
+            for from_table, from_column, to_table, to_column in zip(*fk_columns)
+        ]
+        self.logger.info(
+            f"Successfully loaded schema with {len(schema_df)} columns "
+            f"and {len(self._foreign_keys)} declared foreign keys."
+        )
+        return schema_df
+
+    def get_foreign_keys(self) -> List[Dict[str, Any]]:
+        """
+        Returns the foreign keys declared in the database.
+
+        The catalog is read by `get_schema`; if it has not been read yet it is
+        read now.
+        """
+        if self._foreign_keys is None:
+            self.get_schema()
+        return list(self._foreign_keys)
+
+    def _fetch_columns(self, query_name: str, width: int) -> List[List[Any]]:
+        """Runs one catalog query and returns its result as column lists."""
+        columns: List[List[Any]] = [[] for _ in range(width)]
+        for batch in self._fetch_batches(query_name):
+            for row in batch:
+                for values, value in zip(columns, row):
+                    values.append(value)
+        return columns
+
+    def _fetch_batches(self, query_name: str) -> Iterator[Sequence[Sequence[Any]]]:
+        """Yields the rows of a catalog query in `fetchmany` batches."""
+        query = self.catalog_queries[query_name].format(param=PLACEHOLDERS[self.paramstyle])
+        params: Any = {"schema": self.schema} if self.paramstyle in ("named", "pyformat") else (self.schema,)
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                while True:
+                    batch = cursor.fetchmany(self.batch_size)
+                    if not batch:
+                        break
+                    yield batch
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _ping(conn: Any) -> bool:
+        """Health check: a connection is usable if it can run a trivial query."""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            return cursor.fetchone() is not None
+        finally:
+            cursor.close()
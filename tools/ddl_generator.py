@@ -0,0 +1,238 @@
+# In file: tools/ddl_generator.py
+
+import heapq
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from tools.relationship_inference import RelationshipInferrer
+
+# Column type used when the catalog does not record one.
+DEFAULT_DATA_TYPE = "TEXT"
+
+class DdlGenerator:
+    """
+    Renders a schema catalog as `CREATE TABLE` statements without a model call.
+
+    Columns and types come from the connector's catalog. Primary keys are
+    taken from its `is_primary_key` column when the source declares them, and
+    otherwise picked by naming convention. Relationships from the analysis
+    report become `FOREIGN KEY` constraints, and tables are created in
+    dependency order so every referenced table exists first. Foreign keys
+    within a cycle of tables are added with `ALTER TABLE` once all tables
+    exist.
+    """
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.relationship_inferrer = RelationshipInferrer()
+
+    def generate(
+        self,
+        schema_df: pd.DataFrame,
+        relationships: Iterable[Dict[str, Any]] = (),
+        table_comments: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Generates the DDL for every table in the catalog.
+
+        Args:
+            schema_df: The schema catalog, with `table_name`, `column_name`
+                and `data_type` columns, and optionally `is_nullable` and
+                `is_primary_key`.
+            relationships: Relationships in the analysis report's shape.
+                Those whose columns are not in the catalog, or that do not
+                reference the whole primary key of their target, are skipped.
+            table_comments: Optional comment to put above each table, by name.
+
+        Returns:
+            The SQL script.
+        """
+        statements, table_count, foreign_key_count, deferred_count = self._render(schema_df, relationships, table_comments)
+        statements.insert(0, f"-- Generated from the source catalog: {table_count} tables, {foreign_key_count} foreign keys.")
+        self.logger.info(f"Generated DDL for {table_count} tables with {deferred_count} deferred foreign keys.")
+        return "\n\n".join(statements) + "\n"
+
+    def create_statements(
+        self,
+        schema_df: pd.DataFrame,
+        relationships: Iterable[Dict[str, Any]] = (),
+        tables: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """
+        Renders the `CREATE TABLE` statements of some tables of the catalog.
+
+        Keys are resolved against the whole catalog, so foreign keys from
+        these tables to tables that already exist are kept.
+
+        Args:
+            schema_df: The schema catalog.
+            relationships: Relationships in the analysis report's shape.
+            tables: The tables to render. Defaults to every table.
+
+        Returns:
+            The statements in creation order, followed by an `ALTER TABLE`
+            block for foreign keys to tables created after them, if any.
+        """
+        statements, _, _, _ = self._render(schema_df, relationships, None, tables)
+        return statements
+
+    def foreign_keys(
+        self,
+        schema_df: pd.DataFrame,
+        relationships: Iterable[Dict[str, Any]]
+    ) -> Dict[str, List[Tuple[str, str, str]]]:
+        """
+        Returns the `(column, to_table, to_column)` foreign keys of each table
+        that the relationships define, skipping those that do not reference
+        the whole primary key of a table in the catalog.
+        """
+        tables = self._columns_by_table(schema_df)
+        return self._foreign_keys(relationships, tables, self._primary_keys(schema_df, tables))
+
+    def _render(
+        self,
+        schema_df: pd.DataFrame,
+        relationships: Iterable[Dict[str, Any]],
+        table_comments: Optional[Dict[str, str]],
+        only: Optional[Iterable[str]] = None
+    ) -> Tuple[List[str], int, int, int]:
+        """Returns the statements and the counts of tables, foreign keys and deferred foreign keys rendered."""
+        tables = self._columns_by_table(schema_df)
+        primary_keys = self._primary_keys(schema_df, tables)
+        foreign_keys = self._foreign_keys(relationships, tables, primary_keys)
+        order, deferred = self._creation_order(tables, foreign_keys)
+        if only is not None:
+            only = set(only)
+            order = [table for table in order if table in only]
+            foreign_keys = {table: keys for table, keys in foreign_keys.items() if table in only}
+            # Tables outside `only` already exist
+            deferred = {(table, column) for table, column in deferred
+                        if table in only and any(key[0] == column and key[1] in only for key in foreign_keys[table])}
+        table_comments = table_comments or {}
+
+        statements = []
+        for table in order:
+            definitions = []
+            for column, data_type, nullable in tables[table]:
+                not_null = "" if nullable or column in primary_keys.get(table, ()) else " NOT NULL"
+                definitions.append(f"    {column} {data_type}{not_null}")
+            if primary_keys.get(table):
+                definitions.append(f"    PRIMARY KEY ({', '.join(primary_keys[table])})")
+            for column, to_table, to_column in foreign_keys.get(table, ()):
+                if (table, column) not in deferred:
+                    definitions.append(f"    FOREIGN KEY ({column}) REFERENCES {to_table} ({to_column})")
+            comment = table_comments.get(table)
+            header = f"-- {' '.join(str(comment).split())}\n" if comment else ""
+            statements.append(f"{header}CREATE TABLE {table} (\n" + ",\n".join(definitions) + "\n);")
+
+        if deferred:
+            alters = [
+                f"ALTER TABLE {table} ADD FOREIGN KEY ({column}) REFERENCES {to_table} ({to_column});"
+                for table in order
+                for column, to_table, to_column in foreign_keys.get(table, ())
+                if (table, column) in deferred
+            ]
+            statements.append("-- Foreign keys between tables that reference each other\n" + "\n".join(alters))
+        return statements, len(order), sum(len(keys) for keys in foreign_keys.values()), len(deferred)
+
+    @staticmethod
+    def _columns_by_table(schema_df: pd.DataFrame) -> Dict[str, List[Tuple[str, str, bool]]]:
+        """Groups `(column, type, nullable)` by table, in catalog order."""
+        count = len(schema_df)
+        data_types = schema_df["data_type"].fillna("").astype(str) if "data_type" in schema_df.columns else [""] * count
+        nullables = schema_df["is_nullable"].tolist() if "is_nullable" in schema_df.columns else [True] * count
+        tables: Dict[str, List[Tuple[str, str, bool]]] = {}
+        for table, column, data_type, nullable in zip(
+            schema_df["table_name"].astype(str).tolist(),
+            schema_df["column_name"].astype(str).tolist(),
+            list(data_types),
+            nullables
+        ):
+            tables.setdefault(table, []).append((column, data_type.strip() or DEFAULT_DATA_TYPE, bool(nullable)))
+        return tables
+
+    def _primary_keys(self, schema_df: pd.DataFrame, tables: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Returns the primary-key columns of each table that has a key."""
+        if "is_primary_key" in schema_df.columns:
+            declared = schema_df[schema_df["is_primary_key"].astype(bool)]
+            primary_keys: Dict[str, List[str]] = {}
+            for table, column in zip(declared["table_name"].astype(str).tolist(), declared["column_name"].astype(str).tolist()):
+                primary_keys.setdefault(table, []).append(column)
+            return primary_keys
+        return {table: [column] for table, column in self.relationship_inferrer.primary_keys(schema_df).items() if table in tables}
+
+    def _foreign_keys(
+        self,
+        relationships: Iterable[Dict[str, Any]],
+        tables: Dict[str, List[Tuple[str, str, bool]]],
+        primary_keys: Dict[str, List[str]]
+    ) -> Dict[str, List[Tuple[str, str, str]]]:
+        """Returns the valid `(column, to_table, to_column)` foreign keys of each table."""
+        columns = {table: {column for column, _, _ in rows} for table, rows in tables.items()}
+        foreign_keys: Dict[str, List[Tuple[str, str, str]]] = {}
+        seen = set()
+        skipped = 0
+        for relationship in relationships:
+            from_table, from_column = relationship.get("from_table"), relationship.get("from_column")
+            to_table, to_column = relationship.get("to_table"), relationship.get("to_column")
+            if (from_table, from_column) in seen:
+                continue
+            if (from_column not in columns.get(from_table, ())
+                    or primary_keys.get(to_table) != [to_column]):
+                skipped += 1
+                continue
+            seen.add((from_table, from_column))
+            foreign_keys.setdefault(from_table, []).append((from_column, to_table, to_column))
+        if skipped:
+            self.logger.info(f"Skipped {skipped} relationships that do not reference a primary key in the catalog.")
+        return foreign_keys
+
+    @staticmethod
+    def _creation_order(
+        tables: Dict[str, Any],
+        foreign_keys: Dict[str, List[Tuple[str, str, str]]]
+    ) -> Tuple[List[str], Set[Tuple[str, str]]]:
+        """
+        Orders tables so referenced tables come first, keeping catalog order
+        where dependencies allow.
+
+        Returns:
+            The table order, and the `(table, column)` foreign keys that point
+            to a table created later because the tables form a cycle.
+        """
+        position = {table: index for index, table in enumerate(tables)}
+        dependants: Dict[str, List[str]] = {table: [] for table in tables}
+        waiting_on = {table: 0 for table in tables}
+        for table, keys in foreign_keys.items():
+            for referenced in {to_table for _, to_table, _ in keys if to_table != table}:
+                dependants[referenced].append(table)
+                waiting_on[table] += 1
+
+        ready = [position[table] for table, count in waiting_on.items() if count == 0]
+        heapq.heapify(ready)
+        names = list(tables)
+        order: List[str] = []
+        created = set()
+        while len(order) < len(names):
+            if not ready:
+                # Every remaining table is in or behind a cycle; break it at the earliest one
+                heapq.heappush(ready, min(position[table] for table in names if table not in created))
+            table = names[heapq.heappop(ready)]
+            if table in created:
+                continue
+            order.append(table)
+            created.add(table)
+            for dependant in dependants[table]:
+                waiting_on[dependant] -= 1
+                if waiting_on[dependant] == 0 and dependant not in created:
+                    heapq.heappush(ready, position[dependant])
+
+        rank = {table: index for index, table in enumerate(order)}
+        deferred = {
+            (table, column)
+            for table, keys in foreign_keys.items()
+            for column, to_table, _ in keys
+            if rank[to_table] > rank[table]
+        }
+        return order, deferred
@@ -0,0 +1,246 @@
+# In file: tools/index_advisor.py
+
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Base names of SQL types that hold a point in time.
+TIMESTAMP_TYPES = {"DATE", "DATETIME", "DATETIME2", "TIMESTAMP", "TIMESTAMPTZ", "SMALLDATETIME"}
+
+# Column names that usually record when a row's event happened, preferred as partition keys.
+EVENT_TIME_PATTERN = re.compile(r"(_date|_at|_time|_ts)$|^(created|event|transaction)")
+# Timestamps that change after a row is written, so rows would move between partitions.
+MUTABLE_TIME_PATTERN = re.compile(r"^(updated|modified|deleted|last_)")
+
+CREATE_TABLE_PATTERN = re.compile(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.\"`\[\]]+)\s*\(", re.IGNORECASE)
+CREATE_INDEX_PATTERN = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?[\w.\"`\[\]]+\s+ON\s+([\w.\"`\[\]]+)\s*\(([^)]*)\)",
+    re.IGNORECASE
+)
+ALTER_TABLE_PATTERN = re.compile(
+    r"ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?([\w.\"`\[\]]+)\s+([^;]*)", re.IGNORECASE
+)
+DROP_TABLE_PATTERN = re.compile(r"DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?([\w.\"`\[\]]+)", re.IGNORECASE)
+KEY_CONSTRAINT_PATTERN = re.compile(r"(?:PRIMARY\s+KEY|UNIQUE)\s*\(([^)]*)\)", re.IGNORECASE)
+LINE_COMMENT_PATTERN = re.compile(r"--[^\n]*")
+# A column type with its optional size, e.g. `DECIMAL(10, 2)`.
+COLUMN_TYPE_PATTERN = re.compile(r"[^\s(]+(?:\s*\([^)]*\))?")
+
+class IndexAdvisor:
+    """
+    Proposes indexes and partitioning from the DDL and the relationship graph,
+    without a model call.
+
+    - Every foreign-key column gets an index, unless a primary key, unique
+      constraint or existing index already leads with it.
+    - A table referencing two or more tables sits on a join path between
+      them (e.g. `order_items` between `orders` and `products`); it gets a
+      composite index on its first two foreign keys, which also serves the
+      first key on its own.
+    - Tables with foreign keys and a date or timestamp column, such as
+      `orders.order_date`, are flagged as range-partitioning candidates.
+    """
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def advise(self, generated_sql: str, relationships: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Analyzes the DDL and relationships.
+
+        Args:
+            generated_sql: The `CREATE TABLE` script from the transformation step.
+            relationships: Relationships in the analysis report's shape.
+
+        Returns:
+            The advice as a JSON-serializable dictionary, with `indexes` (each
+            with `table`, `columns`, `name`, `reason` and `sql`) and
+            `partition_candidates` (each with `table`, `column`, `data_type`
+            and `reason`).
+        """
+        tables = parse_ddl(generated_sql)
+        foreign_keys: Dict[str, List[Tuple[str, str]]] = {}
+        for relationship in relationships:
+            table, column = relationship.get("from_table"), relationship.get("from_column")
+            to_table = relationship.get("to_table")
+            if not table or not column or not to_table:
+                continue
+            if table in tables and column not in tables[table]["columns"]:
+                continue
+            if column not in [existing for existing, _ in foreign_keys.get(table, [])]:
+                foreign_keys.setdefault(table, []).append((column, to_table))
+
+        indexes = []
+        for table, keys in foreign_keys.items():
+            leading = {index[0] for index in tables.get(table, {}).get("indexes", [])}
+            uncovered = [(column, to_table) for column, to_table in keys if column not in leading]
+            if len(keys) >= 2:
+                (first, first_table), (second, second_table) = keys[:2]
+                existing = tables.get(table, {}).get("indexes", [])
+                if [first, second] not in [index[:2] for index in existing]:
+                    indexes.append(self._index(
+                        table, [first, second],
+                        f"Join path {first_table} -> {table} -> {second_table}; also serves lookups on {first}."
+                    ))
+                    uncovered = [(column, to_table) for column, to_table in uncovered if column != first]
+            for column, to_table in uncovered:
+                indexes.append(self._index(table, [column], f"Foreign key to {to_table}, not covered by an existing index."))
+
+        partition_candidates = []
+        for table in foreign_keys:
+            column = self._partition_column(tables.get(table, {}).get("columns", {}))
+            if column is not None:
+                partition_candidates.append({
+                    "table": table,
+                    "column": column,
+                    "data_type": tables[table]["columns"][column],
+                    "reason": f"{table} references other tables and is timestamped by {column}; "
+                              f"range partitions on it keep date-bounded scans small.",
+                })
+
+        self.logger.info(f"Proposed {len(indexes)} indexes and {len(partition_candidates)} partition candidates.")
+        return {"indexes": indexes, "partition_candidates": partition_candidates}
+
+    def to_sql(self, advice: Dict[str, Any]) -> str:
+        """Renders advice from `advise` as a runnable SQL script, with partitioning as comments."""
+        lines = ["-- Index recommendations generated from the foreign-key graph."]
+        for index in advice["indexes"]:
+            lines += ["", f"-- {index['reason']}", index["sql"]]
+        if not advice["indexes"]:
+            lines += ["", "-- Every foreign key is already covered by an index."]
+        if advice["partition_candidates"]:
+            lines += ["", "-- Partitioning candidates. The syntax depends on the target database, e.g. in PostgreSQL:"]
+            for candidate in advice["partition_candidates"]:
+                lines += [
+                    f"-- {candidate['reason']}",
+                    f"--   CREATE TABLE {candidate['table']} (...) PARTITION BY RANGE ({candidate['column']});",
+                ]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _index(table: str, columns: List[str], reason: str) -> Dict[str, Any]:
+        name = f"idx_{table}_{'_'.join(columns)}".replace(".", "_")
+        return {
+            "table": table,
+            "columns": columns,
+            "name": name,
+            "reason": reason,
+            "sql": f"CREATE INDEX {name} ON {table} ({', '.join(columns)});",
+        }
+
+    @staticmethod
+    def _partition_column(columns: Dict[str, str]) -> Optional[str]:
+        """Picks the timestamp column to partition by, preferring event-time names."""
+        timestamps = [
+            column for column, data_type in columns.items()
+            if re.split(r"\W", data_type.upper(), maxsplit=1)[0] in TIMESTAMP_TYPES
+            and not MUTABLE_TIME_PATTERN.search(column.lower())
+        ]
+        for column in timestamps:
+            if EVENT_TIME_PATTERN.search(column.lower()):
+                return column
+        return timestamps[0] if timestamps else None
+
+def parse_ddl(sql: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Reads tables, column types and key columns from a DDL script.
+
+    Besides `CREATE TABLE` and `CREATE INDEX`, the statements of a schema
+    migration are applied in order: `ALTER TABLE` adding, retyping or
+    dropping columns and adding keys, and `DROP TABLE`.
+
+    Returns:
+        For each table, `columns` (column name to type, in order) and
+        `indexes` (the column lists of its primary key, unique constraints
+        and indexes).
+    """
+    sql = LINE_COMMENT_PATTERN.sub("", sql or "")
+    tables: Dict[str, Dict[str, Any]] = {}
+    for match in CREATE_TABLE_PATTERN.finditer(sql):
+        body = _parenthesized(sql, match.end() - 1)
+        columns: Dict[str, str] = {}
+        indexes: List[List[str]] = []
+        for definition in _split_top_level(body):
+            _add_definition(definition, columns, indexes)
+        tables[_unquote(match.group(1))] = {"columns": columns, "indexes": indexes}
+    for match in ALTER_TABLE_PATTERN.finditer(sql):
+        table = tables.get(_unquote(match.group(1)))
+        if table is not None:
+            for action in _split_top_level(match.group(2)):
+                _alter(table, action)
+    for match in CREATE_INDEX_PATTERN.finditer(sql):
+        table = tables.get(_unquote(match.group(1)))
+        if table is not None:
+            table["indexes"].append(_identifiers(match.group(2)))
+    for match in DROP_TABLE_PATTERN.finditer(sql):
+        tables.pop(_unquote(match.group(1)), None)
+    return tables
+
+def _add_definition(definition: str, columns: Dict[str, str], indexes: List[List[str]]):
+    """Adds a column or key definition from a table body or `ADD` clause."""
+    words = definition.split()
+    if not words:
+        return
+    keyword = words[0].upper()
+    if keyword in ("PRIMARY", "UNIQUE", "CONSTRAINT", "FOREIGN", "CHECK", "KEY", "INDEX"):
+        key = KEY_CONSTRAINT_PATTERN.search(definition)
+        if key:
+            indexes.append(_identifiers(key.group(1)))
+        return
+    column = _unquote(words[0])
+    data_type = COLUMN_TYPE_PATTERN.match(definition[len(words[0]):].strip())
+    columns[column] = data_type.group(0) if data_type else ""
+    if re.search(r"\bPRIMARY\s+KEY\b|\bUNIQUE\b", definition, re.IGNORECASE):
+        indexes.append([column])
+
+def _alter(table: Dict[str, Any], action: str):
+    """Applies one action of an `ALTER TABLE` statement to a parsed table."""
+    add = re.match(r"ADD\s+(?:COLUMN\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(.*)", action, re.IGNORECASE | re.DOTALL)
+    if add:
+        _add_definition(add.group(1), table["columns"], table["indexes"])
+        return
+    retype = re.match(r"ALTER\s+(?:COLUMN\s+)?(\S+)\s+(?:SET\s+DATA\s+)?TYPE\s+(.*)", action, re.IGNORECASE | re.DOTALL)
+    if retype:
+        column = _unquote(retype.group(1))
+        data_type = COLUMN_TYPE_PATTERN.match(retype.group(2).strip())
+        if column in table["columns"] and data_type:
+            table["columns"][column] = data_type.group(0)
+        return
+    drop = re.match(r"DROP\s+(?:COLUMN\s+)?(?:IF\s+EXISTS\s+)?(\S+)", action, re.IGNORECASE)
+    if drop and drop.group(1).upper() not in ("CONSTRAINT", "PRIMARY", "INDEX", "KEY"):
+        column = _unquote(drop.group(1))
+        table["columns"].pop(column, None)
+        table["indexes"] = [index for index in table["indexes"] if column not in index]
+
+def _parenthesized(sql: str, start: int) -> str:
+    """Returns the text inside the parenthesis opening at `start`."""
+    depth = 0
+    for position in range(start, len(sql)):
+        if sql[position] == "(":
+            depth += 1
+        elif sql[position] == ")":
+            depth -= 1
+            if depth == 0:
+                return sql[start + 1:position]
+    return sql[start + 1:]
+
+def _split_top_level(body: str) -> List[str]:
+    """Splits a table body on commas outside parentheses, e.g. not inside `DECIMAL(10, 2)`."""
+    parts, depth, current = [], 0, []
+    for char in body:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current).strip())
+    return parts
+
+def _identifiers(column_list: str) -> List[str]:
+    return [_unquote(name.split()[0]) for name in column_list.split(",") if name.strip()]
+
+def _unquote(name: str) -> str:
+    return name.strip().strip('"`[]')
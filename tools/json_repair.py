@@ -0,0 +1,125 @@
+# In file: tools/json_repair.py
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+FENCE_PATTERN = re.compile(r"```(?:json|JSON)?[ \t]*\r?\n?")
+
+CLOSERS = {"{": "}", "[": "]"}
+
+def extract_json(text: str) -> Any:
+    """
+    Extracts the outermost JSON object from a model response.
+
+    Models often wrap JSON in ```json fences or surround it with prose. The
+    object is found and cleaned in a single pass: text before the first `{`
+    and after its matching `}` is ignored, trailing commas are dropped, and a
+    response cut off at the token limit is closed at the last complete value.
+
+    Args:
+        text: The raw model response.
+
+    Returns:
+        The parsed JSON object.
+
+    Raises:
+        json.JSONDecodeError: If no JSON object can be recovered.
+    """
+    start = _find_start(text)
+    if start is None:
+        raise json.JSONDecodeError("No JSON object found in response", text, 0)
+    candidate, fallback = _scan(text, start)
+    try:
+        return json.loads(candidate, strict=False)
+    except json.JSONDecodeError as error:
+        if fallback is None or fallback == candidate:
+            raise json.JSONDecodeError(error.msg, text, start + error.pos) from error
+    try:
+        return json.loads(fallback, strict=False)
+    except json.JSONDecodeError as error:
+        raise json.JSONDecodeError(error.msg, text, start + error.pos) from error
+
+def _find_start(text: str) -> Optional[int]:
+    """Returns the index of the first `{`, preferring one inside a code fence."""
+    fence = FENCE_PATTERN.search(text)
+    if fence is not None:
+        start = text.find("{", fence.end())
+        if start != -1:
+            return start
+    start = text.find("{")
+    return start if start != -1 else None
+
+def _scan(text: str, start: int) -> Tuple[str, Optional[str]]:
+    """
+    Copies the JSON value starting at `start`, repairing it on the way.
+
+    Returns:
+        The repaired JSON text and, for a truncated value, a more
+        conservative fallback cut at the last complete member, or None.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # The last point where the value can be cut and closed: after the opening
+    # brace or a member separator. (length of out, closing brackets)
+    safe_point: Tuple[int, str] = (0, "")
+    in_string = False
+    escaped = False
+
+    for char in text[start:]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in CLOSERS:
+            stack.append(CLOSERS[char])
+            out.append(char)
+            if len(stack) == 1:
+                safe_point = (len(out), stack[0])
+            continue
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                return "".join(out), None
+            continue
+        elif char == ",":
+            _drop_trailing_comma(out)
+            safe_point = (len(out), "".join(reversed(stack)))
+        out.append(char)
+
+    # The response ended before the outermost object was closed
+    repaired = out[:]
+    if in_string:
+        if escaped:
+            repaired.pop()
+        repaired.append('"')
+    _drop_dangling_tokens(repaired)
+    repaired.append("".join(reversed(stack)))
+    cut, closers = safe_point
+    fallback = "".join(out[:cut]).rstrip().rstrip(",") + closers
+    return "".join(repaired), fallback
+
+def _drop_trailing_comma(out: List[str]):
+    """Removes a comma, and the whitespace after it, from the end of `out`."""
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index:]
+
+def _drop_dangling_tokens(out: List[str]):
+    """Removes a trailing comma or colon left by truncation."""
+    while out and (out[-1].isspace() or out[-1] in ",:"):
+        out.pop()
@@ -3,69 +3,344 @@
 import json
 import os
 import logging
-from typing import Dict, Any, List
+import struct
+import threading
+from typing import Dict, Any, List, Optional
+
+from config import settings
+from tools.vector_index import VectorIndex
+
+# Each index entry is the byte offset of a record in the log, as an unsigned 64-bit integer.
+INDEX_ENTRY = struct.Struct("<Q")
 
 class MemoryManager:
     """
     A tool to simulate a vector database for continuous learning.
-    It saves and retrieves pipeline results from a JSON file.
+    It saves and retrieves pipeline results from an append-only JSON-lines log.
+
+    Every saved item is appended to `<name>.jsonl` as one line and its byte
+    offset is appended to `<name>.idx`, so saving is O(1) and the most recent
+    record can be read without parsing the whole history. A legacy
+    `memory.json` array at `filepath` is migrated into the log automatically.
+
+    Each record's source analysis is also embedded into a local vector index
+    (`<name>.vec`), so the context for a new run can be the few past runs most
+    similar to the current schema.
     """
-    def __init__(self, filepath: str = "output/memory.json"):
+    def __init__(self, filepath: str = "output/memory.json", max_records: Optional[int] = None):
         self.filepath = filepath
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_records = max_records or settings.MEMORY_MAX_RECORDS
+        root, ext = os.path.splitext(filepath)
+        self.log_path = filepath if ext == ".jsonl" else f"{root}.jsonl"
+        self.index_path = f"{root}.idx"
+        self.legacy_path = None if ext == ".jsonl" else filepath
+        self.vector_path = f"{root}.vec"
+        self._lock = threading.Lock()
         self._ensure_file_exists()
+        self.vector_index = VectorIndex(self.vector_path)
+        if len(self.vector_index) != self.count():
+            self._rebuild_vector_index()
 
     def _ensure_file_exists(self):
-        """Ensures the memory file and its directory exist."""
+        """Ensures the memory log, its index and their directory exist."""
         try:
-            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
-            if not os.path.exists(self.filepath):
-                with open(self.filepath, 'w') as f:
-                    json.dump([], f) # Start with an empty list
-                self.logger.info(f"Created new memory file at {self.filepath}")
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if not os.path.exists(self.log_path):
+                open(self.log_path, 'ab').close()
+                self.logger.info(f"Created new memory log at {self.log_path}")
+                self._migrate_legacy_file()
+            self._recover_index()
         except IOError as e:
             self.logger.error(f"Could not create memory file: {e}")
             raise
 
     def save_memory(self, memory_item: Dict[str, Any]):
         """
-        Saves a new memory item (e.g., a pipeline run) to the memory file.
+        Saves a new memory item (e.g., a pipeline run) to the memory log.
 
         Args:
             memory_item: A dictionary containing the data to be remembered.
         """
         self.logger.info("Saving new memory...")
         try:
-            memories = self.load_memories()
-            memories.append(memory_item)
-            with open(self.filepath, 'w') as f:
-                json.dump(memories, f, indent=2)
-            self.logger.info(f"Successfully saved memory. Total memories: {len(memories)}")
-        except (IOError, json.JSONDecodeError) as e:
+            line = (json.dumps(memory_item, separators=(",", ":")) + "\n").encode("utf-8")
+            with self._lock:
+                offset = self._append(line)
+                self.vector_index.add_text(self._memory_text(memory_item))
+                count = self.count()
+                if count > 2 * self.max_records:
+                    self._compact(keep_last=self.max_records)
+                    count = self.count()
+            self.logger.info(f"Successfully saved memory at offset {offset}. Total memories: {count}")
+        except (IOError, TypeError, ValueError) as e:
             self.logger.error(f"Failed to save memory: {e}")
 
     def load_memories(self) -> List[Dict[str, Any]]:
         """
-        Loads all memories from the JSON file.
+        Loads all memories from the log.
         In a real system, this would query a vector DB.
         """
         self.logger.info("Loading memories...")
+        memories = []
         try:
-            with open(self.filepath, 'r') as f:
-                return json.load(f)
-        except (IOError, json.JSONDecodeError) as e:
+            with open(self.log_path, 'rb') as f:
+                for line_number, line in enumerate(f, start=1):
+                    try:
+                        memories.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        self.logger.warning(f"Skipping corrupt memory record on line {line_number}.")
+        except IOError as e:
             self.logger.error(f"Failed to load memories: {e}")
-            return [] # Return empty list on failure
+        return memories
 
-    def get_context_for_prompt(self) -> str:
+    def load_latest_memory(self) -> Optional[Dict[str, Any]]:
         """
-        Retrieves the most recent memory to use as context.
-        This simulates a similarity search in a vector DB.
+        Reads only the most recent memory using the offset index.
         """
-        memories = self.load_memories()
-        if not memories:
+        try:
+            with open(self.index_path, 'rb') as index:
+                index.seek(0, os.SEEK_END)
+                if index.tell() < INDEX_ENTRY.size:
+                    return None
+                index.seek(-INDEX_ENTRY.size, os.SEEK_END)
+                (offset,) = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+            with open(self.log_path, 'rb') as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        except (IOError, json.JSONDecodeError) as e:
+            self.logger.error(f"Failed to load latest memory: {e}")
+            return None
+
+    def count(self) -> int:
+        """Returns the number of stored memories."""
+        try:
+            return os.path.getsize(self.index_path) // INDEX_ENTRY.size
+        except OSError:
+            return 0
+
+    def compact(self, keep_last: Optional[int] = None):
+        """
+        Rewrites the log, dropping corrupt records and, optionally, old ones.
+
+        Args:
+            keep_last: If given, only the most recent this many memories are kept.
+        """
+        with self._lock:
+            self._compact(keep_last)
+
+    def search(self, query: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the stored memories most similar to a query.
+
+        Args:
+            query: Free text describing the current run, e.g. its table and
+                column names.
+            k: Maximum number of memories to return.
+
+        Returns:
+            The matching memories, most similar first.
+        """
+        k = k or settings.MEMORY_CONTEXT_TOP_K
+        with self._lock:
+            matches = self.vector_index.search(query, k)
+            memories = []
+            for row, score in matches:
+                memory = self._read_record(row)
+                if memory is not None:
+                    memories.append(memory)
+        self.logger.info(f"Found {len(memories)} similar memories (top {k}).")
+        return memories
+
+    def find_by_fingerprint(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the most recent memory recorded for a schema fingerprint.
+
+        Args:
+            fingerprint: The schema fingerprint stored with a run.
+
+        Returns:
+            The matching memory, or None if no run saw this schema.
+        """
+        with self._lock:
+            for ordinal in range(self.count() - 1, -1, -1):
+                memory = self._read_record(ordinal)
+                if memory is not None and memory.get("schema_fingerprint") == fingerprint:
+                    return memory
+        return None
+
+    def get_context_for_prompt(self, query: Optional[str] = None, k: Optional[int] = None) -> str:
+        """
+        Retrieves past runs to use as context.
+
+        Args:
+            query: Optional description of the current schema. When given, the
+                top-k most similar past runs are returned; otherwise the most
+                recent run is.
+            k: Maximum number of similar runs to include.
+        """
+        if query:
+            memories = self.search(query, k)
+            if not memories:
+                return "No similar previous runs available for context."
+            return json.dumps(memories, indent=2)
+
+        latest_memory = self.load_latest_memory()
+        if latest_memory is None:
             return "No previous runs available for context."
-        
+
         # Return the most recent memory as a JSON string
-        latest_memory = memories[-1]
         return json.dumps(latest_memory, indent=2)
+
+    @staticmethod
+    def _memory_text(memory_item: Dict[str, Any]) -> str:
+        """Builds the text that represents a memory in the vector index."""
+        analysis = memory_item.get("source_analysis") or memory_item.get("analysis") or {}
+        if not isinstance(analysis, dict):
+            return ""
+        parts = [str(analysis.get("summary", ""))]
+        for table in analysis.get("key_tables", []) or []:
+            parts.append(str(table.get("table_name", "")))
+        for relationship in analysis.get("relationships", []) or []:
+            parts.append(f"{relationship.get('from_table', '')} {relationship.get('from_column', '')}")
+            parts.append(f"{relationship.get('to_table', '')} {relationship.get('to_column', '')}")
+        return " ".join(parts)
+
+    def _read_record(self, ordinal: int) -> Optional[Dict[str, Any]]:
+        """Reads one record by its position in the log, using the index."""
+        try:
+            with open(self.index_path, 'rb') as index:
+                index.seek(ordinal * INDEX_ENTRY.size)
+                (offset,) = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+            with open(self.log_path, 'rb') as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        except (IOError, struct.error, json.JSONDecodeError) as e:
+            self.logger.error(f"Failed to read memory record {ordinal}: {e}")
+            return None
+
+    def _rebuild_vector_index(self):
+        """Re-embeds every record so the vector rows match the log."""
+        self.vector_index.rebuild([self._memory_text(memory) for memory in self._load_indexed_memories()])
+
+    def _load_indexed_memories(self) -> List[Dict[str, Any]]:
+        """Loads memories in index order, one per indexed record."""
+        memories = []
+        for ordinal in range(self.count()):
+            memory = self._read_record(ordinal)
+            memories.append(memory if memory is not None else {})
+        return memories
+
+    def _append(self, line: bytes) -> int:
+        """Appends one record to the log and its offset to the index."""
+        with open(self.log_path, 'ab') as f:
+            offset = f.tell()
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.index_path, 'ab') as index:
+            index.write(INDEX_ENTRY.pack(offset))
+        return offset
+
+    def _compact(self, keep_last: Optional[int] = None):
+        memories = self.load_memories()
+        if keep_last is not None:
+            memories = memories[-keep_last:] if keep_last > 0 else []
+        tmp_path = f"{self.log_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for memory in memories:
+                f.write((json.dumps(memory, separators=(",", ":")) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.log_path)
+        self._rebuild_index()
+        self._rebuild_vector_index()
+        self.logger.info(f"Compacted memory log to {len(memories)} records.")
+
+    def _rebuild_index(self):
+        """Rebuilds the offset index by scanning the log."""
+        offsets = []
+        with open(self.log_path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if line.endswith(b"\n"):
+                    offsets.append(offset)
+                offset += len(line)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'wb') as index:
+            for offset in offsets:
+                index.write(INDEX_ENTRY.pack(offset))
+        os.replace(tmp_path, self.index_path)
+
+    def _recover_index(self):
+        """
+        Repairs the log and index after an interrupted write.
+
+        A trailing record without a newline was cut off mid-write and is
+        truncated. The index is rebuilt if it does not end at the last record.
+        """
+        log_size = os.path.getsize(self.log_path)
+        if log_size:
+            with open(self.log_path, 'rb+') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data_end = self._last_newline_end(f, log_size)
+                    self.logger.warning("Truncating partially written memory record.")
+                    f.truncate(data_end)
+                    log_size = data_end
+
+        if not os.path.exists(self.index_path):
+            self._rebuild_index()
+            return
+        index_size = os.path.getsize(self.index_path)
+        if index_size % INDEX_ENTRY.size:
+            self._rebuild_index()
+            return
+        if index_size == 0:
+            if log_size:
+                self._rebuild_index()
+            return
+        with open(self.index_path, 'rb') as index:
+            index.seek(-INDEX_ENTRY.size, os.SEEK_END)
+            (last_offset,) = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+        with open(self.log_path, 'rb') as f:
+            f.seek(last_offset)
+            last_line = f.readline()
+        if last_offset + len(last_line) != log_size or not last_line.endswith(b"\n"):
+            self.logger.warning("Memory index is out of date; rebuilding it.")
+            self._rebuild_index()
+
+    @staticmethod
+    def _last_newline_end(f, size: int) -> int:
+        """Returns the position just after the last newline in a file."""
+        block = 4096
+        position = size
+        while position > 0:
+            start = max(0, position - block)
+            f.seek(start)
+            chunk = f.read(position - start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                return start + newline + 1
+            position = start
+        return 0
+
+    def _migrate_legacy_file(self):
+        """Imports memories from a legacy JSON array file, if one exists."""
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, 'r') as f:
+                legacy_memories = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            self.logger.error(f"Could not migrate legacy memory file {self.legacy_path}: {e}")
+            return
+        if not isinstance(legacy_memories, list):
+            return
+        with open(self.log_path, 'wb') as f:
+            for memory in legacy_memories:
+                f.write((json.dumps(memory, separators=(",", ":")) + "\n").encode("utf-8"))
+        self._rebuild_index()
+        self.logger.info(f"Migrated {len(legacy_memories)} memories from {self.legacy_path} to {self.log_path}")
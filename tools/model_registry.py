@@ -0,0 +1,177 @@
+# In file: tools/model_registry.py
+
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from config import settings
+
+ClientKey = Tuple[str, str, str]
+
+PLACEHOLDER_RESPONSE = """
+        ```json
+        {
+          "summary": "This is a dummy analysis of a customer and orders database.",
+          "key_tables": [
+            {
+              "table_name": "customers",
+              "role": "Dimension",
+              "description": "Stores customer information."
+            },
+            {
+              "table_name": "orders",
+              "role": "Fact",
+              "description": "Stores order information, linking to customers."
+            }
+          ],
+          "relationships": [
+            {
+              "from_table": "orders",
+              "from_column": "customer_id",
+              "to_table": "customers",
+              "to_column": "customer_id",
+              "relationship_type": "Many-to-One"
+            }
+          ]
+        }
+        ```
+        """
+
+class PlaceholderResponse:
+    """Mimics the `text` attribute of a Vertex AI generation response."""
+    def __init__(self, text: str):
+        self.text = text
+
+class PlaceholderModelClient:
+    """
+    A stand-in model client that returns a canned analysis response.
+
+    It simulates the structured JSON output we expect from the LLM so the
+    application can run end to end without Vertex AI credentials.
+    """
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    async def generate_content_async(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> Any:
+        if stream:
+            return self._stream(PLACEHOLDER_RESPONSE)
+        return PlaceholderResponse(PLACEHOLDER_RESPONSE)
+
+    async def _stream(self, text: str) -> AsyncIterator[PlaceholderResponse]:
+        """Yields the response line by line, like a streamed Vertex AI response."""
+        for line in text.splitlines(keepends=True):
+            yield PlaceholderResponse(line)
+
+def create_default_client(project: str, location: str, model_name: str) -> Any:
+    """
+    Creates a model client for the given project, location and model.
+
+    Returns a Vertex AI `GenerativeModel` when `settings.USE_VERTEX_MODEL` is
+    enabled, otherwise a PlaceholderModelClient. The Vertex AI SDK is imported
+    here rather than at module load because importing it is slow.
+    """
+    if not settings.USE_VERTEX_MODEL:
+        return PlaceholderModelClient(model_name)
+    from google.cloud import aiplatform
+    from vertexai.generative_models import GenerativeModel
+
+    aiplatform.init(project=project, location=location)
+    return GenerativeModel(model_name)
+
+def class_identity(cls: type) -> str:
+    """Returns the qualified name of a class, e.g. for use in cache keys."""
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+def default_client_identity() -> str:
+    """
+    Names the class of client `create_default_client` builds, without
+    building one or importing the Vertex AI SDK.
+    """
+    if settings.USE_VERTEX_MODEL:
+        return "vertexai.generative_models.GenerativeModel"
+    return class_identity(PlaceholderModelClient)
+
+class ModelClientRegistry:
+    """
+    A process-wide registry of model clients.
+
+    One client is created per (project, location, model) on first use and is
+    shared by every agent afterwards, so its underlying transport channels are
+    reused and constructing an agent costs almost nothing.
+    """
+    def __init__(self, factory: Callable[[str, str, str], Any] = create_default_client):
+        self.factory = factory
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._clients: Dict[ClientKey, Any] = {}
+        # Classes of clients registered pre-built, by key
+        self._identities: Dict[ClientKey, str] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, project: str, location: str, model_name: str) -> Any:
+        """
+        Returns the shared client for a model, creating it if needed.
+
+        Args:
+            project: The GCP project ID.
+            location: The GCP region.
+            model_name: The name of the Vertex AI model.
+        """
+        key = (project, location, model_name)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            if key not in self._clients:
+                self.logger.info(f"Initializing model client for {model_name} in {project}/{location}.")
+                self._clients[key] = self.factory(project, location, model_name)
+            return self._clients[key]
+
+    def client_identity(self, project: str, location: str, model_name: str) -> str:
+        """
+        Names the kind of client `get_client` returns for a model, without
+        creating it.
+
+        Returns:
+            The class of a registered client, otherwise the class the
+            default factory builds, or the name of a custom factory.
+        """
+        identity = self._identities.get((project, location, model_name))
+        if identity is not None:
+            return identity
+        if self.factory is create_default_client:
+            return default_client_identity()
+        return f"{self.factory.__module__}.{getattr(self.factory, '__qualname__', repr(self.factory))}"
+
+    def register(self, project: str, location: str, model_name: str, client: Any):
+        """
+        Registers a pre-built client, e.g. a fake client in tests.
+        """
+        with self._lock:
+            self._clients[(project, location, model_name)] = client
+            self._identities[(project, location, model_name)] = class_identity(type(client))
+
+    def set_factory(self, factory: Callable[[str, str, str], Any]):
+        """
+        Replaces the factory used for new clients and drops existing ones.
+        """
+        with self._lock:
+            self.factory = factory
+            self._clients.clear()
+            self._identities.clear()
+
+    def clear(self):
+        """Drops every cached client."""
+        with self._lock:
+            self._clients.clear()
+            self._identities.clear()
+
+_registry = ModelClientRegistry()
+
+def get_registry() -> ModelClientRegistry:
+    """Returns the process-wide model client registry."""
+    return _registry
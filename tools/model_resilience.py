@@ -0,0 +1,288 @@
+# In file: tools/model_resilience.py
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from config import settings
+
+# Error class names, from google.api_core.exceptions and the HTTP layer, that
+# signal a transient failure worth retrying. Matched by name so the Google SDK
+# does not have to be imported.
+RETRYABLE_ERROR_NAMES = {
+    "Aborted",
+    "DeadlineExceeded",
+    "GatewayTimeout",
+    "InternalServerError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "TooManyRequests",
+}
+
+# Error class names that signal an exceeded quota (HTTP 429).
+RATE_LIMIT_ERROR_NAMES = {"ResourceExhausted", "TooManyRequests"}
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Returns True if a model call that raised `error` was rejected for exceeding a quota."""
+    if getattr(error, "code", None) == 429:
+        return True
+    return any(cls.__name__ in RATE_LIMIT_ERROR_NAMES for cls in type(error).__mro__)
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Returns True if a model call that raised `error` may succeed when retried."""
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the model while the circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Stops calling a failing model until it has had time to recover.
+
+    After `failure_threshold` consecutive transient failures the circuit
+    opens and calls fail fast with CircuitOpenError. Once `reset_seconds`
+    have passed, a single trial call is let through (half-open): if it
+    succeeds the circuit closes, otherwise it opens again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        self.reset_seconds = settings.CIRCUIT_BREAKER_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self.clock = clock
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """The current state, moving from open to half-open once the reset time has passed."""
+        with self._lock:
+            return self._current_state()
+
+    def before_call(self):
+        """
+        Claims permission to call the model.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its
+                trial call already in flight.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_in = max(0.0, self._opened_at + self.reset_seconds - self.clock())
+        raise CircuitOpenError(f"Model circuit breaker is open; retry in {retry_in:.1f}s.")
+
+    def release_trial(self):
+        """
+        Gives back a half-open trial claim without a verdict, e.g. because
+        the call was cancelled, so the next call can be the trial instead.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                self.logger.info("Model calls are succeeding again; closing the circuit.")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._current_state() == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state == self.CLOSED:
+                    self.logger.warning(f"{self._failures} model calls failed in a row; opening the circuit.")
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+                self._trial_in_flight = False
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_seconds:
+            self._state = self.HALF_OPEN
+        return self._state
+
+class ResilientCaller:
+    """
+    Wraps model calls with retries, optional hedging and a circuit breaker.
+
+    Transient errors (see `is_retryable_error`) are retried with exponential
+    backoff and full jitter. With hedging enabled, a duplicate request is sent
+    when a call has not answered within `hedge_after_seconds`, and whichever
+    reply arrives first is used.
+    """
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker] = None,
+        max_retries: Optional[int] = None,
+        backoff_base_seconds: Optional[float] = None,
+        backoff_max_seconds: Optional[float] = None,
+        hedge_after_seconds: Optional[float] = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Initializes the ResilientCaller. Unset options are read from settings.
+
+        Args:
+            breaker: The circuit breaker to report to. Defaults to a new one.
+            max_retries: Retries after the first attempt for transient errors.
+            backoff_base_seconds: Backoff ceiling for the first retry; it
+                doubles with each retry.
+            backoff_max_seconds: Upper bound on the backoff ceiling.
+            hedge_after_seconds: Latency after which a duplicate request is
+                sent. Defaults to MODEL_CALL_HEDGE_AFTER_SECONDS; hedging is
+                off when that is None.
+            sleep: Coroutine used to wait between retries.
+            rng: Random source for the jitter.
+        """
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = settings.MODEL_CALL_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base_seconds = backoff_base_seconds or settings.MODEL_CALL_BACKOFF_BASE_SECONDS
+        self.backoff_max_seconds = backoff_max_seconds or settings.MODEL_CALL_BACKOFF_MAX_SECONDS
+        self.hedge_after_seconds = hedge_after_seconds if hedge_after_seconds is not None else settings.MODEL_CALL_HEDGE_AFTER_SECONDS
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def call(self, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs a model call with retries, hedging and the circuit breaker.
+
+        Args:
+            attempt: Starts one model call; may be called several times.
+
+        Returns:
+            The result of the first successful attempt.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            Exception: The last error, if it was not retryable or the retries
+                ran out.
+        """
+        for retry in range(self.max_retries + 1):
+            self.breaker.before_call()
+            try:
+                result = await self._hedged(attempt)
+            except Exception as e:
+                if not self._record_error(e) or retry == self.max_retries:
+                    raise
+                await self._back_off(retry, e)
+            except BaseException:
+                # Cancelled: the call says nothing about the model's health
+                self.breaker.release_trial()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+    async def stream(self, attempt: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """
+        Runs a streaming model call with retries and the circuit breaker.
+
+        A call is only retried if it fails before its first chunk, since
+        chunks already handed to the caller cannot be taken back. Streams are
+        not hedged.
+
+        Args:
+            attempt: Starts one streaming model call; may be called several times.
+
+        Yields:
+            The chunks of the first attempt that produced any.
+        """
+        for retry in range(self.max_retries + 1):
+            self.breaker.before_call()
+            started = False
+            try:
+                async for chunk in attempt():
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if not self._record_error(e) or started or retry == self.max_retries:
+                    raise
+                await self._back_off(retry, e)
+            except BaseException:
+                # Cancelled, or closed by the caller (GeneratorExit)
+                self.breaker.release_trial()
+                raise
+            else:
+                self.breaker.record_success()
+                return
+
+    def _record_error(self, error: Exception) -> bool:
+        """Reports a failed call to the circuit breaker and returns whether it is retryable."""
+        if not is_retryable_error(error):
+            # The model answered, so this says nothing about its health
+            self.breaker.record_success()
+            return False
+        self.breaker.record_failure()
+        return True
+
+    async def _back_off(self, retry: int, error: Exception):
+        delay = self.backoff_delay(retry)
+        self.logger.warning(
+            f"Model call failed with {type(error).__name__}: {error}. "
+            f"Retry {retry + 1} of {self.max_retries} in {delay:.2f}s."
+        )
+        await self.sleep(delay)
+
+    def backoff_delay(self, retry: int) -> float:
+        """Returns the wait before retry number `retry + 1`, with full jitter."""
+        ceiling = min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** retry))
+        return self.rng.uniform(0, ceiling)
+
+    async def _hedged(self, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs an attempt, sending a duplicate if the first one is slow."""
+        if not self.hedge_after_seconds:
+            return await attempt()
+
+        pending = {asyncio.ensure_future(attempt())}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_after_seconds)
+            if done:
+                return done.pop().result()
+            self.logger.info(f"Model call slower than {self.hedge_after_seconds}s; sending a hedged request.")
+            pending.add(asyncio.ensure_future(attempt()))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(model_name: str) -> CircuitBreaker:
+    """Returns the process-wide circuit breaker for a model, shared by all agents."""
+    with _breakers_lock:
+        if model_name not in _breakers:
+            _breakers[model_name] = CircuitBreaker()
+        return _breakers[model_name]
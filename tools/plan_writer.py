@@ -2,6 +2,7 @@
 
 import os
 import logging
+from typing import Callable, Iterable, Optional
 
 class PlanWriter:
     """A tool for saving generated migration plans to a file."""
@@ -28,3 +29,39 @@ class PlanWriter:
         except IOError as e:
             self.logger.error(f"Failed to write plan to file at {output_path}: {e}")
             raise
+
+    def stream_plan(self, chunks: Iterable[str], output_path: str, on_chunk: Optional[Callable[[str], None]] = None) -> int:
+        """
+        Writes plan content to a file chunk by chunk, as it is produced.
+
+        Each chunk is flushed to disk as soon as it arrives, so the file grows
+        while the model is still generating; the writer keeps no copy of the
+        content. A streamed model call still collects the full response when
+        the response cache is enabled, to store it once the stream ends.
+
+        Args:
+            chunks: The plan content, in order.
+            output_path: The path (including filename) where the plan should be saved.
+            on_chunk: Optional callback called with each chunk after it is written.
+
+        Returns:
+            The number of characters written.
+        """
+        self.logger.info(f"Streaming migration plan to {output_path}...")
+        written = 0
+        try:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+            with open(output_path, "w") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    f.flush()
+                    written += len(chunk)
+                    if on_chunk is not None:
+                        on_chunk(chunk)
+
+            self.logger.info(f"Successfully streamed {written} characters to {output_path}")
+            return written
+        except IOError as e:
+            self.logger.error(f"Failed to stream plan to file at {output_path}: {e}")
+            raise
@@ -0,0 +1,77 @@
+# In file: tools/prompt_builder.py
+
+import json
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+# Rough number of characters per token used to size prompts.
+CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARKER = "\n... [truncated to fit the prompt budget]"
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of tokens in a piece of text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def compact_json(data: Any) -> str:
+    """Serializes data as JSON without indentation or extra whitespace."""
+    return json.dumps(data, separators=(",", ":"))
+
+class PromptBuilder:
+    """
+    Assembles prompts from a template within a token budget.
+
+    Fields are substituted into the template with `str.format`. When the
+    result is over budget, the fields marked as trimmable are shortened in
+    order, lowest priority first, until the prompt fits. The final prompt size
+    is logged for every call.
+    """
+    def __init__(self, token_budget: int, logger: Optional[logging.Logger] = None):
+        self.token_budget = token_budget
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+    def build(self, template: str, fields: Dict[str, str], trimmable: Sequence[str] = ()) -> str:
+        """
+        Renders a prompt, trimming low-priority fields if it is over budget.
+
+        Args:
+            template: The prompt template.
+            fields: Values to substitute into the template.
+            trimmable: Names of fields that may be shortened, in the order they
+                should be trimmed (least important first).
+
+        Returns:
+            The rendered prompt.
+        """
+        fields = dict(fields)
+        prompt = template.format(**fields)
+        budget_chars = self.token_budget * CHARS_PER_TOKEN
+
+        for name in trimmable:
+            overflow = len(prompt) - budget_chars
+            if overflow <= 0:
+                break
+            value = fields.get(name) or ""
+            if not value:
+                continue
+            fields[name] = self._trim(value, len(value) - overflow - len(TRUNCATION_MARKER))
+            prompt = template.format(**fields)
+            self.logger.info(f"Trimmed prompt field '{name}' from {len(value)} to {len(fields[name])} characters.")
+
+        tokens = estimate_tokens(prompt)
+        if tokens > self.token_budget:
+            self.logger.warning(f"Prompt is ~{tokens} tokens, over the budget of {self.token_budget}.")
+        else:
+            self.logger.info(f"Prompt size: ~{tokens} tokens ({len(prompt)} characters), budget {self.token_budget}.")
+        return prompt
+
+    @staticmethod
+    def _trim(value: str, max_chars: int) -> str:
+        """Cuts text down to at most max_chars, preferring a line boundary."""
+        if max_chars <= 0:
+            return ""
+        cut = value[:max_chars]
+        newline = cut.rfind("\n")
+        if newline > max_chars // 2:
+            cut = cut[:newline]
+        return cut + TRUNCATION_MARKER
@@ -0,0 +1,269 @@
+# In file: tools/rate_limiter.py
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from config import settings
+from tools.model_resilience import is_rate_limit_error
+
+class TokenBucket:
+    """
+    A token bucket holding up to one minute's worth of a quota.
+
+    The bucket refills continuously at `per_minute / 60` per second. It may
+    go negative when a call turns out to cost more than was reserved, which
+    delays later calls until the debt is paid back.
+    """
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.clock = clock
+        self.level = self.capacity
+        self._updated = clock()
+
+    def wait_time(self, amount: float) -> float:
+        """Returns the seconds until `amount` can be taken, 0 if it can be taken now."""
+        self._refill()
+        # A request larger than the bucket only waits for a full bucket
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def give_back(self, amount: float):
+        """Returns unused quota, or charges more when `amount` is negative."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+class RateLimitLease:
+    """Permission for one model call, returned by `ModelRateLimiter.acquire`."""
+    def __init__(self, key: str, tokens: int):
+        self.key = key
+        self.tokens = tokens
+        self.granted = False
+        self.granted_at: Optional[float] = None
+        self.event = asyncio.Event()
+
+class ModelRateLimiter:
+    """
+    A process-wide limiter keeping model calls within per-minute quotas.
+
+    Calls reserve one request and an estimated number of tokens from two
+    token buckets (requests per minute and tokens per minute). Waiting calls
+    are queued per caller and served round-robin, so one agent with many
+    calls, such as a sharded analysis, cannot starve the others.
+
+    The number of calls in flight is adjusted with AIMD: it grows by about
+    one per round of calls answered within the latency target, and halves
+    when a call is rate limited (HTTP 429) or slower than the target.
+
+    The limiter is not thread-safe; use it from the shared model loop.
+    """
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        initial_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+        max_concurrency: Optional[int] = None,
+        latency_target_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+    ):
+        """
+        Initializes the ModelRateLimiter. Unset options are read from settings;
+        a quota of 0 or None is not enforced.
+
+        Args:
+            requests_per_minute: The requests-per-minute quota.
+            tokens_per_minute: The tokens-per-minute quota, input and output.
+            initial_concurrency: Calls allowed in flight at the start.
+            min_concurrency: Lower bound for the adaptive concurrency.
+            max_concurrency: Upper bound for the adaptive concurrency.
+            latency_target_seconds: Calls slower than this reduce concurrency.
+            clock: Monotonic time source, in seconds.
+            sleep: Coroutine used to wait for quota to refill.
+        """
+        requests_per_minute = settings.MODEL_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        tokens_per_minute = settings.MODEL_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self.request_bucket = TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency or settings.MAX_CONCURRENT_MODEL_CALLS
+        self.concurrency_limit = float(min(
+            self.max_concurrency,
+            initial_concurrency or settings.MODEL_INITIAL_CONCURRENCY
+        ))
+        self.latency_target_seconds = latency_target_seconds or settings.MODEL_LATENCY_TARGET_SECONDS
+        self.in_flight = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._queues: "OrderedDict[str, Deque[RateLimitLease]]" = OrderedDict()
+        self._last_decrease: Optional[float] = None
+        self._wakeup: Optional[asyncio.Task] = None
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the current concurrency limit, calls in flight and calls waiting."""
+        return {
+            "concurrency_limit": int(self.concurrency_limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+        }
+
+    async def acquire(self, key: str, tokens: int) -> RateLimitLease:
+        """
+        Waits for a turn and quota for one model call.
+
+        Args:
+            key: Identifies the caller; waiting callers take turns.
+            tokens: Estimated tokens the call will use, input and output.
+
+        Returns:
+            A lease to pass to `release` when the call has finished.
+        """
+        lease = self.submit(key, tokens)
+        try:
+            self._schedule_wakeup(self.grant_ready())
+            await lease.event.wait()
+            return lease
+        except BaseException:
+            if lease.granted:
+                self.release(lease)
+            else:
+                self._withdraw(lease)
+            raise
+
+    def submit(self, key: str, tokens: int) -> RateLimitLease:
+        """Queues a call without waiting; see `grant_ready`."""
+        lease = RateLimitLease(key, tokens)
+        self._queues.setdefault(key, deque()).append(lease)
+        return lease
+
+    def grant_ready(self) -> Optional[float]:
+        """
+        Grants queued calls, taking turns between callers, while concurrency
+        and quota allow.
+
+        Returns:
+            Seconds until quota for the next call refills, or None if nothing
+            is waiting on quota.
+        """
+        while self._queues and self.in_flight < int(self.concurrency_limit):
+            key, queue = next(iter(self._queues.items()))
+            lease = queue[0]
+            wait = max(
+                self.request_bucket.wait_time(1) if self.request_bucket else 0.0,
+                self.token_bucket.wait_time(lease.tokens) if self.token_bucket else 0.0
+            )
+            if wait > 0:
+                # The head of the queue keeps its turn, so large calls are not starved
+                return wait
+            queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if self.request_bucket:
+                self.request_bucket.take(1)
+            if self.token_bucket:
+                self.token_bucket.take(lease.tokens)
+            self.in_flight += 1
+            lease.granted = True
+            lease.granted_at = self.clock()
+            lease.event.set()
+        return None
+
+    def release(
+        self,
+        lease: RateLimitLease,
+        actual_tokens: Optional[int] = None,
+        error: Optional[BaseException] = None
+    ):
+        """
+        Reports that a granted call has finished.
+
+        Args:
+            lease: The lease returned by `acquire`.
+            actual_tokens: Tokens the call actually used, if known. The
+                difference from the estimate is returned to or charged
+                against the tokens-per-minute bucket.
+            error: The error the call failed with, if any.
+        """
+        if not lease.granted:
+            return
+        lease.granted = False
+        self.in_flight -= 1
+        if actual_tokens is not None and self.token_bucket:
+            self.token_bucket.give_back(lease.tokens - actual_tokens)
+
+        latency = self.clock() - lease.granted_at
+        if error is not None and is_rate_limit_error(error):
+            self._decrease("rate limited")
+        elif latency > self.latency_target_seconds:
+            self._decrease(f"call took {latency:.1f}s")
+        elif error is None:
+            self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+        self._schedule_wakeup(self.grant_ready())
+
+    def _decrease(self, reason: str):
+        """Halves the concurrency limit, at most once per latency target."""
+        now = self.clock()
+        if self._last_decrease is not None and now - self._last_decrease < self.latency_target_seconds:
+            return
+        self._last_decrease = now
+        self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+        self.logger.warning(f"Model calls {reason}; lowering concurrency to {int(self.concurrency_limit)}.")
+
+    def _withdraw(self, lease: RateLimitLease):
+        queue = self._queues.get(lease.key)
+        if queue is not None and lease in queue:
+            queue.remove(lease)
+            if not queue:
+                del self._queues[lease.key]
+
+    def _schedule_wakeup(self, wait: Optional[float]):
+        """Grants queued calls again once quota has refilled, if anything waits on quota."""
+        if wait is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Driven synchronously through submit/grant_ready
+            return
+        if self._wakeup is not None and not self._wakeup.done() and self._wakeup.get_loop() is loop:
+            return
+        self._wakeup = loop.create_task(self._wake_after(wait))
+
+    async def _wake_after(self, wait: float):
+        await self.sleep(wait)
+        self._wakeup = None
+        self._schedule_wakeup(self.grant_ready())
+
+_default_limiter: Optional[ModelRateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> ModelRateLimiter:
+    """Returns the process-wide model rate limiter, creating it on first use."""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = ModelRateLimiter()
+        return _default_limiter
@@ -0,0 +1,187 @@
+# In file: tools/response_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from config import settings
+
+class ResponseCache:
+    """
+    A persistent, content-addressed cache for model responses.
+
+    Each entry is stored as its own JSON file named after the hash of the
+    model name, client, generation parameters and prompt. Entries are evicted in
+    least-recently-used order once the cache grows past its size limit, and
+    entries that have not been used within the maximum age are treated as
+    misses and removed.
+    """
+    def __init__(
+        self,
+        cache_dir: str = settings.RESPONSE_CACHE_DIR,
+        max_bytes: int = settings.RESPONSE_CACHE_MAX_BYTES,
+        max_age_seconds: float = settings.RESPONSE_CACHE_MAX_AGE_SECONDS
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Maps key -> (size in bytes, last-used timestamp), least recently used first.
+        self._index: "OrderedDict[str, tuple]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    @staticmethod
+    def make_key(
+        model_name: str,
+        temperature: float,
+        max_output_tokens: int,
+        prompt: str,
+        client: str = ""
+    ) -> str:
+        """
+        Builds the cache key for a model call.
+
+        Args:
+            model_name: The name of the model.
+            temperature: The sampling temperature.
+            max_output_tokens: The output token limit.
+            prompt: The full prompt text.
+            client: Identifies the client answering the call, so responses
+                of a placeholder client are never served for a real model.
+
+        Returns:
+            A hex digest identifying the call.
+        """
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        material = json.dumps([model_name, client, temperature, max_output_tokens, prompt_hash])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the cached response for a key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self._is_expired(entry[1]):
+                self._remove(key)
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), "r") as f:
+                    response = json.load(f)["response"]
+            except (IOError, json.JSONDecodeError, KeyError) as e:
+                self.logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._index[key] = (entry[0], time.time())
+            self._index.move_to_end(key)
+            os.utime(self._path(key))
+            self.hits += 1
+            return response
+
+    def put(self, key: str, response: str):
+        """
+        Stores a response and evicts old entries if the cache is over budget.
+        """
+        payload = json.dumps({"response": response})
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{self._path(key)}.tmp"
+                with open(tmp_path, "w") as f:
+                    f.write(payload)
+                os.replace(tmp_path, self._path(key))
+            except IOError as e:
+                self.logger.error(f"Failed to write cache entry {key}: {e}")
+                return
+            if key in self._index:
+                self._total_bytes -= self._index[key][0]
+            self._index[key] = (size, time.time())
+            self._index.move_to_end(key)
+            self._total_bytes += size
+            self._evict()
+
+    def invalidate(self, key: str):
+        """Removes the entry for a key, if there is one."""
+        with self._lock:
+            if key in self._index:
+                self._remove(key)
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and the current cache size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "bytes": self._total_bytes
+            }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _is_expired(self, last_used: float) -> bool:
+        return self.max_age_seconds is not None and time.time() - last_used > self.max_age_seconds
+
+    def _load_index(self):
+        """Rebuilds the in-memory LRU index from the files on disk."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, entry.name[:-len(".json")], stat.st_size))
+        for last_used, key, size in sorted(entries):
+            self._index[key] = (size, last_used)
+            self._total_bytes += size
+        with self._lock:
+            self._evict()
+        self.logger.info(f"Loaded response cache with {len(self._index)} entries.")
+
+    def _evict(self):
+        """Drops expired entries, then least-recently-used ones until under budget."""
+        for key in [key for key, (_, last_used) in self._index.items() if self._is_expired(last_used)]:
+            self._remove(key)
+        while self._index and self._total_bytes > self.max_bytes:
+            self._remove(next(iter(self._index)))
+
+    def _remove(self, key: str):
+        size, _ = self._index.pop(key)
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache() -> ResponseCache:
+    """Returns the process-wide response cache, creating it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
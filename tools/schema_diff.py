@@ -0,0 +1,205 @@
+# In file: tools/schema_diff.py
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import pandas as pd
+
+from tools.ddl_generator import DdlGenerator
+
+class SchemaDiff:
+    """
+    The difference between two snapshots of a source schema.
+
+    Tables and columns are matched by name. A column whose type changed is
+    reported as altered rather than dropped and re-added.
+    """
+    def __init__(
+        self,
+        added_tables: Dict[str, List[Dict[str, Any]]],
+        dropped_tables: List[str],
+        added_columns: List[Dict[str, Any]],
+        dropped_columns: List[Dict[str, Any]],
+        altered_columns: List[Dict[str, Any]]
+    ):
+        """
+        Args:
+            added_tables: New tables, mapped to their columns
+                (`column_name`, `data_type`, and `is_primary_key` when known).
+            dropped_tables: Names of tables that no longer exist.
+            added_columns: New columns of existing tables.
+            dropped_columns: Removed columns of tables that still exist.
+            altered_columns: Columns whose type changed, with `old_type` and `new_type`.
+        """
+        self.added_tables = added_tables
+        self.dropped_tables = dropped_tables
+        self.added_columns = added_columns
+        self.dropped_columns = dropped_columns
+        self.altered_columns = altered_columns
+
+    @property
+    def is_empty(self) -> bool:
+        """True if the two schemas are identical."""
+        return not (self.added_tables or self.dropped_tables or self.added_columns
+                    or self.dropped_columns or self.altered_columns)
+
+    @property
+    def changed_tables(self) -> Set[str]:
+        """Tables that still exist and were added or modified."""
+        changed = set(self.added_tables)
+        for column in self.added_columns + self.dropped_columns + self.altered_columns:
+            changed.add(column["table_name"])
+        return changed
+
+    def affected_tables(self, relationships: Iterable[Dict[str, Any]]) -> Set[str]:
+        """
+        Returns the changed tables plus their relationship neighbours.
+
+        Args:
+            relationships: Relationships from the previous analysis report.
+        """
+        changed = self.changed_tables
+        touched = changed | set(self.dropped_tables)
+        affected = set(changed)
+        for relationship in relationships:
+            from_table, to_table = relationship.get("from_table"), relationship.get("to_table")
+            if from_table in touched:
+                affected.add(to_table)
+            if to_table in touched:
+                affected.add(from_table)
+        affected.discard(None)
+        return affected - set(self.dropped_tables)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the diff as a JSON-serializable dictionary."""
+        return {
+            "added_tables": self.added_tables,
+            "dropped_tables": self.dropped_tables,
+            "added_columns": self.added_columns,
+            "dropped_columns": self.dropped_columns,
+            "altered_columns": self.altered_columns,
+        }
+
+    def to_migration_sql(
+        self,
+        schema_df: Optional[pd.DataFrame] = None,
+        relationships: Iterable[Dict[str, Any]] = ()
+    ) -> str:
+        """
+        Renders the diff as a migration script of `CREATE`, `DROP` and
+        `ALTER TABLE` statements.
+
+        Drops come first, so no statement below still refers to a dropped
+        table or column. With the current catalog, new tables are rendered
+        like a full run's DDL (see `DdlGenerator`), added columns keep their
+        `NOT NULL`, and foreign keys on added columns or to new tables are
+        added once every table exists.
+
+        Args:
+            schema_df: The current schema catalog.
+            relationships: Relationships of the current analysis report.
+        """
+        statements = []
+        for column in self.dropped_columns:
+            statements.append(f"ALTER TABLE {column['table_name']} DROP COLUMN {column['column_name']};")
+        for table in self.dropped_tables:
+            statements.append(f"DROP TABLE {table};")
+
+        foreign_keys: Dict[str, List[Tuple[str, str, str]]] = {}
+        not_null: Set[Tuple[str, str]] = set()
+        if schema_df is not None:
+            relationships = list(relationships)
+            generator = DdlGenerator()
+            if self.added_tables:
+                statements += generator.create_statements(schema_df, relationships, self.added_tables)
+            foreign_keys = generator.foreign_keys(schema_df, relationships)
+            if "is_nullable" in schema_df.columns:
+                required = schema_df[~schema_df["is_nullable"].astype(bool)]
+                not_null = set(zip(required["table_name"].astype(str), required["column_name"].astype(str)))
+        else:
+            for table, columns in self.added_tables.items():
+                definitions = [f"    {column['column_name']} {column['data_type']}" for column in columns]
+                primary_key = [column["column_name"] for column in columns if column.get("is_primary_key")]
+                if primary_key:
+                    definitions.append(f"    PRIMARY KEY ({', '.join(primary_key)})")
+                statements.append(f"CREATE TABLE {table} (\n" + ",\n".join(definitions) + "\n);")
+
+        for column in self.added_columns:
+            constraint = " NOT NULL" if (column["table_name"], column["column_name"]) in not_null else ""
+            statements.append(
+                f"ALTER TABLE {column['table_name']} ADD COLUMN {column['column_name']} {column['data_type']}{constraint};"
+            )
+        for column in self.altered_columns:
+            statements.append(f"ALTER TABLE {column['table_name']} ALTER COLUMN {column['column_name']} TYPE {column['new_type']};")
+
+        # New tables carry their own foreign keys; existing tables get the new ones here
+        added_columns = {(column["table_name"], column["column_name"]) for column in self.added_columns}
+        for table, keys in foreign_keys.items():
+            if table in self.added_tables:
+                continue
+            for column, to_table, to_column in keys:
+                if (table, column) in added_columns or to_table in self.added_tables:
+                    statements.append(f"ALTER TABLE {table} ADD FOREIGN KEY ({column}) REFERENCES {to_table} ({to_column});")
+
+        if not statements:
+            return "-- No schema changes since the previous run.\n"
+        return "-- Schema changes since the previous run\n" + "\n".join(statements) + "\n"
+
+def diff_schemas(previous_df: pd.DataFrame, current_df: pd.DataFrame) -> SchemaDiff:
+    """
+    Compares two schema DataFrames.
+
+    Args:
+        previous_df: The schema of the previous run.
+        current_df: The schema read for this run.
+
+    Returns:
+        A SchemaDiff describing how `current_df` differs from `previous_df`.
+    """
+    keys = ["table_name", "column_name"]
+    previous = _normalize(previous_df)
+    current = _normalize(current_df)
+    merged = previous.merge(current, on=keys, how="outer", suffixes=("_old", "_new"), indicator=True, sort=True)
+
+    previous_tables = set(previous["table_name"])
+    current_tables = set(current["table_name"])
+    new_tables = current_tables - previous_tables
+    gone_tables = previous_tables - current_tables
+
+    added = merged[merged["_merge"] == "right_only"]
+    dropped = merged[merged["_merge"] == "left_only"]
+    both = merged[merged["_merge"] == "both"]
+    altered = both[both["data_type_old"] != both["data_type_new"]]
+
+    new_columns = current[current["table_name"].isin(new_tables)]
+    added_tables: Dict[str, List[Dict[str, Any]]] = {
+        table: columns.drop(columns=["table_name"]).to_dict("records")
+        for table, columns in new_columns.groupby("table_name", sort=True)
+    }
+
+    return SchemaDiff(
+        added_tables=added_tables,
+        dropped_tables=sorted(gone_tables),
+        added_columns=[
+            {"table_name": row.table_name, "column_name": row.column_name, "data_type": row.data_type_new}
+            for row in added[~added["table_name"].isin(new_tables)].itertuples()
+        ],
+        dropped_columns=[
+            {"table_name": row.table_name, "column_name": row.column_name, "data_type": row.data_type_old}
+            for row in dropped[~dropped["table_name"].isin(gone_tables)].itertuples()
+        ],
+        altered_columns=[
+            {"table_name": row.table_name, "column_name": row.column_name,
+             "old_type": row.data_type_old, "new_type": row.data_type_new}
+            for row in altered.itertuples()
+        ]
+    )
+
+def _normalize(schema_df: pd.DataFrame) -> pd.DataFrame:
+    """Reduces a schema to plain-string name and type columns, in catalog order."""
+    normalized = pd.DataFrame({
+        "table_name": schema_df["table_name"].astype(str),
+        "column_name": schema_df["column_name"].astype(str),
+        "data_type": schema_df["data_type"].astype(str) if "data_type" in schema_df.columns else "",
+    })
+    if "is_primary_key" in schema_df.columns:
+        normalized["is_primary_key"] = schema_df["is_primary_key"].astype(bool).to_numpy()
+    return normalized
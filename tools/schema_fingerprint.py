@@ -0,0 +1,27 @@
+# In file: tools/schema_fingerprint.py
+
+import hashlib
+import pandas as pd
+
+FINGERPRINT_COLUMNS = ["table_name", "column_name", "data_type"]
+
+def schema_fingerprint(schema_df: pd.DataFrame) -> str:
+    """
+    Computes a stable content hash of a schema.
+
+    The hash covers the sorted `(table, column, type)` rows only, so it does
+    not change with row order, extra catalog columns or dtypes.
+
+    Args:
+        schema_df: A schema DataFrame as returned by a connector.
+
+    Returns:
+        The hex SHA-256 digest of the schema.
+    """
+    rows = pd.DataFrame({
+        column: schema_df[column].astype(str).str.strip() if column in schema_df.columns else ""
+        for column in FINGERPRINT_COLUMNS
+    }, index=schema_df.index)
+    rows = rows.sort_values(FINGERPRINT_COLUMNS)
+    lines = rows["table_name"].str.cat([rows["column_name"], rows["data_type"]], sep="\x1f")
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
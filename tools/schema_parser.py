@@ -1,21 +1,66 @@
 # In file: tools/schema_parser.py
 
+import asyncio
 import pandas as pd
 import json
 import logging
 from agents.base_agent import BaseAgent
-from typing import Dict, Any
+from config import settings
+from prompts.source_analysis_prompt import (
+    SCHEMA_ANALYSIS_INCREMENTAL_SUFFIX,
+    SCHEMA_ANALYSIS_RETRY_SUFFIX,
+    SCHEMA_ANALYSIS_SEED_SUFFIX,
+    SCHEMA_ANALYSIS_SHARD_SUFFIX
+)
+from tools import async_runtime
+from tools.json_repair import extract_json
+from tools.prompt_builder import CHARS_PER_TOKEN, compact_json
+from tools.relationship_inference import RelationshipInferrer
+from tools.schema_diff import SchemaDiff
+from typing import Dict, Any, List, Optional
+
+RELATIONSHIP_KEYS = ("from_table", "from_column", "to_table", "to_column")
+
+class ResponseParseError(ValueError):
+    """Raised when a model response cannot be turned into an analysis report."""
+    def __init__(self, message: str, response: Optional[str]):
+        super().__init__(message)
+        self.response = response
 
 class SchemaParser:
     """
     Parses and analyzes a database schema using a generative model.
+
+    Small schemas are sent to the model in a single prompt. Schemas that do
+    not fit the token budget are split by table into shards that are analyzed
+    concurrently and merged into one report (map-reduce).
+
+    Relationships that follow naming conventions are inferred up front and
+    passed to the model as seeds, so it only has to confirm and enrich them.
+
+    When a previous report and a schema diff are available, only the changed
+    tables and their neighbours are re-analyzed and the previous report is
+    patched with the result.
+
+    Responses are extracted from code fences or surrounding prose and repaired
+    locally where possible; the model is only asked again, a bounded number of
+    times, when that fails.
     """
-    def __init__(self, agent: BaseAgent):
+    def __init__(self, agent: BaseAgent, shard_token_budget: Optional[int] = None):
         self.agent = agent
+        self.shard_token_budget = shard_token_budget or settings.SCHEMA_SHARD_TOKEN_BUDGET
+        self.relationship_inferrer = RelationshipInferrer()
         self.logger = logging.getLogger(self.__class__.__name__)
 
     # CORRECTED: Added the 'context' parameter to the function definition
-    def analyze_schema(self, schema_df: pd.DataFrame, analysis_prompt: str, context: str = "") -> Dict[str, Any]:
+    def analyze_schema(
+        self,
+        schema_df: pd.DataFrame,
+        analysis_prompt: str,
+        context: str = "",
+        sharded: Optional[bool] = None,
+        declared_relationships: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Analyzes the schema by formatting it and sending it to the agent's model.
 
@@ -23,31 +68,531 @@ class SchemaParser:
             schema_df: A pandas DataFrame representing the database schema.
             analysis_prompt: The prompt template for the analysis.
             context: Optional context from previous pipeline runs.
+            sharded: Force (True) or disable (False) sharded analysis. By
+                default the schema is sharded only when it exceeds the budget.
+            declared_relationships: Foreign keys declared in the source, which
+                are passed on as known relationships ahead of inferred ones.
         """
+        if sharded is None:
+            sharded = (
+                "table_name" in schema_df.columns
+                and self.estimate_tokens(schema_df) > self.shard_token_budget
+            )
+        if sharded:
+            return self.analyze_schema_sharded(schema_df, analysis_prompt, context, declared_relationships)
+
         try:
-            schema_json = schema_df.to_json(orient='records', indent=2)
-            
-            prompt = analysis_prompt.format(
-                schema_json=schema_json,
-                context=context
+            schema_json = schema_df.to_json(orient='records')
+            seed_relationships = self.seed_relationships(schema_df, declared_relationships)
+
+            prompt = self.agent.prompt_builder.build(
+                analysis_prompt + "{seed_section}",
+                {
+                    "schema_json": schema_json,
+                    "context": context,
+                    "seed_section": self._seed_suffix(seed_relationships)
+                },
+                trimmable=["context", "seed_section"]
             )
-            
-            analysis_str = self.agent._execute_prompt(prompt)
-            
-            analysis_dict = json.loads(analysis_str)
+
+            analysis_dict = self._request_report(prompt)
             self.logger.info("Successfully parsed structured JSON from model response.")
-            return analysis_dict
-            
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Could not parse JSON from model response: {e}")
+            return self._add_seed_relationships(analysis_dict, seed_relationships)
+
+        except ResponseParseError as e:
+            return self._parse_error_report(e)
+        except Exception as e:
+            self.logger.error(f"An unexpected error occurred in schema analysis: {e}")
             return {
-                "error": "Failed to parse JSON response from the model.",
-                "raw_response": analysis_str
+                "error": "An unexpected error occurred.",
+                "details": str(e)
             }
+
+    def analyze_schema_sharded(
+        self,
+        schema_df: pd.DataFrame,
+        analysis_prompt: str,
+        context: str = "",
+        declared_relationships: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyzes a large schema in table-aligned shards and merges the results.
+
+        Args:
+            schema_df: A pandas DataFrame with at least a `table_name` column.
+            analysis_prompt: The prompt template for the analysis.
+            context: Optional context from previous pipeline runs.
+            declared_relationships: Foreign keys declared in the source.
+        """
+        try:
+            shards = self.split_into_shards(schema_df)
+            self.logger.info(f"Analyzing schema in {len(shards)} shards of up to {self.shard_token_budget} tokens.")
+            referenced_tables = self.relationship_inferrer.referenced_tables(schema_df)
+            seed_relationships = self.seed_relationships(schema_df, declared_relationships)
+            prompts = []
+            for index, shard in enumerate(shards):
+                shard_tables = set(shard["table_name"])
+                shard_seeds = [rel for rel in seed_relationships if rel["from_table"] in shard_tables]
+                prompts.append(self.agent.prompt_builder.build(
+                    analysis_prompt + "{shard_section}{seed_section}",
+                    {
+                        "schema_json": shard.to_json(orient='records'),
+                        "context": context,
+                        "shard_section": SCHEMA_ANALYSIS_SHARD_SUFFIX.format(
+                            shard_number=index + 1,
+                            shard_count=len(shards),
+                            table_directory=self._build_table_directory(
+                                schema_df, self._outside_references(shard_tables, referenced_tables)
+                            )
+                        ),
+                        "seed_section": self._seed_suffix(shard_seeds)
+                    },
+                    trimmable=["context", "seed_section"]
+                ))
+            responses = async_runtime.run_sync(self._analyze_shards(prompts))
         except Exception as e:
-            self.logger.error(f"An unexpected error occurred in schema analysis: {e}")
+            self.logger.error(f"An unexpected error occurred in sharded schema analysis: {e}")
             return {
                 "error": "An unexpected error occurred.",
                 "details": str(e)
             }
 
+        partial_reports = []
+        failed_shards = []
+        for index, response in enumerate(responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                partial_reports.append(response)
+            except Exception as e:
+                self.logger.error(f"Shard {index + 1} of {len(responses)} failed: {e}")
+                failed_shards.append(index + 1)
+
+        if not partial_reports:
+            return {
+                "error": "Failed to analyze every schema shard.",
+                "failed_shards": failed_shards
+            }
+
+        # Seeds are merged last so the model's version of a relationship wins.
+        report = self.merge_reports(partial_reports + [{"relationships": seed_relationships}], schema_df)
+        if failed_shards:
+            report["failed_shards"] = failed_shards
+        self.logger.info(
+            f"Merged {len(partial_reports)} shard reports into {len(report['key_tables'])} tables "
+            f"and {len(report['relationships'])} relationships."
+        )
+        return report
+
+    def analyze_schema_incremental(
+        self,
+        schema_df: pd.DataFrame,
+        analysis_prompt: str,
+        previous_report: Dict[str, Any],
+        schema_diff: SchemaDiff,
+        context: str = "",
+        declared_relationships: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-analyzes only the tables affected by a schema change.
+
+        The changed tables and their relationship neighbours in the previous
+        report are sent to the model; the rest of the previous report is kept.
+        When the affected part is too large for one prompt, or more than
+        INCREMENTAL_ANALYSIS_MAX_FRACTION of the tables, the whole schema is
+        analyzed instead.
+
+        Args:
+            schema_df: The current schema.
+            analysis_prompt: The prompt template for the analysis.
+            previous_report: The analysis report of the previous run.
+            schema_diff: How the schema changed since the previous run.
+            context: Optional context from previous pipeline runs.
+            declared_relationships: Foreign keys declared in the source.
+        """
+        affected = schema_diff.affected_tables(previous_report.get("relationships", []))
+        changed = schema_diff.changed_tables | set(schema_diff.dropped_tables)
+        if not affected:
+            self.logger.info("No tables need re-analysis; patching the previous report.")
+            return self.patch_report(previous_report, {}, changed, changed, schema_df)
+
+        subset = schema_df[schema_df["table_name"].isin(affected)]
+        table_count = schema_df["table_name"].nunique()
+        table_directory = self._build_table_directory(
+            schema_df, self._outside_references(affected, self.relationship_inferrer.referenced_tables(schema_df))
+        )
+        if (len(affected) > settings.INCREMENTAL_ANALYSIS_MAX_FRACTION * table_count
+                or self.estimate_tokens(subset) + len(table_directory) // CHARS_PER_TOKEN > self.shard_token_budget):
+            self.logger.info(f"{len(affected)} of {table_count} tables changed; re-analyzing the full schema.")
+            return self.analyze_schema(schema_df, analysis_prompt, context, declared_relationships=declared_relationships)
+
+        self.logger.info(f"Re-analyzing {len(affected)} of {table_count} tables affected by schema changes.")
+        try:
+            seed_relationships = [
+                rel for rel in self.seed_relationships(schema_df, declared_relationships)
+                if rel["from_table"] in affected or rel["to_table"] in affected
+            ]
+            prompt = self.agent.prompt_builder.build(
+                analysis_prompt + "{incremental_section}{seed_section}",
+                {
+                    "schema_json": subset.to_json(orient='records'),
+                    "context": context,
+                    "incremental_section": SCHEMA_ANALYSIS_INCREMENTAL_SUFFIX.format(
+                        table_directory=table_directory
+                    ),
+                    "seed_section": self._seed_suffix(seed_relationships)
+                },
+                trimmable=["context", "seed_section"]
+            )
+            partial = self._add_seed_relationships(self._request_report(prompt), seed_relationships)
+        except ResponseParseError as e:
+            return self._parse_error_report(e)
+        except Exception as e:
+            self.logger.error(f"An unexpected error occurred in incremental schema analysis: {e}")
+            return {
+                "error": "An unexpected error occurred.",
+                "details": str(e)
+            }
+        return self.patch_report(previous_report, partial, affected | changed, changed, schema_df)
+
+    def patch_report(
+        self,
+        previous_report: Dict[str, Any],
+        partial_report: Dict[str, Any],
+        reanalyzed_tables: set,
+        changed_tables: set,
+        schema_df: pd.DataFrame
+    ) -> Dict[str, Any]:
+        """
+        Replaces the re-analyzed part of a previous report.
+
+        Table entries of re-analyzed tables and relationships touching changed
+        tables are taken from the partial report. Everything else is kept from
+        the previous report, as long as it still exists in the current schema.
+        The previous summary is kept.
+        """
+        kept = {
+            "summary": previous_report.get("summary", ""),
+            "key_tables": [
+                table for table in previous_report.get("key_tables", [])
+                if table.get("table_name") not in reanalyzed_tables
+            ],
+            "relationships": [
+                rel for rel in previous_report.get("relationships", [])
+                if rel.get("from_table") not in changed_tables and rel.get("to_table") not in changed_tables
+            ]
+        }
+        update = {
+            "key_tables": partial_report.get("key_tables", []),
+            "relationships": partial_report.get("relationships", [])
+        }
+        report = self.merge_reports([kept, update], schema_df)
+        self.logger.info(
+            f"Patched previous report: {len(update['key_tables'])} tables re-analyzed, "
+            f"{len(report['key_tables'])} tables and {len(report['relationships'])} relationships in total."
+        )
+        return report
+
+    def estimate_tokens(self, schema_df: pd.DataFrame) -> int:
+        """
+        Estimates the prompt tokens needed to send a schema frame as JSON.
+        """
+        return int(self._row_chars(schema_df).sum()) // CHARS_PER_TOKEN
+
+    def split_into_shards(self, schema_df: pd.DataFrame) -> List[pd.DataFrame]:
+        """
+        Splits a schema into chunks of whole tables that fit the token budget.
+
+        The budget covers the shard's columns and the table directory entries
+        of the outside tables they reference. A table that alone exceeds the
+        budget becomes its own shard.
+        """
+        table_tokens = (
+            self._row_chars(schema_df)
+            .groupby(schema_df["table_name"], sort=False)
+            .sum() // CHARS_PER_TOKEN
+        )
+        referenced_tables = self.relationship_inferrer.referenced_tables(schema_df)
+        entry_tokens = {
+            table: -(-len(compact_json({table: columns})) // CHARS_PER_TOKEN)
+            for table, columns in self._identifier_columns(schema_df).items()
+        }
+
+        shard_tables: List[List[str]] = []
+        current: List[str] = []
+        current_references: set = set()
+        current_tokens = 0
+        for table_name, tokens in table_tokens.items():
+            references = set(referenced_tables.get(table_name, ())) - current_references
+            cost = tokens + sum(entry_tokens.get(table, 0) for table in references)
+            if current and current_tokens + cost > self.shard_token_budget:
+                shard_tables.append(current)
+                current, current_references, current_tokens = [], set(), 0
+                references = set(referenced_tables.get(table_name, ()))
+                cost = tokens + sum(entry_tokens.get(table, 0) for table in references)
+            current.append(table_name)
+            current_references |= references
+            current_tokens += cost
+        if current:
+            shard_tables.append(current)
+
+        shard_of_table = {table: index for index, tables in enumerate(shard_tables) for table in tables}
+        shard_ids = schema_df["table_name"].map(shard_of_table)
+        return [shard for _, shard in schema_df.groupby(shard_ids, sort=True)]
+
+    def merge_reports(self, reports: List[Dict[str, Any]], schema_df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Merges shard reports into a single analysis report.
+
+        Tables are de-duplicated by name. Relationships are checked against the
+        full schema, so references to tables or columns in other shards are kept
+        only when they exist, and the same relationship reported from both ends
+        by different shards is kept once.
+        """
+        summaries = []
+        for report in reports:
+            summary = report.get("summary")
+            if summary and summary not in summaries:
+                summaries.append(summary)
+
+        key_tables = {}
+        for report in reports:
+            for table in report.get("key_tables", []):
+                name = table.get("table_name")
+                if name and name not in key_tables:
+                    key_tables[name] = table
+
+        known_columns = set(zip(schema_df["table_name"], schema_df["column_name"])) if "column_name" in schema_df.columns else None
+        known_tables = set(schema_df["table_name"])
+        relationships = {}
+        for report in reports:
+            for relationship in report.get("relationships", []):
+                resolved = self._resolve_relationship(relationship, known_tables, known_columns)
+                if resolved is None:
+                    continue
+                key = (resolved["from_table"], resolved["from_column"], resolved["to_table"], resolved["to_column"])
+                if key not in relationships:
+                    relationships[key] = resolved
+
+        return {
+            "summary": " ".join(summaries),
+            "key_tables": list(key_tables.values()),
+            "relationships": list(relationships.values())
+        }
+
+    def _resolve_relationship(self, relationship: Dict[str, Any], known_tables: set, known_columns: Optional[set]) -> Optional[Dict[str, Any]]:
+        """
+        Validates a relationship against the full schema.
+
+        One-to-Many relationships are normalized to the Many-to-One direction so
+        that both ends of a cross-shard relationship de-duplicate.
+        """
+        try:
+            from_table, from_column = relationship["from_table"], relationship["from_column"]
+            to_table, to_column = relationship["to_table"], relationship["to_column"]
+        except KeyError:
+            return None
+
+        if from_table not in known_tables or to_table not in known_tables:
+            return None
+        if known_columns is not None and (
+            (from_table, from_column) not in known_columns or (to_table, to_column) not in known_columns
+        ):
+            return None
+
+        if relationship.get("relationship_type") == "One-to-Many":
+            return {
+                **relationship,
+                "from_table": to_table,
+                "from_column": to_column,
+                "to_table": from_table,
+                "to_column": from_column,
+                "relationship_type": "Many-to-One"
+            }
+        return dict(relationship)
+
+    def seed_relationships(
+        self,
+        schema_df: pd.DataFrame,
+        declared_relationships: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Combines declared foreign keys with relationships inferred from names.
+
+        Declared relationships come first; an inferred relationship is only
+        added when the same column is not already declared.
+        """
+        seeds = list(declared_relationships or [])
+        declared_columns = {(rel["from_table"], rel["from_column"]) for rel in seeds}
+        for rel in self.relationship_inferrer.infer(schema_df):
+            if (rel["from_table"], rel["from_column"]) not in declared_columns:
+                seeds.append(rel)
+        return seeds
+
+    def _seed_suffix(self, seed_relationships: List[Dict[str, Any]]) -> str:
+        """Formats inferred relationships for inclusion in a prompt."""
+        if not seed_relationships:
+            return ""
+        return SCHEMA_ANALYSIS_SEED_SUFFIX.format(seed_relationships=compact_json(seed_relationships))
+
+    def _add_seed_relationships(self, report: Dict[str, Any], seed_relationships: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Adds inferred relationships that the model left out of its report."""
+        if not seed_relationships or not isinstance(report.get("relationships", []), list):
+            return report
+        reported = set()
+        for rel in report.get("relationships", []):
+            ends = (rel.get("from_table"), rel.get("from_column")), (rel.get("to_table"), rel.get("to_column"))
+            reported.add(ends)
+            reported.add(ends[::-1])
+        missing = [
+            rel for rel in seed_relationships
+            if ((rel["from_table"], rel["from_column"]), (rel["to_table"], rel["to_column"])) not in reported
+        ]
+        if missing:
+            self.logger.info(f"Adding {len(missing)} inferred relationships missed by the model.")
+            report["relationships"] = report.get("relationships", []) + missing
+        return report
+
+    async def _analyze_shards(self, prompts: List[str]) -> List[Any]:
+        """Sends all shard prompts concurrently through the agent's async path."""
+        return await asyncio.gather(
+            *(self._arequest_report(prompt) for prompt in prompts),
+            return_exceptions=True
+        )
+
+    def _request_report(self, prompt: str) -> Dict[str, Any]:
+        """
+        Sends an analysis prompt and parses the response into a report.
+
+        An unusable response is dropped from the response cache, and the
+        model is asked again without the cache, so a bad answer is never
+        replayed on the next run.
+
+        Raises:
+            ResponseParseError: If no attempt produced a valid report.
+        """
+        response = self.agent._execute_prompt(prompt)
+        for attempt in range(settings.ANALYSIS_PARSE_MAX_RETRIES + 1):
+            try:
+                return self._parse_response(response)
+            except ResponseParseError as e:
+                if attempt == settings.ANALYSIS_PARSE_MAX_RETRIES:
+                    raise
+                if attempt == 0:
+                    self.agent._forget_response(prompt)
+                self.logger.warning(f"Unusable model response ({e}); asking again.")
+                response = self.agent._execute_prompt(self._retry_prompt(prompt, e), use_cache=False)
+
+    async def _arequest_report(self, prompt: str) -> Dict[str, Any]:
+        """The async counterpart of `_request_report`, used for shards."""
+        response = await self.agent._aexecute_prompt(prompt)
+        for attempt in range(settings.ANALYSIS_PARSE_MAX_RETRIES + 1):
+            try:
+                return self._parse_response(response)
+            except ResponseParseError as e:
+                if attempt == settings.ANALYSIS_PARSE_MAX_RETRIES:
+                    raise
+                if attempt == 0:
+                    self.agent._forget_response(prompt)
+                self.logger.warning(f"Unusable model response ({e}); asking again.")
+                response = await self.agent._aexecute_prompt(self._retry_prompt(prompt, e), use_cache=False)
+
+    def _retry_prompt(self, prompt: str, error: ResponseParseError) -> str:
+        return prompt + SCHEMA_ANALYSIS_RETRY_SUFFIX.format(error=error)
+
+    def _parse_error_report(self, error: ResponseParseError) -> Dict[str, Any]:
+        self.logger.error(f"Could not parse JSON from model response: {error}")
+        return {
+            "error": "Failed to parse JSON response from the model.",
+            "details": str(error),
+            "raw_response": error.response
+        }
+
+    def _build_table_directory(self, schema_df: pd.DataFrame, tables: Optional[List[str]] = None) -> str:
+        """
+        Lists tables with their identifier-like columns, as compact JSON.
+
+        Args:
+            schema_df: The full schema.
+            tables: The tables to list. Defaults to every table.
+        """
+        if "column_name" not in schema_df.columns:
+            names = schema_df["table_name"].unique().tolist()
+            return compact_json(sorted(names if tables is None else set(names) & set(tables)))
+        directory = self._identifier_columns(schema_df)
+        if tables is not None:
+            directory = {table: directory[table] for table in tables if table in directory}
+        return compact_json(directory)
+
+    @staticmethod
+    def _identifier_columns(schema_df: pd.DataFrame) -> Dict[str, List[str]]:
+        """Returns the identifier-like columns of every table, in catalog order."""
+        directory = {table: [] for table in schema_df["table_name"].unique()}
+        if "column_name" not in schema_df.columns:
+            return directory
+        id_columns = schema_df[schema_df["column_name"].astype(str).str.endswith("id")]
+        for table, column in zip(id_columns["table_name"], id_columns["column_name"]):
+            directory[table].append(column)
+        return directory
+
+    @staticmethod
+    def _outside_references(tables, referenced_tables: Dict[str, List[str]]) -> List[str]:
+        """Returns the tables referenced by `tables` that are not among them, sorted by name."""
+        tables = set(tables)
+        return sorted({
+            referenced
+            for table in tables
+            for referenced in referenced_tables.get(table, ())
+            if referenced not in tables
+        })
+
+    def _row_chars(self, schema_df: pd.DataFrame) -> pd.Series:
+        """Approximates the size in characters of each row as compact JSON."""
+        # Per row: braces and a comma, plus quotes, colon and comma per field.
+        overhead = 3 + sum(len(str(column)) + 6 for column in schema_df.columns)
+        chars = pd.Series(overhead, index=schema_df.index)
+        for column in schema_df.columns:
+            chars = chars + schema_df[column].astype(str).str.len()
+        return chars
+
+    def _parse_response(self, response: str) -> Dict[str, Any]:
+        """
+        Parses the model's response into an analysis report.
+
+        The JSON object is extracted from fences or surrounding text and
+        repaired if needed (see `extract_json`), then checked for the
+        `summary`/`key_tables`/`relationships` shape.
+
+        Raises:
+            ResponseParseError: If no valid report can be recovered.
+        """
+        try:
+            report = extract_json(response)
+        except json.JSONDecodeError as e:
+            raise ResponseParseError(f"no valid JSON object found ({e})", response) from e
+        problems = self._validate_report(report)
+        if problems:
+            raise ResponseParseError("the report " + "; ".join(problems), response)
+        return report
+
+    def _validate_report(self, report: Any) -> List[str]:
+        """Returns what is wrong with the shape of an analysis report, if anything."""
+        if not isinstance(report, dict):
+            return ["is not a JSON object"]
+        problems = []
+        if not isinstance(report.get("summary"), str):
+            problems.append("has no `summary` string")
+        key_tables = report.get("key_tables")
+        if not isinstance(key_tables, list):
+            problems.append("has no `key_tables` list")
+        elif not all(isinstance(table, dict) and table.get("table_name") for table in key_tables):
+            problems.append("has `key_tables` entries without a `table_name`")
+        relationships = report.get("relationships")
+        if not isinstance(relationships, list):
+            problems.append("has no `relationships` list")
+        elif not all(
+            isinstance(rel, dict) and all(rel.get(key) for key in RELATIONSHIP_KEYS)
+            for rel in relationships
+        ):
+            problems.append("has `relationships` entries without both ends")
+        return problems
@@ -0,0 +1,160 @@
+# In file: tools/sqlite_connector.py
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from config import settings
+from .connection_pool import ConnectionPool
+from .database_connector import BaseConnector
+
+SCHEMA_COLUMNS = ["table_name", "column_name", "data_type", "is_nullable", "is_primary_key"]
+
+class SqliteConnector(BaseConnector):
+    """
+    A connector that introspects the catalog of a SQLite database.
+
+    Columns, types, nullability and primary keys are read with
+    `PRAGMA table_info`, and declared foreign keys with
+    `PRAGMA foreign_key_list`. Tables are read concurrently over a small pool
+    of read-only connections.
+    """
+    def __init__(self, database_path: str, pool_size: Optional[int] = None):
+        """
+        Initializes the SqliteConnector.
+
+        Args:
+            database_path: The path to the SQLite database file.
+            pool_size: Maximum number of connections used to read the catalog.
+        """
+        super().__init__()
+        self.database_path = database_path
+        self.pool_size = pool_size or settings.CONNECTOR_POOL_SIZE
+        self.pool: Optional[ConnectionPool] = None
+        self._foreign_keys: Optional[List[Dict[str, Any]]] = None
+        self.logger.info(f"SQLite Connector initialized for database: {self.database_path}")
+
+    def connect(self):
+        """Opens the connection pool and checks that the database is readable."""
+        self.logger.info(f"Connecting to SQLite database at '{self.database_path}'...")
+        self.pool = ConnectionPool(self._open_connection, max_size=self.pool_size)
+        try:
+            with self.pool.connection() as conn:
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            self.logger.info("SQLite database is accessible.")
+        except sqlite3.Error as e:
+            self.logger.error(f"Could not open SQLite database at {self.database_path}: {e}")
+            self.pool.close()
+            self.pool = None
+            raise
+
+    def disconnect(self):
+        """Closes every pooled connection."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        self.logger.info("Disconnected from SQLite database.")
+
+    def get_schema(self) -> pd.DataFrame:
+        """
+        Reads the catalog of every user table.
+
+        Returns:
+            A DataFrame with `table_name`, `column_name`, `data_type`,
+            `is_nullable` and `is_primary_key` columns, in table and column order.
+        """
+        if self.pool is None:
+            raise RuntimeError("SqliteConnector.connect() must be called before get_schema().")
+
+        with self.pool.connection() as conn:
+            tables = [row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )]
+        self.logger.info(f"Fetching catalog for {len(tables)} tables...")
+
+        with ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="sqlite-catalog") as executor:
+            catalogs = list(executor.map(self._read_table, tables))
+
+        rows = [row for columns, _ in catalogs for row in columns]
+        schema_df = pd.DataFrame(rows, columns=SCHEMA_COLUMNS)
+        self._foreign_keys = self._resolve_foreign_keys(catalogs, schema_df)
+        self.logger.info(
+            f"Successfully loaded schema with {len(schema_df)} columns "
+            f"and {len(self._foreign_keys)} declared foreign keys."
+        )
+        return schema_df
+
+    def get_foreign_keys(self) -> List[Dict[str, Any]]:
+        """
+        Returns the foreign keys declared in the database.
+
+        The catalog is read by `get_schema`; if it has not been read yet it is
+        read now.
+        """
+        if self._foreign_keys is None:
+            self.get_schema()
+        return list(self._foreign_keys)
+
+    def _open_connection(self) -> sqlite3.Connection:
+        # Read-only URI mode so a wrong path is an error rather than a new, empty database.
+        return sqlite3.connect(
+            f"file:{self.database_path}?mode=ro",
+            uri=True,
+            check_same_thread=False
+        )
+
+    def _read_table(self, table: str) -> Tuple[List[tuple], List[tuple]]:
+        """Reads the columns and declared foreign keys of one table."""
+        with self.pool.connection() as conn:
+            columns = [
+                (table, name, data_type, not notnull and not pk, bool(pk))
+                for _, name, data_type, notnull, _, pk in conn.execute(
+                    "SELECT cid, name, type, \"notnull\", dflt_value, pk FROM pragma_table_info(?) ORDER BY cid",
+                    (table,)
+                )
+            ]
+            foreign_keys = [
+                (table, from_column, to_table, to_column)
+                for to_table, from_column, to_column in conn.execute(
+                    "SELECT \"table\", \"from\", \"to\" FROM pragma_foreign_key_list(?) ORDER BY id, seq",
+                    (table,)
+                )
+            ]
+        return columns, foreign_keys
+
+    def _resolve_foreign_keys(self, catalogs: List[Tuple[List[tuple], List[tuple]]], schema_df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Converts raw foreign keys to relationships.
+
+        A foreign key that omits the referenced column points at the parent
+        table's primary key, which is looked up in the catalog.
+        """
+        primary_keys: Dict[str, List[str]] = {}
+        for table, column in zip(
+            schema_df.loc[schema_df["is_primary_key"], "table_name"],
+            schema_df.loc[schema_df["is_primary_key"], "column_name"]
+        ):
+            primary_keys.setdefault(table, []).append(column)
+
+        relationships = []
+        for _, foreign_keys in catalogs:
+            for from_table, from_column, to_table, to_column in foreign_keys:
+                if to_column is None:
+                    parent_keys = primary_keys.get(to_table, [])
+                    if len(parent_keys) != 1:
+                        self.logger.warning(
+                            f"Cannot resolve the referenced column of {from_table}.{from_column} -> {to_table}."
+                        )
+                        continue
+                    to_column = parent_keys[0]
+                relationships.append({
+                    "from_table": from_table,
+                    "from_column": from_column,
+                    "to_table": to_table,
+                    "to_column": to_column,
+                    "relationship_type": "Many-to-One"
+                })
+        return relationships
@@ -0,0 +1,166 @@
+# In file: tools/step_scheduler.py
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config import settings
+
+class PipelineStep:
+    """
+    A single unit of work in the pipeline dependency graph.
+
+    The step's function receives a dictionary with the results of the steps
+    it depends on, keyed by step name.
+    """
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Any], depends_on: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+
+class StepScheduler:
+    """
+    A tool that runs pipeline steps as a dependency graph (DAG).
+
+    Every step whose dependencies have completed is started immediately on a
+    thread pool, so independent steps run at the same time. Per-step timings
+    are recorded so the critical path of a run can be inspected.
+    """
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.PIPELINE_MAX_WORKERS
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def run(
+        self,
+        steps: List[PipelineStep],
+        on_start: Optional[Callable[[str], None]] = None,
+        on_finish: Optional[Callable[[str, Optional[Exception]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Runs all steps, respecting their dependencies.
+
+        Args:
+            steps: The steps that make up the graph.
+            on_start: Optional callback invoked with a step's name when it starts.
+            on_finish: Optional callback invoked with a step's name and its
+                exception (or None) when it finishes.
+
+        Returns:
+            A dictionary of step results keyed by step name.
+
+        Raises:
+            ValueError: If the graph references unknown steps or contains a cycle.
+            Exception: The first exception raised by a step. Steps that have not
+                started yet are not run after a failure.
+        """
+        steps_by_name = {step.name: step for step in steps}
+        self._validate(steps_by_name)
+
+        self.timings = {}
+        results: Dict[str, Any] = {}
+        pending = dict(steps_by_name)
+        running = {}
+        failure: Optional[Exception] = None
+        run_start = time.perf_counter()
+
+        def execute(step: PipelineStep) -> Any:
+            started = time.perf_counter()
+            self.timings[step.name] = {"start": started - run_start}
+            if on_start:
+                on_start(step.name)
+            self.logger.info(f"Step '{step.name}' started.")
+            try:
+                upstream = {dep: results[dep] for dep in step.depends_on}
+                return step.func(upstream)
+            finally:
+                finished = time.perf_counter()
+                self.timings[step.name]["end"] = finished - run_start
+                self.timings[step.name]["duration"] = finished - started
+                self.logger.info(f"Step '{step.name}' finished in {finished - started:.2f}s.")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline-step") as executor:
+            while pending or running:
+                if failure is None:
+                    ready = [
+                        step for step in pending.values()
+                        if all(dep in results for dep in step.depends_on)
+                    ]
+                    for step in ready:
+                        del pending[step.name]
+                        running[executor.submit(execute, step)] = step.name
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        results[name] = future.result()
+                    else:
+                        self.logger.error(f"Step '{name}' failed: {error}")
+                        failure = failure or error
+                    if on_finish:
+                        on_finish(name, error)
+
+        self._log_summary()
+        self.logger.info(f"Critical path: {' -> '.join(self.critical_path(steps))}")
+        if failure is not None:
+            raise failure
+        return results
+
+    def critical_path(self, steps: List[PipelineStep]) -> List[str]:
+        """
+        Returns the chain of steps that determined the total run time.
+
+        The path is traced back from the last step to finish, following the
+        dependency that finished latest at each hop.
+        """
+        steps_by_name = {step.name: step for step in steps}
+        finished = [name for name in self.timings if "end" in self.timings[name]]
+        if not finished:
+            return []
+
+        current = max(finished, key=lambda name: self.timings[name]["end"])
+        path = [current]
+        while True:
+            deps = [dep for dep in steps_by_name[current].depends_on if dep in self.timings]
+            if not deps:
+                break
+            current = max(deps, key=lambda name: self.timings[name].get("end", 0.0))
+            path.append(current)
+        return list(reversed(path))
+
+    def _validate(self, steps_by_name: Dict[str, PipelineStep]):
+        """Checks that all dependencies exist and that the graph is acyclic."""
+        for step in steps_by_name.values():
+            for dep in step.depends_on:
+                if dep not in steps_by_name:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'.")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at step '{name}'.")
+            visiting.add(name)
+            for dep in steps_by_name[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in steps_by_name:
+            visit(name)
+
+    def _log_summary(self):
+        """Logs the timing of every step that ran, in start order."""
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1]["start"]):
+            self.logger.info(
+                f"Step timing: {name} started at +{timing['start']:.2f}s, "
+                f"took {timing.get('duration', 0.0):.2f}s"
+            )
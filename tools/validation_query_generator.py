@@ -0,0 +1,147 @@
+# In file: tools/validation_query_generator.py
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from config import settings
+
+class ValidationQueryGenerator:
+    """
+    Writes post-migration validation queries from templates, without a model call.
+
+    Each table gets a single query that scans the target table once and
+    reports, side by side:
+    - its row count and the source table's row count,
+    - the NULL count of every column, via `SUM(CASE WHEN ...)`. Columns the
+      catalog declares NOT NULL or part of the primary key, and columns a
+      relationship references as a key, are listed in the query's comment
+      as required to be 0; the counts of the other columns show NULLs
+      introduced by the migration, such as a mis-mapped `order_date`, when
+      compared with the source,
+    - the orphan count of each foreign key, rows whose value has no match
+      in the referenced table.
+    """
+    def __init__(self, source_schema: Optional[str] = None, target_schema: Optional[str] = None):
+        """
+        Initializes the ValidationQueryGenerator.
+
+        Args:
+            source_schema: Schema holding the source tables. Defaults to
+                VALIDATION_SOURCE_SCHEMA.
+            target_schema: Schema holding the migrated tables. Defaults to
+                VALIDATION_TARGET_SCHEMA.
+        """
+        self.source_schema = source_schema if source_schema is not None else settings.VALIDATION_SOURCE_SCHEMA
+        self.target_schema = target_schema if target_schema is not None else settings.VALIDATION_TARGET_SCHEMA
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def generate(
+        self,
+        schema_df: Optional[pd.DataFrame],
+        key_tables: Iterable[Dict[str, Any]] = (),
+        relationships: Iterable[Dict[str, Any]] = ()
+    ) -> str:
+        """
+        Generates the row-count, NULL and orphan-record checks.
+
+        Args:
+            schema_df: The schema catalog. Every table in it is checked; if
+                it is None, the analysis `key_tables` are checked instead.
+            key_tables: The `key_tables` of the analysis report.
+            relationships: The `relationships` of the analysis report.
+
+        Returns:
+            The SQL script, one query per table.
+        """
+        relationships = list(relationships)
+        tables = self._tables(schema_df, key_tables, relationships)
+        foreign_keys: Dict[str, List[Tuple[str, str, str]]] = {}
+        for relationship in relationships:
+            from_table, from_column = relationship.get("from_table"), relationship.get("from_column")
+            to_table, to_column = relationship.get("to_table"), relationship.get("to_column")
+            if from_table in tables and to_table and from_column and to_column:
+                keys = foreign_keys.setdefault(from_table, [])
+                if (from_column, to_table, to_column) not in keys:
+                    keys.append((from_column, to_table, to_column))
+
+        queries = [
+            "-- Row count, NULL and orphan-record checks.\n"
+            "-- Each query scans one migrated table: row_count should equal source_row_count,\n"
+            "-- every *_orphans column and the *_nulls columns listed as required should be 0,\n"
+            "-- and the other *_nulls columns should match the NULL counts in the source."
+        ]
+        for table, columns in tables.items():
+            queries.append(self._table_query(table, columns, foreign_keys.get(table, [])))
+        self.logger.info(
+            f"Generated validation queries for {len(tables)} tables and "
+            f"{sum(len(keys) for keys in foreign_keys.values())} relationships."
+        )
+        return "\n\n".join(queries) + "\n"
+
+    def _table_query(
+        self,
+        table: str,
+        columns: List[Tuple[str, bool]],
+        foreign_keys: List[Tuple[str, str, str]]
+    ) -> str:
+        target = self._qualified(self.target_schema, table)
+        source = self._qualified(self.source_schema, table)
+        checks = [
+            f"'{table}' AS table_name",
+            "COUNT(*) AS row_count",
+            f"(SELECT COUNT(*) FROM {source}) AS source_row_count",
+        ]
+        checks += [f"SUM(CASE WHEN t.{column} IS NULL THEN 1 ELSE 0 END) AS {column}_nulls"
+                   for column, _ in columns]
+        for column, to_table, to_column in foreign_keys:
+            referenced = self._qualified(self.target_schema, to_table)
+            checks.append(
+                f"SUM(CASE WHEN t.{column} IS NOT NULL AND NOT EXISTS "
+                f"(SELECT 1 FROM {referenced} r WHERE r.{to_column} = t.{column}) "
+                f"THEN 1 ELSE 0 END) AS {column}_orphans"
+            )
+        header = f"-- {table}: row count"
+        if columns:
+            header += ", NULL checks"
+        if foreign_keys:
+            header += f", orphans against {', '.join(sorted({to_table for _, to_table, _ in foreign_keys}))}"
+        required = [f"{column}_nulls" for column, is_required in columns if is_required]
+        if required:
+            header += f"\n-- Required to be 0: {', '.join(required)}"
+        return f"{header}\nSELECT\n    " + ",\n    ".join(checks) + f"\nFROM {target} t;"
+
+    @staticmethod
+    def _tables(
+        schema_df: Optional[pd.DataFrame],
+        key_tables: Iterable[Dict[str, Any]],
+        relationships: Iterable[Dict[str, Any]]
+    ) -> Dict[str, List[Tuple[str, bool]]]:
+        """Returns each table's columns and whether they must never be NULL, in catalog order."""
+        tables: Dict[str, List[Tuple[str, bool]]] = {}
+        if schema_df is None:
+            # Without the catalog the columns are unknown, so only counts and orphans are checked
+            for table in key_tables:
+                if isinstance(table, dict) and table.get("table_name"):
+                    tables.setdefault(table["table_name"], [])
+            return tables
+
+        count = len(schema_df)
+        nullables = schema_df["is_nullable"].tolist() if "is_nullable" in schema_df.columns else [True] * count
+        primary = schema_df["is_primary_key"].tolist() if "is_primary_key" in schema_df.columns else [False] * count
+        referenced_keys = {(rel.get("to_table"), rel.get("to_column")) for rel in relationships}
+        for table, column, nullable, is_primary_key in zip(
+            schema_df["table_name"].astype(str).tolist(),
+            schema_df["column_name"].astype(str).tolist(),
+            nullables,
+            primary
+        ):
+            # Names say nothing about nullability; e.g. middle_name is often empty
+            required = not nullable or is_primary_key or (table, column) in referenced_keys
+            tables.setdefault(table, []).append((column, bool(required)))
+        return tables
+
+    @staticmethod
+    def _qualified(schema: Optional[str], table: str) -> str:
+        return f"{schema}.{table}" if schema else table
@@ -0,0 +1,102 @@
+# In file: tools/vector_index.py
+
+import logging
+import os
+import re
+import zlib
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from config import settings
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+class HashedNgramVectorizer:
+    """
+    Turns text into fixed-size vectors using the hashing trick.
+
+    Identifiers are split into words (so `customer_id` contributes `customer`
+    and `id`) and every word also contributes its character trigrams, which
+    makes near-identical names such as `customer` and `customers` similar.
+    Counts are dampened with a log and the vector is L2-normalized, so a dot
+    product between two vectors is their cosine similarity.
+    """
+    def __init__(self, dim: int = settings.MEMORY_VECTOR_DIM):
+        self.dim = dim
+
+    def transform(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            vector[zlib.crc32(feature.encode("utf-8")) % self.dim] += 1.0
+        np.log1p(vector, out=vector)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    @staticmethod
+    def _features(text: str) -> Iterable[str]:
+        for word in TOKEN_PATTERN.findall(text.lower()):
+            yield f"w:{word}"
+            padded = f"^{word}$"
+            for i in range(len(padded) - 2):
+                yield f"c:{padded[i:i + 3]}"
+
+class VectorIndex:
+    """
+    A small on-disk vector index with cosine top-k search.
+
+    Vectors are stored as raw float32 rows in a single file, so adding a
+    vector is an append and the row number matches the record it describes.
+    """
+    def __init__(self, path: str, dim: int = settings.MEMORY_VECTOR_DIM):
+        self.path = path
+        self.dim = dim
+        self.vectorizer = HashedNgramVectorizer(dim)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._matrix = self._load()
+
+    def __len__(self) -> int:
+        return self._matrix.shape[0]
+
+    def add_text(self, text: str):
+        """Vectorizes a text and appends it as the next row."""
+        vector = self.vectorizer.transform(text)
+        with open(self.path, "ab") as f:
+            f.write(vector.tobytes())
+        self._matrix = np.vstack([self._matrix, vector])
+
+    def rebuild(self, texts: List[str]):
+        """Replaces the whole index with vectors for the given texts."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            matrix[row] = self.vectorizer.transform(text)
+        tmp_path = f"{self.path}.tmp"
+        matrix.tofile(tmp_path)
+        os.replace(tmp_path, self.path)
+        self._matrix = matrix
+        self.logger.info(f"Rebuilt vector index with {len(texts)} rows.")
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Returns up to k (row, similarity) pairs, most similar first.
+
+        Rows with no similarity at all are not returned.
+        """
+        if len(self) == 0 or k <= 0:
+            return []
+        scores = self._matrix @ self.vectorizer.transform(query)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(row), float(scores[row])) for row in top if scores[row] > 0]
+
+    def _load(self) -> np.ndarray:
+        if not os.path.exists(self.path):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        data = np.fromfile(self.path, dtype=np.float32)
+        if data.size % self.dim:
+            self.logger.warning(f"Vector index at {self.path} is damaged; it will be rebuilt.")
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return data.reshape(-1, self.dim)